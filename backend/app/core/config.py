@@ -21,6 +21,24 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
+    # Importações
+    IMPORT_TAMANHO_LOTE: int = 50000
+    IMPORT_COMMIT_A_CADA: int = 0   # 0 = transação única
+    IMPORT_WORKERS: int = 2
+    IMPORT_TEMP_DIR: str = "temp"
+    IMPORT_TAMANHO_MAXIMO_MB: int = 200
+    IMPORT_TAMANHO_BLOCO_UPLOAD: int = 1024 * 1024   # bytes
+    IMPORT_MAXIMO_LINHAS: int = 2000000   # 0 = sem limite
+    IMPORT_MOTOR_EXCEL: str = "auto"   # auto | calamine | openpyxl
+    IMPORT_CALAMINE_MAXIMO_CELULAS: int = 2000000   # "auto": acima disso, openpyxl
+    IMPORT_RELATORIOS_DIR: str = "relatorios"
+    IMPORT_TIMEOUT_PROCESSANDO_MINUTOS: int = 60   # PROCESSANDO sem atividade = órfão
+    IMPORT_LOCK_TIMEOUT_TROCA_MS: int = 5000   # espera máxima pelos locks da troca de partição
+
+    # Partições mensais (his_selo_detalhe_pr)
+    PARTICOES_MESES_FUTUROS: int = 3
+    PARTICOES_INTERVALO_HORAS: int = 24
+
     model_config = ConfigDict(
         env_file=".env",
         extra="ignore"
@@ -12,6 +12,11 @@ class ErrorCode(str, Enum):
     PASSWORD_REQUIRED = "IMPORT_005"
     EMPTY_FILE = "IMPORT_006"
     IMPORT_TYPE_NOT_CONFIGURED = "IMPORT_007"
+    FILE_TOO_LARGE = "IMPORT_008"
+    REJECTION_REPORT_NOT_FOUND = "IMPORT_009"
+    RESUME_FILE_MISMATCH = "IMPORT_010"
+    INVALID_ENCODING = "IMPORT_011"
+    IMPORT_NOT_IN_PROGRESS = "IMPORT_012"
 
     # =========================
     # BANCO DE DADOS
@@ -30,7 +35,7 @@ ERROR_CATALOG = {
     # IMPORTAÇÃO
     # =========================
     ErrorCode.INVALID_FILE_TYPE: {
-        "message": "Tipo de arquivo inválido. Utilize um arquivo .xlsx",
+        "message": "Tipo de arquivo inválido. Utilize um arquivo .xlsx, .csv ou .parquet",
         "http_status": 400,
         "action": "Solicitar novo arquivo ao cliente"
     },
@@ -64,6 +69,31 @@ ERROR_CATALOG = {
         "http_status": 500,
         "action": "Encaminhar para N3"
     },
+    ErrorCode.FILE_TOO_LARGE: {
+        "message": "Arquivo excede o tamanho máximo permitido",
+        "http_status": 413,
+        "action": "Solicitar ao cliente a divisão do arquivo ou outro formato"
+    },
+    ErrorCode.REJECTION_REPORT_NOT_FOUND: {
+        "message": "Relatório de rejeições não encontrado para esta importação",
+        "http_status": 404,
+        "action": "Verificar se a importação possui linhas rejeitadas"
+    },
+    ErrorCode.RESUME_FILE_MISMATCH: {
+        "message": "O arquivo enviado não é o mesmo da importação a retomar",
+        "http_status": 409,
+        "action": "Reenviar o arquivo original ou iniciar uma nova importação"
+    },
+    ErrorCode.INVALID_ENCODING: {
+        "message": "Codificação do arquivo CSV não suportada. Utilize UTF-8 ou Windows-1252",
+        "http_status": 400,
+        "action": "Solicitar ao cliente o arquivo salvo em UTF-8"
+    },
+    ErrorCode.IMPORT_NOT_IN_PROGRESS: {
+        "message": "A importação não está mais em andamento",
+        "http_status": 409,
+        "action": "Consultar o log da importação; se necessário, retomar ou reenviar"
+    },
 
     # =========================
     # BANCO DE DADOS
@@ -0,0 +1,284 @@
+"""
+Carga em massa (COPY + staging) para as tabelas data_pr
+"""
+import io
+from typing import Optional, Sequence, Tuple
+
+import pandas as pd
+from pandas.api.types import infer_dtype
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+# Representação de NULL no CSV enviado ao COPY
+NULL_COPY = r"\N"
+
+# Maior inteiro representável sem perda em float64
+_LIMITE_INTEIRO_FLOAT = 2 ** 53
+
+# Coluna extra da staging com a posição da linha no lote
+COLUNA_ORDEM_STAGING = "ordem_staging"
+
+
+# ======================================================
+# PREPARAÇÃO DO LOTE PARA O COPY
+# ======================================================
+
+def _preparar_para_copy(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte colunas float com valores inteiros (ex.: 123.0, efeito
+    de NaN na leitura) para Int64, evitando que o COPY envie "123.0"
+    para colunas inteiras ou de código.
+    """
+    df = df.copy()
+
+    for coluna in df.columns:
+        serie = df[coluna]
+
+        if infer_dtype(serie, skipna=True) not in (
+            "floating",
+            "mixed-integer-float",
+        ):
+            continue
+
+        numeros = pd.to_numeric(serie, errors="coerce")
+        validos = numeros.dropna()
+
+        if (
+            (validos % 1 == 0).all()
+            and (validos.abs() < _LIMITE_INTEIRO_FLOAT).all()
+        ):
+            df[coluna] = numeros.astype("Int64")
+
+    return df
+
+
+def _nome_staging(tabela: str) -> str:
+    return "stg_" + tabela.replace(".", "_")
+
+
+# ======================================================
+# COPY PARA STAGING
+# ======================================================
+
+def _copiar_para_staging(
+    conn: Connection,
+    *,
+    tabela: str,
+    colunas: Sequence[str],
+    df: pd.DataFrame,
+) -> str:
+    """
+    Envia o lote para a tabela temporária da tabela final via COPY.
+    Retorna o nome da staging.
+    """
+    staging = _nome_staging(tabela)
+    lista_colunas = ", ".join(colunas)
+
+    # --------------------------------------------------
+    # 1. Staging temporária (mesmos tipos da tabela final)
+    # --------------------------------------------------
+    conn.execute(text(f"""
+        CREATE TEMP TABLE IF NOT EXISTS {staging}
+        ON COMMIT DROP
+        AS SELECT {lista_colunas}
+        FROM {tabela}
+        WITH NO DATA
+    """))
+
+    # Ordem de chegada das linhas (o COPY numera na ordem do lote)
+    conn.execute(text(f"""
+        ALTER TABLE {staging}
+        ADD COLUMN IF NOT EXISTS {COLUNA_ORDEM_STAGING}
+        BIGINT GENERATED ALWAYS AS IDENTITY
+    """))
+    conn.execute(text(f"TRUNCATE {staging}"))
+
+    # --------------------------------------------------
+    # 2. COPY do lote
+    # --------------------------------------------------
+    buffer = io.StringIO()
+    _preparar_para_copy(df[list(colunas)]).to_csv(
+        buffer,
+        index=False,
+        header=False,
+        na_rep=NULL_COPY,
+    )
+    buffer.seek(0)
+
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {staging} ({lista_colunas}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{NULL_COPY}')",
+            buffer,
+        )
+
+    return staging
+
+
+# ======================================================
+# CHAVE LÓGICA (LINHA QUE MUDOU DE PARTIÇÃO)
+# ======================================================
+
+def _remover_outras_particoes(
+    conn: Connection,
+    *,
+    tabela: str,
+    staging: str,
+    chave_conflito: Sequence[str],
+    chave_logica: Optional[Sequence[str]],
+) -> int:
+    """
+    Quando a chave do ON CONFLICT inclui a coluna de partição
+    (ex.: data_ato), uma linha cuja data foi corrigida na origem
+    não conflita com a versão antiga: remove a versão de mesma
+    chave lógica gravada em outra partição antes do merge.
+
+    Retorna quantas linhas foram removidas.
+    """
+    if not chave_logica:
+        return 0
+
+    mesma_linha = " AND ".join(
+        f"destino.{coluna} = lote.{coluna}"
+        for coluna in chave_logica
+    )
+    outra_particao = " OR ".join(
+        f"destino.{coluna} IS DISTINCT FROM lote.{coluna}"
+        for coluna in chave_conflito
+        if coluna not in chave_logica
+    )
+
+    return conn.execute(text(f"""
+        DELETE FROM {tabela} destino
+        USING {staging} lote
+        WHERE {mesma_linha}
+          AND ({outra_particao})
+    """)).rowcount or 0
+
+
+# ======================================================
+# MERGE SET-BASED (INSERE NOVOS, IGNORA EXISTENTES)
+# ======================================================
+
+def carregar_via_copy(
+    conn: Connection,
+    *,
+    tabela: str,
+    colunas: Sequence[str],
+    chave_conflito: Sequence[str],
+    df: pd.DataFrame,
+    chave_logica: Optional[Sequence[str]] = None,
+) -> Tuple[int, int]:
+    """
+    Envia o lote para uma tabela temporária via COPY e faz o merge
+    na tabela final com um único INSERT ... SELECT ... ON CONFLICT.
+
+    Deve ser chamada dentro de uma transação aberta (engine.begin()).
+
+    Retorna (inseridos, ignorados) — contagens exatas, diferente do
+    rowcount de um executemany.
+    """
+    if df.empty:
+        return 0, 0
+
+    staging = _copiar_para_staging(conn, tabela=tabela, colunas=colunas, df=df)
+    _remover_outras_particoes(
+        conn,
+        tabela=tabela,
+        staging=staging,
+        chave_conflito=chave_conflito,
+        chave_logica=chave_logica,
+    )
+    lista_colunas = ", ".join(colunas)
+    lista_chave = ", ".join(chave_conflito)
+
+    result = conn.execute(text(f"""
+        INSERT INTO {tabela} ({lista_colunas})
+        SELECT {lista_colunas}
+        FROM {staging}
+        ON CONFLICT ({lista_chave})
+        DO NOTHING
+    """))
+
+    inseridos = result.rowcount or 0
+    return inseridos, len(df) - inseridos
+
+
+# ======================================================
+# MERGE INCREMENTAL (INSERE NOVOS, ATUALIZA ALTERADOS)
+# ======================================================
+
+def mesclar_alterados_via_copy(
+    conn: Connection,
+    *,
+    tabela: str,
+    colunas: Sequence[str],
+    chave_conflito: Sequence[str],
+    coluna_hash: str,
+    df: pd.DataFrame,
+    chave_logica: Optional[Sequence[str]] = None,
+) -> Tuple[int, int, int]:
+    """
+    Como carregar_via_copy, mas linhas existentes cujo hash de
+    conteúdo mudou são atualizadas. Linhas com o mesmo hash não
+    geram escrita nenhuma (nem nova versão da tupla).
+
+    Linhas que mudaram de partição (chave_logica) contam como
+    atualizadas.
+
+    Retorna (inseridos, atualizados, ignorados).
+    """
+    if df.empty:
+        return 0, 0, 0
+
+    staging = _copiar_para_staging(conn, tabela=tabela, colunas=colunas, df=df)
+    movidas = _remover_outras_particoes(
+        conn,
+        tabela=tabela,
+        staging=staging,
+        chave_conflito=chave_conflito,
+        chave_logica=chave_logica,
+    )
+    lista_colunas = ", ".join(colunas)
+    lista_chave = ", ".join(chave_conflito)
+
+    atribuicoes = ", ".join(
+        f"{coluna} = EXCLUDED.{coluna}"
+        for coluna in colunas
+        if coluna not in chave_conflito
+    )
+    mesma_chave = " AND ".join(
+        f"destino.{coluna} = lote.{coluna}"
+        for coluna in chave_conflito
+    )
+
+    # Chaves do lote que já existem: tabelas particionadas não
+    # expõem xmax no RETURNING para separar inseridos de atualizados
+    distintas, existentes = conn.execute(text(f"""
+        SELECT count(*), count(*) FILTER (
+            WHERE EXISTS (
+                SELECT 1
+                FROM {tabela} destino
+                WHERE {mesma_chave}
+            )
+        )
+        FROM (SELECT DISTINCT {lista_chave} FROM {staging}) lote
+    """)).one()
+
+    # DISTINCT ON: a mesma chave não pode ser atualizada duas vezes
+    # no mesmo comando; vale a última linha do lote (determinístico)
+    gravadas = conn.execute(text(f"""
+        INSERT INTO {tabela} AS destino ({lista_colunas})
+        SELECT DISTINCT ON ({lista_chave}) {lista_colunas}
+        FROM {staging}
+        ORDER BY {lista_chave}, {COLUNA_ORDEM_STAGING} DESC
+        ON CONFLICT ({lista_chave})
+        DO UPDATE SET {atribuicoes}
+        WHERE destino.{coluna_hash} IS DISTINCT FROM EXCLUDED.{coluna_hash}
+    """)).rowcount or 0
+
+    inseridos = distintas - existentes - movidas
+    atualizados = gravadas - inseridos
+
+    return inseridos, atualizados, len(df) - gravadas
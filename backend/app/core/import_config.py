@@ -6,25 +6,227 @@ class ModoImportacao(str, Enum):
     INCREMENTAL = "INCREMENTAL"
 
 
+class TipoColuna(str, Enum):
+    NUMERICO = "NUMERICO"
+    DATA = "DATA"            # somente data (hora descartada)
+    DATA_HORA = "DATA_HORA"
+    CODIGO = "CODIGO"
+    TEXTO = "TEXTO"
+    BOOLEANO = "BOOLEANO"
+
+
+# ======================================================
+# ESPECIFICAÇÃO DECLARATIVA DE CADA TIPO DE ARQUIVO
+# ======================================================
+# colunas             → colunas lidas do arquivo e seus tipos
+# renomear            → arquivo → banco
+# padroes             → valor para células vazias
+# campos_obrigatorios → linhas sem algum deles são descartadas
+# tabela              → tabela de destino
+# colunas_destino     → colunas gravadas (inclui controle; com
+#                       "hash_linha", a carga INCREMENTAL atualiza
+#                       somente as linhas cujo conteúdo mudou)
+# chave_conflito      → chave do ON CONFLICT
+# chave_logica        → identidade da linha quando a chave do ON
+#                       CONFLICT inclui a coluna de partição (a linha
+#                       de mesma identidade em outro mês é removida)
+# por_contrato        → grava contrato_id / sistema_origem_id
+# exige_senha         → INITIAL exige confirmação de senha
+# limpa_no_initial    → INITIAL remove os dados do contrato antes
+# aceita_colunas_extras → False rejeita colunas fora do layout
+# particao_mensal     → coluna de data das partições mensais
+#                       (meses criados a cada lote, fora da transação da carga)
+
 TIPOS_IMPORTACAO = {
     "os_selo": {
         "permite_incremental": True,
-        "descricao": "Ordem de Serviço - Selos"
+        "descricao": "Ordem de Serviço - Selos",
+        "colunas": {
+            "id": TipoColuna.CODIGO,
+            "os_id": TipoColuna.CODIGO,
+            "selo": TipoColuna.CODIGO,
+            "quantidade": TipoColuna.NUMERICO,
+        },
+        "renomear": {},
+        "padroes": {"quantidade": 1},
+        "campos_obrigatorios": ("os_id", "selo"),
+        "tabela": "data_pr.os_selo",
+        "colunas_destino": (
+            "id",
+            "os_id",
+            "selo",
+            "quantidade",
+            "contrato_id",
+            "sistema_origem_id",
+            "hash_linha",
+        ),
+        "chave_conflito": ("contrato_id", "sistema_origem_id", "os_id", "selo"),
+        "por_contrato": True,
+        "exige_senha": True,
+        "limpa_no_initial": True,
+        "aceita_colunas_extras": True,
+        "chave_logica": None,
+        "particao_mensal": None,
     },
     "os_lanc": {
         "permite_incremental": True,
-        "descricao": "Ordem de Serviço - Lançamentos"
+        "descricao": "Ordem de Serviço - Lançamentos",
+        "colunas": {
+            "id": TipoColuna.CODIGO,
+            "situacao": TipoColuna.CODIGO,
+            "quantidade": TipoColuna.NUMERICO,
+            "valor": TipoColuna.NUMERICO,
+            "capa": TipoColuna.CODIGO,
+            "livro": TipoColuna.CODIGO,
+            "folha": TipoColuna.CODIGO,
+            "dt_lancou": TipoColuna.DATA_HORA,
+            "os": TipoColuna.CODIGO,
+            "sequencia": TipoColuna.CODIGO,
+            "operacao": TipoColuna.CODIGO,
+            "lcto": TipoColuna.CODIGO,
+            "recibo": TipoColuna.CODIGO,
+        },
+        "renomear": {},
+        "padroes": {"quantidade": 1},
+        "campos_obrigatorios": ("os", "sequencia"),
+        "tabela": "data_pr.os_lanc",
+        "colunas_destino": (
+            "contrato_id",
+            "sistema_origem_id",
+            "id",
+            "situacao",
+            "quantidade",
+            "valor",
+            "capa",
+            "livro",
+            "folha",
+            "dt_lancou",
+            "os",
+            "sequencia",
+            "operacao",
+            "lcto",
+            "recibo",
+            "hash_linha",
+        ),
+        "chave_conflito": ("contrato_id", "sistema_origem_id", "os", "sequencia"),
+        "por_contrato": True,
+        "exige_senha": True,
+        "limpa_no_initial": True,
+        "aceita_colunas_extras": True,
+        "chave_logica": None,
+        "particao_mensal": None,
     },
     "his_selo": {
         "permite_incremental": True,
-        "descricao": "Histórico de Selos"
+        "descricao": "Histórico de Selos",
+        "colunas": {
+            "id": TipoColuna.CODIGO,
+            "selo": TipoColuna.CODIGO,
+            "tipo_ato": TipoColuna.CODIGO,
+            "capa": TipoColuna.CODIGO,
+            "livro": TipoColuna.CODIGO,
+            "folha": TipoColuna.CODIGO,
+            "quantidade": TipoColuna.NUMERICO,
+            "data": TipoColuna.DATA,   # data do ato (BASE TEMPORAL)
+        },
+        "renomear": {},
+        "padroes": {"quantidade": 1},
+        "campos_obrigatorios": ("selo", "data"),
+        "tabela": "data_pr.his_selo",
+        "colunas_destino": (
+            "id",
+            "selo",
+            "tipo_ato",
+            "capa",
+            "livro",
+            "folha",
+            "quantidade",
+            "data",
+            "contrato_id",
+            "sistema_origem_id",
+            "hash_linha",
+        ),
+        "chave_conflito": ("contrato_id", "sistema_origem_id", "id"),
+        "por_contrato": True,
+        "exige_senha": True,
+        "limpa_no_initial": True,
+        "aceita_colunas_extras": True,
+        "chave_logica": None,
+        "particao_mensal": None,
     },
     "his_selo_detalhe_pr": {
         "permite_incremental": True,
-        "descricao": "Histórico de Selos Detalhado (PR)"
+        "descricao": "Histórico de Selos Detalhado (PR)",
+        "colunas": {
+            "id": TipoColuna.CODIGO,
+            "selo_principal": TipoColuna.CODIGO,
+            "id_codigo_ato": TipoColuna.CODIGO,
+            "dataato": TipoColuna.DATA,
+        },
+        # Data de negócio (BI): dataato → data_ato (BANCO)
+        "renomear": {"dataato": "data_ato"},
+        "padroes": {},
+        "campos_obrigatorios": ("id", "selo_principal", "id_codigo_ato", "data_ato"),
+        "tabela": "data_pr.his_selo_detalhe_pr",
+        "colunas_destino": (
+            "id",
+            "selo_principal",
+            "id_codigo_ato",
+            "data_ato",
+            "contrato_id",
+            "sistema_origem_id",
+            "hash_linha",
+        ),
+        # data_ato na chave: exigência das partições mensais (script 09)
+        "chave_conflito": ("contrato_id", "sistema_origem_id", "id", "data_ato"),
+        "por_contrato": True,
+        "exige_senha": True,
+        "limpa_no_initial": False,
+        "aceita_colunas_extras": True,
+        "chave_logica": ("contrato_id", "sistema_origem_id", "id"),
+        "particao_mensal": "data_ato",
     },
     "tabela_lancamentos": {
         "permite_incremental": False,
-        "descricao": "Tabela de Tipos de Lançamentos (Dimensão)"
+        "descricao": "Tabela de Tipos de Lançamentos (Dimensão)",
+        "colunas": {
+            "codlcto": TipoColuna.CODIGO,
+            "descricao": TipoColuna.TEXTO,
+            "tipo_lanc": TipoColuna.TEXTO,
+            "grupodecontas": TipoColuna.TEXTO,
+            "status_inativo": TipoColuna.BOOLEANO,
+        },
+        "renomear": {},
+        "padroes": {},
+        "campos_obrigatorios": (),
+        "tabela": "data_pr.tipo_lancamento",
+        "colunas_destino": (
+            "codlcto",
+            "descricao",
+            "tipo_lanc",
+            "grupodecontas",
+            "status_inativo",
+        ),
+        "chave_conflito": ("codlcto",),
+        "por_contrato": False,
+        "exige_senha": False,
+        "limpa_no_initial": False,
+        "aceita_colunas_extras": False,
+        "chave_logica": None,
+        "particao_mensal": None,
     }
 }
+
+
+# ======================================================
+# PACOTE DE ARQUIVOS (ORDEM DE GRAVAÇÃO)
+# ======================================================
+# Dimensão primeiro; depois lançamentos, selos e histórico.
+
+ORDEM_PACOTE = (
+    "tabela_lancamentos",
+    "os_lanc",
+    "os_selo",
+    "his_selo",
+    "his_selo_detalhe_pr",
+)
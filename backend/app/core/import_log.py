@@ -1,5 +1,13 @@
+import json
+from typing import Any, Dict, Optional
+
 from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
 from app.core.database import engine
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
 
 
 # ======================================================
@@ -16,6 +24,8 @@ def criar_log_importacao(
     nome_arquivo: str,
     modo_importacao: str,
     total_registros: int,
+    hash_arquivo: str | None = None,
+    simulacao: bool = False,
 ) -> int:
     """
     Cria o log inicial da importação e retorna o ID.
@@ -32,6 +42,8 @@ def criar_log_importacao(
             nome_arquivo,
             total_registros,
             registros_processados,
+            hash_arquivo,
+            simulacao,
             status,
             started_at
         ) VALUES (
@@ -44,6 +56,8 @@ def criar_log_importacao(
             :nome_arquivo,
             :total_registros,
             0,
+            :hash_arquivo,
+            :simulacao,
             'PROCESSANDO',
             NOW()
         )
@@ -62,10 +76,76 @@ def criar_log_importacao(
                 "modo_importacao": modo_importacao,
                 "nome_arquivo": nome_arquivo,
                 "total_registros": total_registros,
+                "hash_arquivo": hash_arquivo,
+                "simulacao": simulacao,
             }
         ).scalar()
 
 
+# ======================================================
+# REENVIO DE ARQUIVO IDÊNTICO
+# ======================================================
+
+def buscar_importacao_identica(
+    *,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+    tipo_arquivo: str,
+    hash_arquivo: str,
+) -> Optional[int]:
+    """
+    ID da última importação do contrato, sistema de origem e tipo,
+    se ela for do mesmo arquivo e estiver em SUCCESS ou em andamento.
+
+    Só a última importação conta: na sequência A -> B -> A, o
+    reenvio de A substitui os dados de B e não é ignorado. Última
+    importação em ERROR também não bloqueia (pode ter gravado lotes
+    parciais).
+
+    Log em PROCESSANDO sem atividade há mais de
+    IMPORT_TIMEOUT_PROCESSANDO_MINUTOS é órfão (processo que
+    morreu antes de finalizá-lo) e não bloqueia o reenvio.
+    """
+
+    sql = text("""
+        SELECT
+            id,
+            hash_arquivo = :hash_arquivo AS mesmo_arquivo,
+            (
+                status = 'SUCCESS'
+                OR (
+                    status = 'PROCESSANDO'
+                    AND COALESCE(atualizado_em, started_at)
+                        > NOW() - make_interval(mins => :timeout_minutos)
+                )
+            ) AS vigente
+        FROM control.importacoes_log
+        WHERE contrato_id = :contrato_id
+          AND sistema_origem_id IS NOT DISTINCT FROM :sistema_origem_id
+          AND tipo_arquivo = :tipo_arquivo
+          AND NOT simulacao
+        ORDER BY id DESC
+        LIMIT 1
+    """)
+
+    with engine.begin() as conn:
+        ultima = conn.execute(
+            sql,
+            {
+                "contrato_id": contrato_id,
+                "sistema_origem_id": sistema_origem_id,
+                "tipo_arquivo": tipo_arquivo,
+                "hash_arquivo": hash_arquivo,
+                "timeout_minutos": settings.IMPORT_TIMEOUT_PROCESSANDO_MINUTOS,
+            }
+        ).mappings().first()
+
+    if ultima and ultima["mesmo_arquivo"] and ultima["vigente"]:
+        return ultima["id"]
+
+    return None
+
+
 # ======================================================
 # FINALIZA LOG
 # ======================================================
@@ -74,25 +154,46 @@ def finalizar_log_importacao(
     *,
     log_id: int,
     status: str,
-    registros_processados: int,
+    registros_processados: int | None,
+    total_registros: int | None = None,
+    registros_rejeitados: int | None = None,
     success_code: str | None = None,
     error_code: str | None = None,
     mensagem: str | None = None,
+    metricas_etapas: Dict[str, Any] | None = None,
 ):
     """
     Finaliza o log de importação com sucesso ou erro.
+    Contadores None preservam o valor já gravado no log.
+
+    Só logs em PROCESSANDO são finalizados: chamadas repetidas
+    (ex.: motor e wrapper do job no mesmo erro) não sobrescrevem
+    o primeiro resultado.
+    metricas_etapas: tempo e pico de memória por etapa (JSONB).
     """
 
     sql = text("""
         UPDATE control.importacoes_log
         SET
             status = :status,
-            registros_processados = :registros_processados,
+            registros_processados = COALESCE(
+                :registros_processados, registros_processados
+            ),
+            total_registros = COALESCE(:total_registros, total_registros),
+            -- Finalizado: total_registros são as linhas lidas
+            registros_lidos = COALESCE(:total_registros, registros_lidos),
+            registros_rejeitados = COALESCE(
+                :registros_rejeitados, registros_rejeitados
+            ),
             success_code = :success_code,
             error_code = :error_code,
             mensagem = :mensagem,
+            metricas_etapas = COALESCE(
+                CAST(:metricas_etapas AS JSONB), metricas_etapas
+            ),
             finished_at = NOW()
         WHERE id = :log_id
+          AND status = 'PROCESSANDO'
     """)
 
     with engine.begin() as conn:
@@ -102,13 +203,195 @@ def finalizar_log_importacao(
                 "log_id": log_id,
                 "status": status,
                 "registros_processados": registros_processados,
+                "total_registros": total_registros,
+                "registros_rejeitados": registros_rejeitados,
                 "success_code": success_code,
                 "error_code": error_code,
                 "mensagem": mensagem,
+                "metricas_etapas": (
+                    json.dumps(metricas_etapas) if metricas_etapas else None
+                ),
+            }
+        )
+
+
+# ======================================================
+# ATUALIZA PROGRESSO (IMPORTAÇÃO EM ANDAMENTO)
+# ======================================================
+
+def atualizar_progresso_importacao(
+    *,
+    log_id: int,
+    registros_processados: int,
+    registros_lidos: int | None = None,
+    total_registros: int | None = None,
+):
+    """
+    Atualiza o progresso de um log ainda em PROCESSANDO.
+    Executa em transação própria para ficar visível ao polling.
+    registros_lidos (linhas do arquivo já lidas, base do percentual)
+    e total_registros (estimativa do arquivo) são opcionais.
+    """
+
+    sql = text("""
+        UPDATE control.importacoes_log
+        SET
+            registros_processados = :registros_processados,
+            registros_lidos = COALESCE(:registros_lidos, registros_lidos),
+            total_registros = COALESCE(:total_registros, total_registros),
+            atualizado_em = NOW()
+        WHERE id = :log_id
+          AND status = 'PROCESSANDO'
+    """)
+
+    with engine.begin() as conn:
+        conn.execute(
+            sql,
+            {
+                "log_id": log_id,
+                "registros_processados": registros_processados,
+                "registros_lidos": registros_lidos,
+                "total_registros": total_registros,
             }
         )
 
 
+# ======================================================
+# CHECKPOINT (CARGA COM COMMIT EM LOTES)
+# ======================================================
+
+def registrar_checkpoint_importacao(
+    conn: Connection,
+    *,
+    log_id: int,
+    checkpoint_lote: int,
+    checkpoint_linhas: int,
+    registros_processados: int,
+    registros_rejeitados: int = 0,
+):
+    """
+    Grava o checkpoint na MESMA transação dos dados do lote:
+    dados e checkpoint são commitados juntos.
+
+    Só em log PROCESSANDO: se o log já foi finalizado por outro
+    caminho (ex.: marcado ERROR pela fila de jobs), levanta
+    IMPORT_NOT_IN_PROGRESS e o lote é desfeito com o checkpoint.
+    """
+
+    sql = text("""
+        UPDATE control.importacoes_log
+        SET
+            checkpoint_lote = :checkpoint_lote,
+            checkpoint_linhas = :checkpoint_linhas,
+            registros_lidos = :checkpoint_linhas,
+            registros_processados = :registros_processados,
+            registros_rejeitados = :registros_rejeitados,
+            atualizado_em = NOW()
+        WHERE id = :log_id
+          AND status = 'PROCESSANDO'
+    """)
+
+    atualizados = conn.execute(
+        sql,
+        {
+            "log_id": log_id,
+            "checkpoint_lote": checkpoint_lote,
+            "checkpoint_linhas": checkpoint_linhas,
+            "registros_processados": registros_processados,
+            "registros_rejeitados": registros_rejeitados,
+        }
+    ).rowcount
+
+    if atualizados == 0:
+        raise BusinessException(
+            ErrorCode.IMPORT_NOT_IN_PROGRESS,
+            detail=f"Log {log_id} não está em PROCESSANDO"
+        )
+
+
+def obter_checkpoint_importacao(
+    *,
+    log_id: int,
+    contrato_id: str,
+    tipo_arquivo: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    Checkpoint de um log retomável (ERROR com checkpoint), sem alterá-lo.
+    """
+
+    sql = text("""
+        SELECT
+            checkpoint_lote,
+            checkpoint_linhas,
+            registros_processados,
+            hash_arquivo
+        FROM control.importacoes_log
+        WHERE id = :log_id
+          AND contrato_id = :contrato_id
+          AND tipo_arquivo = :tipo_arquivo
+          AND status = 'ERROR'
+          AND checkpoint_lote IS NOT NULL
+    """)
+
+    with engine.begin() as conn:
+        row = conn.execute(
+            sql,
+            {
+                "log_id": log_id,
+                "contrato_id": contrato_id,
+                "tipo_arquivo": tipo_arquivo,
+            }
+        ).mappings().first()
+
+    return dict(row) if row else None
+
+
+def reabrir_log_para_retomada(
+    *,
+    log_id: int,
+    contrato_id: str,
+    tipo_arquivo: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    Volta para PROCESSANDO um log com ERROR que possui checkpoint.
+    Retorna o checkpoint, ou None se o log não puder ser retomado.
+    """
+
+    sql = text("""
+        UPDATE control.importacoes_log
+        SET
+            status = 'PROCESSANDO',
+            error_code = NULL,
+            mensagem = NULL,
+            finished_at = NULL,
+            atualizado_em = NOW()
+        WHERE id = :log_id
+          AND contrato_id = :contrato_id
+          AND tipo_arquivo = :tipo_arquivo
+          AND status = 'ERROR'
+          AND checkpoint_lote IS NOT NULL
+        RETURNING
+            sistema_origem_id,
+            modo_importacao,
+            checkpoint_lote,
+            checkpoint_linhas,
+            registros_processados,
+            registros_rejeitados
+    """)
+
+    with engine.begin() as conn:
+        row = conn.execute(
+            sql,
+            {
+                "log_id": log_id,
+                "contrato_id": contrato_id,
+                "tipo_arquivo": tipo_arquivo,
+            }
+        ).mappings().first()
+
+    return dict(row) if row else None
+
+
 # ======================================================
 # FUNÇÃO PADRÃO (USADA PELOS SERVICES)
 # ======================================================
@@ -125,29 +408,39 @@ def registrar_import_log(
     total_registros: int,
     registros_processados: int,
     status: str,
+    registros_rejeitados: int | None = None,
     success_code: str | None = None,
     error_code: str | None = None,
     mensagem: str | None = None,
+    log_id: int | None = None,
+    metricas_etapas: Dict[str, Any] | None = None,
 ):
     """
     Cria e finaliza o log de importação.
+
+    Se `log_id` for informado (importação em background), o log
+    já existe e é apenas finalizado.
     """
 
-    log_id = criar_log_importacao(
-        usuario_id=usuario_id,
-        usuario_email=usuario_email,
-        contrato_id=contrato_id,
-        sistema_origem_id=sistema_origem_id,
-        tipo_arquivo=tipo_arquivo,
-        modo_importacao=modo_importacao,
-        nome_arquivo=nome_arquivo,
-        total_registros=total_registros,
-    )
+    if log_id is None:
+        log_id = criar_log_importacao(
+            usuario_id=usuario_id,
+            usuario_email=usuario_email,
+            contrato_id=contrato_id,
+            sistema_origem_id=sistema_origem_id,
+            tipo_arquivo=tipo_arquivo,
+            modo_importacao=modo_importacao,
+            nome_arquivo=nome_arquivo,
+            total_registros=total_registros,
+        )
 
     finalizar_log_importacao(
         log_id=log_id,
         status=status,
         registros_processados=registros_processados,
+        total_registros=total_registros,
+        registros_rejeitados=registros_rejeitados,
+        metricas_etapas=metricas_etapas,
         success_code=success_code,
         error_code=error_code,
         mensagem=mensagem,
@@ -0,0 +1,130 @@
+"""
+Medição de tempo e pico de memória por etapa da importação
+"""
+import resource
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator
+
+import pandas as pd
+
+
+# Zera o pico de RSS do processo (Linux ≥ 4.0)
+_ARQUIVO_ZERAR_PICO = "/proc/self/clear_refs"
+_ARQUIVO_STATUS = "/proc/self/status"
+
+
+# ======================================================
+# PICO DE MEMÓRIA (RSS)
+# ======================================================
+
+def zerar_pico_rss() -> bool:
+    """
+    Reinicia o pico de RSS para medir somente a próxima etapa.
+    Retorna False quando o sistema não permite (pico acumulado).
+    """
+    try:
+        with open(_ARQUIVO_ZERAR_PICO, "w") as arquivo:
+            arquivo.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def pico_rss_mb() -> float:
+    """
+    VmHWM do processo; sem /proc, o pico desde o início (getrusage).
+    """
+    try:
+        with open(_ARQUIVO_STATUS) as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+
+    # ru_maxrss em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# ======================================================
+# MEDIDOR POR ETAPA
+# ======================================================
+
+class MedidorEtapas:
+    """
+    Acumula, por etapa, o tempo gasto, as linhas tratadas e o
+    maior pico de RSS observado. Uma etapa pode ser medida várias
+    vezes (uma por lote): os tempos somam e o pico é o máximo.
+    """
+
+    def __init__(self):
+        self.etapas: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def etapa(self, nome: str, *, linhas: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        O dicionário entregue permite informar as linhas ao final
+        (ex.: etapa["linhas"] = len(df) após a leitura).
+        """
+        medida = {"linhas": linhas}
+        zerar_pico_rss()
+        inicio = time.perf_counter()
+
+        try:
+            yield medida
+        finally:
+            self._acumular(
+                nome,
+                segundos=time.perf_counter() - inicio,
+                linhas=medida["linhas"],
+                pico=pico_rss_mb(),
+            )
+
+    def medir_lotes(
+        self,
+        nome: str,
+        lotes: Iterable[pd.DataFrame],
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Repassa os lotes medindo o tempo de produzir cada um
+        (ex.: a leitura do arquivo dentro de leitor.lotes()).
+        """
+        iterador = iter(lotes)
+
+        while True:
+            with self.etapa(nome) as medida:
+                lote = next(iterador, None)
+                medida["linhas"] = 0 if lote is None else len(lote)
+
+            if lote is None:
+                return
+
+            yield lote
+
+    def _acumular(self, nome: str, *, segundos: float, linhas: int, pico: float):
+        atual = self.etapas.setdefault(
+            nome, {"segundos": 0.0, "linhas": 0, "pico_rss_mb": 0.0}
+        )
+        atual["segundos"] += segundos
+        atual["linhas"] += linhas
+        atual["pico_rss_mb"] = max(atual["pico_rss_mb"], pico)
+
+    def resumo(self) -> Dict[str, Dict[str, Any]]:
+        """
+        {etapa: {segundos, linhas, linhas_por_segundo, pico_rss_mb}}
+        na ordem em que as etapas começaram.
+        """
+        return {
+            nome: {
+                "segundos": round(medida["segundos"], 4),
+                "linhas": medida["linhas"],
+                "linhas_por_segundo": (
+                    round(medida["linhas"] / medida["segundos"])
+                    if medida["segundos"] > 0 and medida["linhas"]
+                    else None
+                ),
+                "pico_rss_mb": round(medida["pico_rss_mb"], 1),
+            }
+            for nome, medida in self.etapas.items()
+        }
@@ -0,0 +1,270 @@
+"""
+Normalização tipada dos lotes de importação
+"""
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_bool_dtype, is_float_dtype
+
+from app.core.import_config import TipoColuna
+
+
+# Textos e códigos ficam em arrays Arrow (sem objetos Python por célula)
+DTYPE_TEXTO = pd.StringDtype("pyarrow")
+
+# Booleanos vindos como texto (CSV/Parquet) ou número
+VALORES_VERDADEIROS = ("true", "1", "1.0", "s", "sim")
+
+# Conversão memoizada: datas e códigos repetem poucos valores distintos
+TIPOS_MEMOIZADOS = (TipoColuna.DATA, TipoColuna.DATA_HORA, TipoColuna.CODIGO)
+
+# Colunas object com textos (infer_dtype): passam pelo parse de texto
+INFERENCIAS_TEXTO = ("string", "mixed", "mixed-integer", "mixed-integer-float")
+
+# Datas em texto fora do ISO: padrão brasileiro (dia primeiro)
+FORMATOS_DATA_TEXTO = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+# Colunas object sem float possível (infer_dtype): nada a corrigir
+INFERENCIAS_SEM_FLOAT = ("string", "integer", "empty")
+
+# Cardinalidade estimada pelas primeiras linhas de cada coluna
+AMOSTRA_CARDINALIDADE = 10_000
+
+# Acima desta fração de valores distintos, converte célula a célula
+LIMITE_CARDINALIDADE = 0.5
+
+
+# ======================================================
+# CONVERSORES POR TIPO (VETORIZADOS)
+# ======================================================
+
+def _texto(serie: pd.Series) -> bool:
+    """
+    Coluna com valores em texto (CSV, célula de texto na planilha).
+    """
+    if isinstance(serie.dtype, pd.StringDtype):
+        return True
+
+    return serie.dtype == object and infer_dtype(serie, skipna=True) in INFERENCIAS_TEXTO
+
+
+def _converter_numerico(serie: pd.Series) -> pd.Series:
+    """
+    Sempre float64: o pd.to_numeric devolve int64 ou float64
+    conforme o restante do lote, e o hash da linha depende do dtype.
+
+    Textos com vírgula estão no padrão brasileiro ("1.234,56"):
+    os pontos (milhar) saem e a vírgula vira ponto decimal.
+    """
+    if _texto(serie):
+        texto = serie.astype(DTYPE_TEXTO).str.strip()
+        virgula = texto.str.contains(",", regex=False).fillna(False)
+
+        serie = texto.mask(
+            virgula,
+            texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+        )
+
+    return pd.to_numeric(serie, errors="coerce").astype("float64")
+
+
+def _converter_data_hora(serie: pd.Series) -> pd.Series:
+    """
+    Datas em texto: ISO 8601 ou dd/mm/aaaa [hh:mm[:ss]] (nunca o
+    mês primeiro, padrão do pd.to_datetime para "01/02/2024").
+    """
+    if not _texto(serie):
+        return pd.to_datetime(serie, errors="coerce")
+
+    texto = serie.astype(DTYPE_TEXTO).str.strip()
+    datas = pd.to_datetime(texto, format="ISO8601", errors="coerce")
+
+    for formato in FORMATOS_DATA_TEXTO:
+        pendentes = datas.isna() & texto.notna()
+
+        if not pendentes.any():
+            break
+
+        datas[pendentes] = pd.to_datetime(
+            texto[pendentes], format=formato, errors="coerce"
+        )
+
+    return datas
+
+
+def _converter_data(serie: pd.Series) -> pd.Series:
+    return _converter_data_hora(serie).dt.normalize()
+
+
+def _converter_codigo(serie: pd.Series) -> pd.Series:
+    """
+    Códigos (id, selo, os, lcto...) viram texto sem espaços.
+    Floats inteiros (efeito de NaN na leitura) perdem o ".0".
+
+    Em colunas object, o float inteiro vira int célula a célula:
+    12 e 12.0 precisam dar o mesmo texto também na conversão
+    memoizada, em que o pd.factorize já os trata como um só valor.
+    """
+    if is_float_dtype(serie):
+        preenchidos = serie.dropna()
+
+        if (preenchidos % 1 == 0).all():
+            serie = serie.astype("Int64")
+
+    elif (
+        serie.dtype == object
+        and infer_dtype(serie, skipna=True) not in INFERENCIAS_SEM_FLOAT
+    ):
+        serie = serie.map(
+            lambda valor: int(valor)
+            if valor.__class__ is float and valor.is_integer()
+            else valor
+        )
+
+    texto = serie.astype(DTYPE_TEXTO).str.strip()
+    return texto.mask((texto == "").fillna(False))
+
+
+def _converter_texto(serie: pd.Series) -> pd.Series:
+    return serie.astype(DTYPE_TEXTO)
+
+
+def _converter_booleano(serie: pd.Series) -> pd.Series:
+    if is_bool_dtype(serie):
+        return serie.fillna(False).astype(bool)
+
+    texto = serie.astype(DTYPE_TEXTO).str.strip().str.lower()
+    return texto.isin(VALORES_VERDADEIROS).fillna(False).astype(bool)
+
+
+CONVERSORES = {
+    TipoColuna.NUMERICO: _converter_numerico,
+    TipoColuna.DATA: _converter_data,
+    TipoColuna.DATA_HORA: _converter_data_hora,
+    TipoColuna.CODIGO: _converter_codigo,
+    TipoColuna.TEXTO: _converter_texto,
+    TipoColuna.BOOLEANO: _converter_booleano,
+}
+
+
+# ======================================================
+# CONVERSÃO MEMOIZADA (BAIXA CARDINALIDADE)
+# ======================================================
+
+def _baixa_cardinalidade(serie: pd.Series) -> bool:
+    amostra = serie.iloc[:AMOSTRA_CARDINALIDADE]
+
+    return (
+        len(amostra) > 0
+        and amostra.nunique(dropna=False) <= len(amostra) * LIMITE_CARDINALIDADE
+    )
+
+
+def converter_memoizado(
+    serie: pd.Series,
+    conversor: Callable[[pd.Series], pd.Series],
+    *,
+    categorica: bool = False,
+) -> pd.Series:
+    """
+    Converte apenas os valores distintos (pd.factorize) e devolve o
+    resultado às linhas pelos códigos, sem reconverter repetições.
+
+    `categorica=True` mantém o resultado como category (códigos
+    inteiros + valores únicos), para textos repetidos. O hash de uma
+    coluna category de textos é igual ao da coluna densa, então o
+    hash_linha não muda.
+    """
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    convertidos = conversor(pd.Series(unicos))
+
+    if not categorica:
+        return pd.Series(
+            convertidos.array.take(codigos, allow_fill=True),
+            index=serie.index,
+        )
+
+    # Valores distintos podem convergir (" 12" e 12 → "12") ou virar nulo
+    recodificados, categorias = pd.factorize(convertidos, use_na_sentinel=True)
+
+    # Posição extra para o código -1 (nulo): continua -1, mesmo sem valores
+    codigos = np.append(recodificados, -1)[codigos]
+
+    return pd.Series(
+        pd.Categorical.from_codes(
+            codigos,
+            dtype=pd.CategoricalDtype(pd.Index(categorias, dtype=convertidos.dtype)),
+        ),
+        index=serie.index,
+    )
+
+
+def _converter(serie: pd.Series, tipo: TipoColuna) -> pd.Series:
+    if tipo in TIPOS_MEMOIZADOS and _baixa_cardinalidade(serie):
+        return converter_memoizado(
+            serie,
+            CONVERSORES[tipo],
+            categorica=tipo == TipoColuna.CODIGO,
+        )
+
+    return CONVERSORES[tipo](serie)
+
+
+def materializar_categorias(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Colunas category de volta ao tipo dos valores. Usado antes do
+    Parquet: o schema precisa ser o mesmo em todos os lotes, e a
+    escolha categórica/densa é feita por lote.
+    """
+    tipos = {
+        coluna: df[coluna].cat.categories.dtype
+        for coluna in df.columns
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype)
+    }
+
+    return df.astype(tipos) if tipos else df
+
+
+# ======================================================
+# NORMALIZAÇÃO DE UM LOTE
+# ======================================================
+
+def normalizar_tipos(
+    df: pd.DataFrame,
+    tipos_colunas: Dict[str, TipoColuna],
+) -> pd.DataFrame:
+    """
+    Mantém apenas as colunas da especificação e converte cada uma
+    para o tipo nativo (float64, datetime64, string[pyarrow], bool).
+    Datas e códigos com muitas repetições são convertidos uma vez
+    por valor distinto; os códigos ficam como category de
+    string[pyarrow].
+
+    Nenhuma célula é convertida para objeto Python aqui: a conversão
+    para valores do banco acontece só na escrita (COPY).
+    """
+    return pd.DataFrame(
+        {
+            coluna: _converter(df[coluna], tipo)
+            for coluna, tipo in tipos_colunas.items()
+        },
+        index=df.index,
+    )
+
+
+# ======================================================
+# HASH DE CONTEÚDO DA LINHA
+# ======================================================
+
+def calcular_hash_linhas(
+    df: pd.DataFrame,
+    colunas: Sequence[str],
+) -> pd.Series:
+    """
+    Hash 64 bits do conteúdo (já tipado) de cada linha, vetorizado.
+    Gravado como BIGINT: a carga INCREMENTAL só reescreve linhas
+    cujo hash mudou.
+    """
+    hashes = pd.util.hash_pandas_object(df[list(colunas)], index=False)
+    return pd.Series(hashes.to_numpy().view("int64"), index=df.index)
@@ -0,0 +1,809 @@
+"""
+Leitura em lotes dos arquivos de importação (.xlsx, .csv, .parquet)
+"""
+import codecs
+import csv
+import os
+import posixpath
+import zipfile
+from operator import itemgetter
+from typing import Iterator, List, Optional, Sequence, Tuple
+from xml.etree import ElementTree
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+from app.core.config import settings
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:  # motor opcional: sem ele, usa o openpyxl
+    CalamineWorkbook = None
+
+
+EXTENSOES_IMPORTACAO = (".xlsx", ".csv", ".parquet")
+
+# Número (no arquivo) da primeira linha após o cabeçalho
+LINHA_INICIAL_DADOS = 2
+
+# Bloco lido por vez no CSV (bytes)
+TAMANHO_BLOCO_CSV = 16 * 1024 * 1024
+
+# Amostra do início do CSV para estimar o total de linhas (bytes)
+AMOSTRA_ESTIMATIVA_CSV = 1024 * 1024
+
+
+def _normalizar_cabecalho(cabecalho) -> List[str]:
+    """
+    Mesmo padrão do df.columns.str.lower().
+    """
+    return [
+        str(valor).strip().lower()
+        if valor is not None and str(valor).strip()
+        else f"unnamed: {i}"
+        for i, valor in enumerate(cabecalho)
+    ]
+
+
+def _indices_projecao(
+    colunas: List[str],
+    necessarias: Optional[Sequence[str]],
+) -> List[int]:
+    """
+    Posições (no cabeçalho) das colunas a decodificar.
+    Sem `necessarias`, todas.
+    """
+    if necessarias is None:
+        return list(range(len(colunas)))
+
+    necessarias = set(necessarias)
+    return [i for i, coluna in enumerate(colunas) if coluna in necessarias]
+
+
+# ======================================================
+# LEITOR DE PLANILHA EM LOTES (STREAMING)
+# ======================================================
+
+class LeitorPlanilha:
+    """
+    Lê a primeira aba de um arquivo .xlsx em modo read-only
+    e entrega DataFrames de tamanho fixo.
+
+    O arquivo nunca é carregado inteiro em memória:
+    o pico de memória depende apenas do tamanho do lote.
+
+    `colunas` (projeção): somente essas colunas entram nos lotes;
+    `self.colunas` continua sendo o cabeçalho completo.
+    """
+
+    motor = "openpyxl"
+
+    # Número da linha (no arquivo) do primeiro registro após o cabeçalho
+    _primeira_linha_dados = LINHA_INICIAL_DADOS
+
+    def __init__(
+        self,
+        caminho: str,
+        *,
+        tamanho_lote: Optional[int] = None,
+        colunas: Optional[Sequence[str]] = None,
+    ):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote or settings.IMPORT_TAMANHO_LOTE
+
+        cabecalho = self._abrir(caminho)
+        self.colunas: List[str] = _normalizar_cabecalho(cabecalho)
+
+        indices = _indices_projecao(self.colunas, colunas)
+        self.colunas_lidas = [self.colunas[i] for i in indices]
+        self._selecionar = self._seletor(indices)
+
+    @staticmethod
+    def disponivel() -> bool:
+        return True
+
+    def _abrir(self, caminho: str) -> Sequence:
+        """
+        Abre a primeira aba, prepara self._linhas e devolve o cabeçalho.
+        """
+        self._workbook = load_workbook(
+            caminho,
+            read_only=True,
+            data_only=True
+        )
+        self._planilha = self._workbook.worksheets[0]
+        self._linhas = self._planilha.iter_rows(values_only=True)
+
+        return next(self._linhas, None) or ()
+
+    @staticmethod
+    def _seletor(indices: List[int]):
+        # itemgetter com um único índice devolve o valor, não uma tupla
+        if len(indices) > 1:
+            return itemgetter(*indices)
+
+        return lambda linha: tuple(linha[i] for i in indices)
+
+    @staticmethod
+    def _vazia(linha) -> bool:
+        return all(valor is None for valor in linha)
+
+    @property
+    def linhas_estimadas(self) -> Optional[int]:
+        """
+        Pela dimensão declarada na aba (sem percorrer o arquivo).
+        None quando o arquivo não declara a dimensão.
+        """
+        total = self._planilha.max_row
+        return max(total - 1, 0) if total else None
+
+    def lotes(self, *, pular_linhas: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Gera DataFrames com até `tamanho_lote` linhas.
+        Linhas totalmente vazias são ignoradas.
+
+        O índice do DataFrame é o número da linha no arquivo
+        (cabeçalho = 1), usado no relatório de rejeições.
+
+        `pular_linhas` descarta as primeiras linhas (retomada a partir
+        de um checkpoint) sem montar DataFrames para elas.
+        """
+        total_colunas = len(self.colunas)
+        selecionar = self._selecionar
+        lote = []
+        numeros = []
+
+        vazia = self._vazia
+
+        for numero, linha in enumerate(self._linhas, start=self._primeira_linha_dados):
+            if vazia(linha):
+                continue
+
+            if pular_linhas > 0:
+                pular_linhas -= 1
+                continue
+
+            # Linhas curtas (células finais vazias) completadas com None
+            if len(linha) < total_colunas:
+                linha = linha + (None,) * (total_colunas - len(linha))
+
+            lote.append(selecionar(linha))
+            numeros.append(numero)
+
+            if len(lote) >= self.tamanho_lote:
+                yield self._montar_lote(lote, numeros)
+                lote = []
+                numeros = []
+
+        if lote:
+            yield self._montar_lote(lote, numeros)
+
+    def _montar_lote(self, lote, numeros) -> pd.DataFrame:
+        df = pd.DataFrame.from_records(lote, columns=self.colunas_lidas)
+        df.index = pd.Index(numeros, name="linha")
+        return df
+
+    def fechar(self):
+        self._workbook.close()
+
+    def __enter__(self) -> "LeitorPlanilha":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def _celula_calamine(valor):
+    """
+    Mesmos valores do openpyxl: célula vazia = None e
+    número inteiro = int (o calamine entrega tudo como float).
+    """
+    if valor == "":
+        return None
+
+    if valor.__class__ is float and valor.is_integer():
+        return int(valor)
+
+    return valor
+
+
+class LeitorPlanilhaCalamine(LeitorPlanilha):
+    """
+    Mesmo contrato do LeitorPlanilha, com o decodificador em Rust
+    (python-calamine), várias vezes mais rápido que o openpyxl.
+
+    A aba é decodificada de uma vez em memória nativa (compacta);
+    só a conversão para DataFrame continua sendo feita por lote.
+    Somente as colunas da projeção passam por _celula_calamine.
+    """
+
+    motor = "calamine"
+
+    @staticmethod
+    def disponivel() -> bool:
+        return CalamineWorkbook is not None
+
+    def _abrir(self, caminho: str) -> Sequence:
+        self._workbook = CalamineWorkbook.from_path(caminho)
+        self._planilha = self._workbook.get_sheet_by_index(0)
+
+        # A faixa lida começa na primeira célula preenchida
+        self._linha_inicial, coluna_inicial = self._planilha.start or (0, 0)
+        linhas = self._planilha.iter_rows()
+
+        if coluna_inicial:
+            preenchimento = [""] * coluna_inicial
+            linhas = (preenchimento + linha for linha in linhas)
+
+        self._linhas = linhas
+
+        # Linha 1 vazia: sem cabeçalho (recusado na pré-validação)
+        if self._linha_inicial > 0:
+            self._primeira_linha_dados = self._linha_inicial + 1
+            return ()
+
+        return [_celula_calamine(valor) for valor in next(self._linhas, None) or ()]
+
+    @staticmethod
+    def _seletor(indices: List[int]):
+        selecionar = LeitorPlanilha._seletor(indices)
+        return lambda linha: tuple(map(_celula_calamine, selecionar(linha)))
+
+    @staticmethod
+    def _vazia(linha) -> bool:
+        return all(valor == "" for valor in linha)
+
+    @property
+    def linhas_estimadas(self) -> Optional[int]:
+        total = self._linha_inicial + self._planilha.height
+        return max(total - 1, 0)
+
+
+# ======================================================
+# MOTORES DE PLANILHA (SELEÇÃO E ALTERNATIVA)
+# ======================================================
+
+# Do mais rápido para o mais lento
+MOTORES_PLANILHA = {
+    "calamine": LeitorPlanilhaCalamine,
+    "openpyxl": LeitorPlanilha,
+}
+
+
+def motores_planilha_disponiveis() -> List[str]:
+    return [
+        nome
+        for nome, leitor in MOTORES_PLANILHA.items()
+        if leitor.disponivel()
+    ]
+
+
+def cabe_no_calamine(caminho: str) -> bool:
+    """
+    O calamine decodifica a aba inteira em memória: só vale para
+    planilhas cuja dimensão declarada (linhas x colunas) não passa
+    de IMPORT_CALAMINE_MAXIMO_CELULAS. Sem dimensão, não cabe.
+    """
+    try:
+        cabecalho, linhas_estimadas = inspecionar_planilha(caminho)
+    except Exception:
+        return False
+
+    if linhas_estimadas is None:
+        return False
+
+    celulas = (linhas_estimadas + 1) * max(len(cabecalho), 1)
+    return celulas <= settings.IMPORT_CALAMINE_MAXIMO_CELULAS
+
+
+def ordem_motores_planilha(
+    motor: Optional[str] = None,
+    *,
+    caminho: Optional[str] = None,
+) -> List[str]:
+    """
+    Ordem de tentativa: o motor pedido (padrão IMPORT_MOTOR_EXCEL)
+    e, depois, os demais instalados, do mais rápido ao mais lento.
+
+    "auto" = o mais rápido instalado, se a planilha `caminho` couber
+    no calamine (cabe_no_calamine); senão, só o openpyxl read-only,
+    que lê em fluxo (sem alternativa que carregue a aba inteira).
+    """
+    motor = (motor or settings.IMPORT_MOTOR_EXCEL).strip().lower()
+
+    if motor != "auto" and motor not in MOTORES_PLANILHA:
+        raise ValueError(f"Motor de planilha desconhecido: {motor}")
+
+    if motor == "auto" and caminho is not None and not cabe_no_calamine(caminho):
+        return ["openpyxl"]
+
+    disponiveis = motores_planilha_disponiveis()
+
+    if motor in disponiveis:
+        disponiveis.remove(motor)
+        disponiveis.insert(0, motor)
+
+    return disponiveis
+
+
+def abrir_planilha(
+    caminho: str,
+    *,
+    motor: Optional[str] = None,
+    tamanho_lote: Optional[int] = None,
+    colunas: Optional[Sequence[str]] = None,
+) -> LeitorPlanilha:
+    """
+    Abre o .xlsx com o primeiro motor da ordem que aceitar o arquivo.
+    O último (openpyxl) sempre é tentado e propaga o próprio erro.
+    """
+    *alternativos, ultimo = ordem_motores_planilha(motor, caminho=caminho)
+
+    for nome in alternativos:
+        try:
+            return MOTORES_PLANILHA[nome](
+                caminho, tamanho_lote=tamanho_lote, colunas=colunas
+            )
+        except Exception:
+            # Recurso do arquivo não suportado pelo motor: próximo
+            continue
+
+    return MOTORES_PLANILHA[ultimo](
+        caminho, tamanho_lote=tamanho_lote, colunas=colunas
+    )
+
+
+# ======================================================
+# LEITORES COLUNARES (PYARROW)
+# ======================================================
+
+class _LeitorArrow:
+    """
+    Base dos leitores CSV/Parquet: o pyarrow entrega RecordBatches,
+    reagrupados aqui em DataFrames de `tamanho_lote` linhas.
+    Textos permanecem em arrays Arrow (string[pyarrow]).
+    """
+
+    colunas: List[str]
+    motor = "pyarrow"
+
+    def __init__(
+        self,
+        caminho: str,
+        *,
+        tamanho_lote: Optional[int] = None,
+        colunas: Optional[Sequence[str]] = None,
+    ):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote or settings.IMPORT_TAMANHO_LOTE
+        self._necessarias = colunas
+
+    def _projetar(self):
+        """
+        Chamado pelas subclasses depois de lerem o cabeçalho.
+        """
+        self._indices = _indices_projecao(self.colunas, self._necessarias)
+        self.colunas_lidas = [self.colunas[i] for i in self._indices]
+
+    @property
+    def linhas_estimadas(self) -> Optional[int]:
+        return None
+
+    def _batches(self) -> Iterator[pa.RecordBatch]:
+        raise NotImplementedError
+
+    def _para_dataframe(self, tabela: pa.Table, inicio: int) -> pd.DataFrame:
+        df = tabela.to_pandas(
+            types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get
+        )
+        df.columns = self.colunas_lidas
+        df.index = pd.RangeIndex(inicio, inicio + len(df), name="linha")
+
+        # Como _vazia das planilhas: só a linha vazia no arquivo inteiro
+        # é ignorada. Com projeção, a linha vazia nas colunas lidas pode
+        # ter dados nas outras: segue para a validação, que a conta e
+        # rejeita com o motivo (nunca some sem relatório)
+        if len(self.colunas_lidas) == len(self.colunas):
+            df = df.dropna(how="all")
+
+        return df
+
+    def lotes(self, *, pular_linhas: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Mesmo contrato de LeitorPlanilha.lotes (índice = linha no arquivo).
+        """
+        pendentes = []
+        total_pendente = 0
+        proxima_linha = LINHA_INICIAL_DADOS
+
+        for batch in self._batches():
+            df = self._para_dataframe(
+                pa.Table.from_batches([batch]),
+                proxima_linha,
+            )
+            proxima_linha += batch.num_rows
+
+            if pular_linhas > 0:
+                descartadas = min(pular_linhas, len(df))
+                df = df.iloc[descartadas:]
+                pular_linhas -= descartadas
+
+            if df.empty:
+                continue
+
+            pendentes.append(df)
+            total_pendente += len(df)
+
+            while total_pendente >= self.tamanho_lote:
+                acumulado = pd.concat(pendentes)
+
+                yield acumulado.iloc[:self.tamanho_lote]
+
+                resto = acumulado.iloc[self.tamanho_lote:]
+                pendentes = [resto] if not resto.empty else []
+                total_pendente = len(resto)
+
+        if total_pendente:
+            yield pd.concat(pendentes)
+
+    def fechar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def _codificacao_csv(caminho: str) -> str:
+    """
+    UTF-8 quando o início do arquivo decodifica como UTF-8;
+    senão Windows-1252 (CSV salvo pelo Excel em português).
+    """
+    with open(caminho, "rb") as arquivo:
+        amostra = arquivo.read(AMOSTRA_ESTIMATIVA_CSV)
+        completo = not arquivo.read(1)
+
+    try:
+        # Amostra parcial pode cortar um caractere multibyte no fim
+        codecs.getincrementaldecoder("utf-8")().decode(amostra, final=completo)
+    except UnicodeDecodeError:
+        return "cp1252"
+
+    return "utf-8"
+
+
+class LeitorCsv(_LeitorArrow):
+    """
+    CSV com separador detectado no cabeçalho (; , tab |).
+    Todas as colunas são lidas como texto: a tipagem é feita
+    pela normalização, como nas planilhas (zeros à esquerda
+    de códigos são preservados). Colunas fora da projeção
+    não são convertidas (include_columns).
+
+    Codificação: UTF-8 (com ou sem BOM) ou Windows-1252,
+    detectada pelo início do arquivo (_codificacao_csv).
+    Bytes inválidos na codificação detectada viram
+    BusinessException (INVALID_ENCODING).
+    """
+
+    def __init__(self, caminho: str, **kwargs):
+        super().__init__(caminho, **kwargs)
+
+        self.codificacao = _codificacao_csv(caminho)
+
+        with open(caminho, "rb") as arquivo:
+            primeira_linha = arquivo.readline()
+
+        try:
+            primeira_linha = primeira_linha.decode(
+                "utf-8-sig" if self.codificacao == "utf-8" else self.codificacao
+            )
+        except UnicodeDecodeError as e:
+            raise BusinessException(ErrorCode.INVALID_ENCODING, detail=str(e))
+
+        try:
+            self._separador = csv.Sniffer().sniff(
+                primeira_linha, delimiters=";,\t|"
+            ).delimiter
+        except csv.Error:
+            self._separador = ","
+
+        cabecalho = next(csv.reader([primeira_linha], delimiter=self._separador), [])
+        self.colunas = _normalizar_cabecalho(cabecalho)
+        self._projetar()
+
+    @property
+    def linhas_estimadas(self) -> Optional[int]:
+        """
+        Tamanho do arquivo / tamanho médio das linhas do início.
+        """
+        tamanho = os.path.getsize(self.caminho)
+
+        with open(self.caminho, "rb") as arquivo:
+            amostra = arquivo.read(AMOSTRA_ESTIMATIVA_CSV)
+
+        quebras = amostra.count(b"\n")
+
+        if not quebras:
+            return 0
+
+        if len(amostra) >= tamanho:
+            linhas = quebras + (not amostra.endswith(b"\n"))
+        else:
+            linhas = round(tamanho * quebras / len(amostra))
+
+        return max(linhas - 1, 0)
+
+    def _batches(self) -> Iterator[pa.RecordBatch]:
+        if not self.colunas:
+            return
+
+        nomes = [f"c{i}" for i in range(len(self.colunas))]
+        lidas = [nomes[i] for i in self._indices]
+
+        try:
+            leitor = pa_csv.open_csv(
+                self.caminho,
+                read_options=pa_csv.ReadOptions(
+                    column_names=nomes,
+                    skip_rows=1,
+                    block_size=TAMANHO_BLOCO_CSV,
+                    # UTF-8 é lido direto; outras passam por transcodificação
+                    encoding="utf8" if self.codificacao == "utf-8" else self.codificacao,
+                ),
+                parse_options=pa_csv.ParseOptions(delimiter=self._separador),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=lidas,
+                    column_types={nome: pa.string() for nome in lidas},
+                    strings_can_be_null=True,
+                ),
+            )
+
+            yield from leitor
+
+        # UTF-8 inválido depois da amostra, ou byte sem mapeamento no cp1252
+        except UnicodeDecodeError as e:
+            raise BusinessException(ErrorCode.INVALID_ENCODING, detail=str(e))
+        except pa.ArrowInvalid as e:
+            if "UTF8" not in str(e):
+                raise
+            raise BusinessException(ErrorCode.INVALID_ENCODING, detail=str(e))
+
+
+class LeitorParquet(_LeitorArrow):
+    """
+    Parquet lido por row groups, sem carregar o arquivo inteiro.
+    Somente as colunas da projeção são decodificadas.
+    """
+
+    def __init__(self, caminho: str, **kwargs):
+        super().__init__(caminho, **kwargs)
+
+        self._arquivo = pq.ParquetFile(caminho)
+        self._nomes = self._arquivo.schema_arrow.names
+        self.colunas = _normalizar_cabecalho(self._nomes)
+        self._projetar()
+
+    @property
+    def linhas_estimadas(self) -> Optional[int]:
+        return self._arquivo.metadata.num_rows
+
+    def _batches(self) -> Iterator[pa.RecordBatch]:
+        yield from self._arquivo.iter_batches(
+            batch_size=self.tamanho_lote,
+            columns=[self._nomes[i] for i in self._indices],
+        )
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+# ======================================================
+# INSPEÇÃO RÁPIDA DO .XLSX (CABEÇALHO + DIMENSÃO)
+# ======================================================
+
+_NS_PLANILHA = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_RELACAO = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PACOTE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def _indice_coluna(referencia: str) -> int:
+    """
+    "C7" -> 2 (base zero).
+    """
+    indice = 0
+
+    for letra in referencia:
+        if letra.isdigit():
+            break
+        indice = indice * 26 + ord(letra.upper()) - 64
+
+    return indice - 1
+
+
+def _texto_celula(elemento) -> str:
+    """
+    Texto de <si>/<is> (inclui trechos com formatação <r><t>).
+    """
+    return "".join(
+        parte.text or ""
+        for parte in elemento.iter(f"{_NS_PLANILHA}t")
+    )
+
+
+def _caminho_primeira_aba(arquivo_zip: zipfile.ZipFile) -> str:
+    workbook = ElementTree.fromstring(arquivo_zip.read("xl/workbook.xml"))
+    aba = workbook.find(f"{_NS_PLANILHA}sheets/{_NS_PLANILHA}sheet")
+    relacao_id = aba.get(f"{_NS_RELACAO}id")
+
+    relacoes = ElementTree.fromstring(
+        arquivo_zip.read("xl/_rels/workbook.xml.rels")
+    )
+
+    for relacao in relacoes.iter(f"{_NS_PACOTE}Relationship"):
+        if relacao.get("Id") == relacao_id:
+            alvo = relacao.get("Target")
+            if alvo.startswith("/"):
+                return alvo.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", alvo))
+
+    raise KeyError(relacao_id)
+
+
+def _textos_compartilhados(
+    arquivo_zip: zipfile.ZipFile,
+    indices: set,
+) -> dict:
+    """
+    Somente as strings compartilhadas pedidas; a leitura para no
+    maior índice (as do cabeçalho costumam ser as primeiras).
+    """
+    textos = {}
+
+    if not indices or "xl/sharedStrings.xml" not in arquivo_zip.namelist():
+        return textos
+
+    ultimo = max(indices)
+
+    with arquivo_zip.open("xl/sharedStrings.xml") as xml:
+        posicao = 0
+
+        for _, elemento in ElementTree.iterparse(xml):
+            if elemento.tag != f"{_NS_PLANILHA}si":
+                continue
+
+            if posicao in indices:
+                textos[posicao] = _texto_celula(elemento)
+
+            if posicao >= ultimo:
+                break
+
+            posicao += 1
+            elemento.clear()
+
+    return textos
+
+
+def inspecionar_planilha(caminho: str) -> Tuple[List[str], Optional[int]]:
+    """
+    Cabeçalho (normalizado) e linhas estimadas da primeira aba,
+    lendo do XML só a dimensão e a primeira linha.
+
+    Ao contrário do load_workbook (mesmo em read-only), não carrega
+    a tabela inteira de strings compartilhadas.
+    """
+    with zipfile.ZipFile(caminho) as arquivo_zip:
+        dimensao = None
+        celulas = []
+
+        with arquivo_zip.open(_caminho_primeira_aba(arquivo_zip)) as xml:
+            for evento, elemento in ElementTree.iterparse(xml, events=("start", "end")):
+                if evento == "start" and elemento.tag == f"{_NS_PLANILHA}dimension":
+                    dimensao = elemento.get("ref")
+
+                elif evento == "end" and elemento.tag == f"{_NS_PLANILHA}row":
+                    # Primeira linha fora da linha 1: cabeçalho vazio
+                    if elemento.get("r", "1") == "1":
+                        celulas = list(elemento.iter(f"{_NS_PLANILHA}c"))
+                    break
+
+        indices_compartilhados = {
+            int(celula.findtext(f"{_NS_PLANILHA}v"))
+            for celula in celulas
+            if celula.get("t") == "s"
+        }
+        compartilhados = _textos_compartilhados(arquivo_zip, indices_compartilhados)
+
+    valores = {}
+
+    for posicao, celula in enumerate(celulas):
+        referencia = celula.get("r")
+        indice = _indice_coluna(referencia) if referencia else posicao
+        tipo = celula.get("t")
+
+        if tipo == "s":
+            valor = compartilhados.get(int(celula.findtext(f"{_NS_PLANILHA}v")))
+        elif tipo == "inlineStr":
+            valor = _texto_celula(celula)
+        else:
+            valor = celula.findtext(f"{_NS_PLANILHA}v")
+
+        valores[indice] = valor
+
+    total_colunas = max(valores) + 1 if valores else 0
+    linhas_estimadas = None
+
+    # "A1:M1000" -> 13 colunas, 999 linhas de dados
+    if dimensao:
+        final = dimensao.split(":")[-1]
+        total_colunas = max(total_colunas, _indice_coluna(final) + 1)
+        numero = "".join(letra for letra in final if letra.isdigit())
+        linhas_estimadas = max(int(numero) - 1, 0) if numero else None
+
+    if not valores:
+        return [], linhas_estimadas
+
+    cabecalho = [valores.get(i) for i in range(total_colunas)]
+    return _normalizar_cabecalho(cabecalho), linhas_estimadas
+
+
+# ======================================================
+# SELEÇÃO PELO FORMATO
+# ======================================================
+
+LEITORES = {
+    ".xlsx": abrir_planilha,
+    ".csv": LeitorCsv,
+    ".parquet": LeitorParquet,
+}
+
+
+def abrir_leitor(
+    caminho: str,
+    *,
+    tamanho_lote: Optional[int] = None,
+    colunas: Optional[Sequence[str]] = None,
+):
+    """
+    Leitor em lotes adequado à extensão do arquivo.
+
+    `colunas`: projeção (nomes normalizados). O cabeçalho é lido
+    primeiro e só essas colunas são decodificadas nos lotes.
+    No .xlsx, o motor segue IMPORT_MOTOR_EXCEL (abrir_planilha).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao not in LEITORES:
+        raise ValueError(f"Formato de arquivo não suportado: {extensao}")
+
+    return LEITORES[extensao](caminho, tamanho_lote=tamanho_lote, colunas=colunas)
+
+
+def inspecionar_arquivo(caminho: str) -> Tuple[List[str], Optional[int]]:
+    """
+    Cabeçalho normalizado e linhas estimadas, sem decodificar dados.
+
+    No .xlsx, lê direto do XML; se o arquivo fugir do layout
+    esperado, usa o leitor normal (read-only) como alternativa.
+    """
+    if os.path.splitext(caminho)[1].lower() == ".xlsx":
+        try:
+            return inspecionar_planilha(caminho)
+        except (
+            KeyError,
+            AttributeError,
+            ValueError,
+            zipfile.BadZipFile,
+            ElementTree.ParseError,
+        ):
+            pass
+
+    with abrir_leitor(caminho, colunas=()) as leitor:
+        return leitor.colunas, leitor.linhas_estimadas
@@ -0,0 +1,254 @@
+"""
+Rejeições de linhas na importação (motivo por linha, vetorizado)
+"""
+import gzip
+import os
+import shutil
+from collections import Counter
+from enum import Enum
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+
+
+class MotivoRejeicao(str, Enum):
+    CAMPO_OBRIGATORIO = "CAMPO_OBRIGATORIO"   # célula vazia
+    VALOR_INVALIDO = "VALOR_INVALIDO"         # preenchida, mas não converte
+    CHAVE_DUPLICADA = "CHAVE_DUPLICADA"       # chave repetida no arquivo
+
+
+COLUNAS_RELATORIO = ["linha", "motivo", "coluna", "valor"]
+
+
+# ======================================================
+# IDENTIFICAÇÃO DAS LINHAS REJEITADAS
+# ======================================================
+
+def identificar_rejeicoes(
+    bruto: pd.DataFrame,
+    tipado: pd.DataFrame,
+    campos_obrigatorios: Iterable[str],
+    renomear: Mapping[str, str],
+) -> pd.DataFrame:
+    """
+    Uma linha por linha rejeitada (índice = linha no arquivo), com o
+    motivo e a coluna do primeiro campo obrigatório que falhou.
+
+    `bruto` é o lote como lido; `tipado` já convertido e renomeado.
+    """
+    origem = {destino: coluna for coluna, destino in renomear.items()}
+
+    motivo = pd.Series(pd.NA, index=tipado.index, dtype="string")
+    coluna_falha = pd.Series(pd.NA, index=tipado.index, dtype="string")
+    valor = pd.Series(pd.NA, index=tipado.index, dtype="string")
+
+    for campo in campos_obrigatorios:
+        vazio = tipado[campo].isna()
+
+        if not vazio.any():
+            continue
+
+        original = bruto[origem.get(campo, campo)]
+        texto = original.astype("string").str.strip()
+        preenchido = texto.notna() & (texto != "")
+
+        pendente = motivo.isna() & vazio
+
+        motivo = motivo.mask(
+            pendente,
+            np.where(
+                preenchido.fillna(False).to_numpy(dtype=bool),
+                MotivoRejeicao.VALOR_INVALIDO.value,
+                MotivoRejeicao.CAMPO_OBRIGATORIO.value,
+            ),
+        )
+        coluna_falha = coluna_falha.mask(pendente, campo)
+        valor = valor.mask(pendente, texto)
+
+    rejeitadas = motivo.notna()
+
+    return pd.DataFrame(
+        {
+            "motivo": motivo[rejeitadas],
+            "coluna": coluna_falha[rejeitadas],
+            "valor": valor[rejeitadas],
+        }
+    )
+
+
+class DetectorDuplicidade:
+    """
+    Chaves repetidas entre lotes do mesmo arquivo, guardando apenas
+    o hash 64 bits de cada chave (array ordenado, sem objetos Python).
+    """
+
+    def __init__(self):
+        self._vistos = np.empty(0, dtype="uint64")
+
+    def duplicadas(self, df: pd.DataFrame, colunas: Iterable[str]) -> pd.Series:
+        hashes = pd.util.hash_pandas_object(df[list(colunas)], index=False)
+        valores = hashes.to_numpy()
+
+        repetidas = hashes.duplicated().to_numpy() | np.isin(valores, self._vistos)
+        self._vistos = np.union1d(self._vistos, valores)
+
+        return pd.Series(repetidas, index=df.index)
+
+
+# ======================================================
+# RELATÓRIO DE REJEIÇÕES (CSV COMPACTADO POR LOG)
+# ======================================================
+
+def caminho_relatorio_rejeicoes(
+    log_id: int,
+    tipo_arquivo: Optional[str] = None,
+) -> str:
+    """
+    Pacotes têm um relatório por tipo de arquivo.
+    """
+    sufixo = f"_{tipo_arquivo}" if tipo_arquivo else ""
+
+    return os.path.join(
+        os.path.abspath(settings.IMPORT_RELATORIOS_DIR),
+        f"rejeicoes_{log_id}{sufixo}.csv.gz",
+    )
+
+
+def _caminho_pendente(caminho: str) -> str:
+    return caminho + ".pendente"
+
+
+def _publicar_pendente(caminho: str):
+    pendente = _caminho_pendente(caminho)
+
+    if not os.path.exists(pendente):
+        return
+
+    if not os.path.exists(caminho):
+        with gzip.open(caminho, "wt", encoding="utf-8", newline="") as arquivo:
+            arquivo.write(",".join(COLUNAS_RELATORIO) + "\n")
+
+    # Membros gzip concatenados formam um gzip válido
+    with open(pendente, "rb") as origem, open(caminho, "ab") as destino:
+        shutil.copyfileobj(origem, destino)
+
+    os.remove(pendente)
+
+
+def _descartar_pendente(caminho: str):
+    pendente = _caminho_pendente(caminho)
+
+    if os.path.exists(pendente):
+        os.remove(pendente)
+
+
+def publicar_relatorio_pendente(log_id: int, tipo_arquivo: Optional[str] = None):
+    """
+    Anexa ao relatório do log as rejeições ainda pendentes
+    (chamada depois do COMMIT dos dados correspondentes).
+    """
+    _publicar_pendente(caminho_relatorio_rejeicoes(log_id, tipo_arquivo))
+
+
+def descartar_relatorio_pendente(log_id: int, tipo_arquivo: Optional[str] = None):
+    """
+    Remove as rejeições pendentes (dados não commitados).
+    """
+    _descartar_pendente(caminho_relatorio_rejeicoes(log_id, tipo_arquivo))
+
+
+class RelatorioRejeicoes:
+    """
+    Relatório de rejeições de um log (CSV compactado).
+
+    `registrar` acumula as rejeições do lote; `descarregar` tira o
+    acumulado da memória para um arquivo pendente; `publicar` (depois
+    do COMMIT dos dados) anexa o pendente ao relatório e `descartar`
+    (rollback) o remove. Assim o relatório nunca lista linhas de
+    lotes desfeitos.
+
+    `continuar=True` (retomada) acrescenta ao relatório existente,
+    partindo de `total_anterior` rejeições.
+    O arquivo só é criado se houver rejeição.
+    """
+
+    def __init__(
+        self,
+        log_id: int,
+        *,
+        tipo_arquivo: Optional[str] = None,
+        continuar: bool = False,
+        total_anterior: int = 0,
+    ):
+        self.caminho = caminho_relatorio_rejeicoes(log_id, tipo_arquivo)
+        self.por_motivo: Counter = Counter()
+        self._total_anterior = total_anterior if continuar else 0
+        self._pendentes: List[pd.DataFrame] = []
+        self._nao_publicadas: Counter = Counter()
+
+        # Pendente de uma execução interrompida: dados não commitados
+        _descartar_pendente(self.caminho)
+
+        # Relatório de uma execução anterior do mesmo log
+        if not continuar and os.path.exists(self.caminho):
+            os.remove(self.caminho)
+
+    @property
+    def total(self) -> int:
+        return self._total_anterior + sum(self.por_motivo.values())
+
+    def registrar(self, rejeicoes: pd.DataFrame):
+        if rejeicoes.empty:
+            return
+
+        contagem = rejeicoes["motivo"].value_counts().to_dict()
+
+        self._pendentes.append(rejeicoes)
+        self.por_motivo.update(contagem)
+        self._nao_publicadas.update(contagem)
+
+    def descarregar(self):
+        """
+        Tira as rejeições da memória (arquivo pendente, ainda fora
+        do relatório).
+        """
+        if not self._pendentes:
+            return
+
+        pendente = _caminho_pendente(self.caminho)
+        os.makedirs(os.path.dirname(pendente), exist_ok=True)
+
+        # Cada descarga é um membro gzip anexado (formato válido)
+        with gzip.open(pendente, "at", encoding="utf-8", newline="") as arquivo:
+            for rejeicoes in self._pendentes:
+                rejeicoes.rename_axis("linha").reset_index()[COLUNAS_RELATORIO].to_csv(
+                    arquivo,
+                    index=False,
+                    header=False,
+                )
+
+        self._pendentes = []
+
+    def publicar(self):
+        """
+        Rejeições dos lotes já commitados entram no relatório.
+        """
+        self.descarregar()
+        _publicar_pendente(self.caminho)
+        self._nao_publicadas.clear()
+
+    def descartar(self):
+        """
+        Rejeições de lotes não commitados (rollback).
+        """
+        self.por_motivo.subtract(self._nao_publicadas)
+        self._nao_publicadas.clear()
+        self._pendentes = []
+
+        _descartar_pendente(self.caminho)
+
+    def resumo(self) -> Dict[str, int]:
+        return {motivo: total for motivo, total in self.por_motivo.items() if total}
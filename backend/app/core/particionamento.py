@@ -0,0 +1,374 @@
+"""
+Partições por contrato das tabelas data_pr e troca atômica (INITIAL)
+
+Manutenção (cria as partições de todos os contratos cadastrados):
+    python -m app.core.particionamento
+    python -m app.core.particionamento --contrato <contrato_id>
+    python -m app.core.particionamento --futuras [--meses N]
+"""
+import argparse
+import logging
+import threading
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import engine
+
+
+logger = logging.getLogger(__name__)
+
+_parar_manutencao = threading.Event()
+
+
+# ======================================================
+# CRIAÇÃO DE PARTIÇÕES
+# ======================================================
+
+def criar_particoes_contrato(
+    conn: Connection,
+    contrato_id: str,
+    *,
+    meses: Optional[int] = None,
+) -> int:
+    """
+    Garante as partições do contrato em os_lanc, os_selo, his_selo
+    e his_selo_detalhe_pr (idempotente; sem efeito antes do script 08,
+    que cria a função data_pr.criar_particoes_contrato), com o mês
+    atual + `meses` futuros de his_selo_detalhe_pr (padrão
+    PARTICOES_MESES_FUTUROS). Retorna quantas partições mensais
+    foram criadas.
+    """
+    existe = conn.execute(
+        text("SELECT to_regproc('data_pr.criar_particoes_contrato') IS NOT NULL")
+    ).scalar()
+
+    if not existe:
+        return 0
+
+    conn.execute(
+        text("SELECT data_pr.criar_particoes_contrato(:contrato_id)"),
+        {"contrato_id": contrato_id}
+    )
+    return criar_particoes_mensais(
+        conn,
+        contrato_id=contrato_id,
+        meses=meses_futuros(meses),
+    )
+
+
+def criar_particoes_todos_contratos() -> List[str]:
+    """
+    Manutenção: partições de todos os contratos cadastrados.
+    """
+    with engine.begin() as conn:
+        contratos = conn.execute(
+            text("SELECT contrato_id FROM control.contratos ORDER BY contrato_id")
+        ).scalars().all()
+
+        for contrato_id in contratos:
+            criar_particoes_contrato(conn, contrato_id)
+
+    return list(contratos)
+
+
+# ======================================================
+# PARTIÇÕES MENSAIS (HIS_SELO_DETALHE_PR) — script 09
+# ======================================================
+
+def _somar_meses(data: date, meses: int) -> date:
+    total = data.year * 12 + data.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def criar_particoes_mensais(
+    conn: Connection,
+    *,
+    contrato_id: str,
+    meses: Iterable[date],
+) -> int:
+    """
+    Garante as partições mensais do contrato para os meses
+    informados (qualquer dia do mês). Retorna quantas foram criadas
+    (0 antes do script 09).
+    """
+    existe = conn.execute(
+        text("SELECT to_regproc('data_pr.criar_particoes_mensais_detalhe') IS NOT NULL")
+    ).scalar()
+
+    if not existe:
+        return 0
+
+    criadas = 0
+
+    for mes in sorted({date(m.year, m.month, 1) for m in meses}):
+        criadas += conn.execute(
+            text("""
+                SELECT data_pr.criar_particoes_mensais_detalhe(
+                    :contrato_id, :mes, :mes
+                )
+            """),
+            {"contrato_id": contrato_id, "mes": mes}
+        ).scalar() or 0
+
+    return criadas
+
+
+def meses_futuros(meses: Optional[int] = None) -> List[date]:
+    """
+    Mês atual + `meses` seguintes (padrão PARTICOES_MESES_FUTUROS).
+    """
+    meses = settings.PARTICOES_MESES_FUTUROS if meses is None else meses
+    inicio = date.today().replace(day=1)
+    return [_somar_meses(inicio, i) for i in range(meses + 1)]
+
+
+def criar_particoes_futuras(meses: Optional[int] = None) -> int:
+    """
+    Job de manutenção: mês atual + `meses` seguintes para todos
+    os contratos (padrão PARTICOES_MESES_FUTUROS).
+    """
+    with engine.connect() as conn:
+        contratos = conn.execute(
+            text("SELECT contrato_id FROM control.contratos ORDER BY contrato_id")
+        ).scalars().all()
+
+    criadas = 0
+
+    # Uma transação curta por contrato
+    for contrato_id in contratos:
+        with engine.begin() as conn:
+            criadas += criar_particoes_contrato(conn, contrato_id, meses=meses)
+
+    return criadas
+
+
+def _laco_manutencao():
+    while not _parar_manutencao.is_set():
+        try:
+            criadas = criar_particoes_futuras()
+
+            if criadas:
+                logger.info(
+                    "Manutenção de partições: %s partição(ões) criada(s)", criadas
+                )
+
+        except Exception:
+            logger.exception("Falha na manutenção de partições")
+
+        _parar_manutencao.wait(settings.PARTICOES_INTERVALO_HORAS * 3600)
+
+
+def iniciar_manutencao_particoes():
+    """
+    Executa o job na subida da API e a cada PARTICOES_INTERVALO_HORAS.
+    """
+    _parar_manutencao.clear()
+
+    threading.Thread(
+        target=_laco_manutencao,
+        name="manutencao-particoes",
+        daemon=True,
+    ).start()
+
+
+def encerrar_manutencao_particoes():
+    _parar_manutencao.set()
+
+
+# ======================================================
+# LOCALIZAÇÃO DA PARTIÇÃO DO CONTRATO
+# ======================================================
+
+def obter_particao_contrato(
+    conn: Connection,
+    *,
+    tabela: str,
+    contrato_id: str,
+) -> Optional[Tuple[str, str]]:
+    """
+    (schema, nome) da partição LIST da tabela para o contrato,
+    ou None se a tabela não for particionada por contrato.
+    """
+    row = conn.execute(
+        text("""
+            SELECT n.nspname, c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE i.inhparent = CAST(:tabela AS regclass)
+              AND pg_get_expr(c.relpartbound, c.oid)
+                  = format('FOR VALUES IN (%L)', CAST(:contrato_id AS text))
+        """),
+        {"tabela": tabela, "contrato_id": contrato_id}
+    ).first()
+
+    return (row[0], row[1]) if row else None
+
+
+def _nome_tabela_nova(particao: Tuple[str, str]) -> str:
+    schema, nome = particao
+    return f"{schema}.{nome}_nova"
+
+
+# ======================================================
+# TROCA DE PARTIÇÃO (CARGA INITIAL SEM DELETE)
+# ======================================================
+
+def preparar_tabela_troca(
+    conn: Connection,
+    *,
+    particao: Tuple[str, str],
+    contrato_id: str,
+    recriar: bool = True,
+) -> Optional[str]:
+    """
+    Cria a tabela (vazia) que substituirá a partição do contrato:
+    mesma estrutura e índices. Os dados dos OUTROS sistemas de
+    origem do contrato (que a carga não substitui) são copiados
+    somente na troca (trocar_particao), com os escritores bloqueados.
+
+    A CHECK de contrato_id evita a varredura de validação
+    no ATTACH PARTITION.
+
+    `recriar=False` (retomada) reaproveita a tabela existente;
+    retorna None se ela não existir.
+    """
+    schema, nome = particao
+    nova = _nome_tabela_nova(particao)
+
+    if not recriar:
+        existe = conn.execute(
+            text("SELECT to_regclass(:nova) IS NOT NULL"),
+            {"nova": nova}
+        ).scalar()
+        return nova if existe else None
+
+    conn.execute(text(f"DROP TABLE IF EXISTS {nova}"))
+    conn.execute(text(f"""
+        CREATE TABLE {nova}
+        (LIKE {schema}.{nome} INCLUDING ALL)
+    """))
+    conn.execute(
+        text(f"""
+            ALTER TABLE {nova}
+            ADD CONSTRAINT {nome}_nova_contrato
+            CHECK (contrato_id IS NOT NULL AND contrato_id = '{_literal(contrato_id)}')
+        """)
+    )
+
+    return nova
+
+
+def trocar_particao(
+    conn: Connection,
+    *,
+    tabela: str,
+    particao: Tuple[str, str],
+    contrato_id: str,
+    sistema_origem_id: int | None,
+):
+    """
+    Substitui a partição do contrato pela tabela nova.
+
+    Executa na transação da importação e nenhuma tupla morta é
+    gerada (a partição antiga é descartada inteira).
+
+    Locks, mantidos até o COMMIT:
+
+    - SHARE ROW EXCLUSIVE na partição bloqueia os escritores (e outra
+      troca do mesmo contrato): os dados dos outros sistemas de
+      origem são copiados já com a partição congelada, e nada gravado
+      nela se perde na troca;
+    - o DETACH PARTITION pega ACCESS EXCLUSIVE na tabela inteira:
+      daí até o COMMIT, toda leitura da tabela (de qualquer contrato)
+      espera. Por isso a troca deve ser o último passo antes do
+      COMMIT, e a espera pelos locks é limitada por
+      IMPORT_LOCK_TIMEOUT_TROCA_MS: excedida, a importação falha
+      (rollback) em vez de enfileirar os leitores atrás dela.
+    """
+    schema, nome = particao
+    nova = _nome_tabela_nova(particao)
+    contrato = _literal(contrato_id)
+
+    # SET não aceita parâmetros; vale até o fim da transação
+    conn.execute(
+        text(f"SET LOCAL lock_timeout = '{int(settings.IMPORT_LOCK_TIMEOUT_TROCA_MS)}ms'")
+    )
+    conn.execute(text(f"LOCK TABLE {schema}.{nome} IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(
+        text(f"""
+            INSERT INTO {nova}
+            SELECT *
+            FROM {schema}.{nome}
+            WHERE sistema_origem_id IS DISTINCT FROM :sistema_origem_id
+        """),
+        {"sistema_origem_id": sistema_origem_id}
+    )
+
+    conn.execute(text(f"ALTER TABLE {tabela} DETACH PARTITION {schema}.{nome}"))
+    conn.execute(text(f"DROP TABLE {schema}.{nome}"))
+    conn.execute(text(f"ALTER TABLE {nova} RENAME TO {nome}"))
+    conn.execute(text(f"""
+        ALTER TABLE {tabela}
+        ATTACH PARTITION {schema}.{nome}
+        FOR VALUES IN ('{contrato}')
+    """))
+    conn.execute(text(f"""
+        ALTER TABLE {schema}.{nome}
+        DROP CONSTRAINT {nome}_nova_contrato
+    """))
+
+
+def _literal(valor: str) -> str:
+    """
+    DDL não aceita parâmetros: escapa o literal manualmente.
+    """
+    return str(valor).replace("'", "''")
+
+
+# ======================================================
+# EXECUÇÃO VIA LINHA DE COMANDO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cria as partições por contrato das tabelas data_pr"
+    )
+    parser.add_argument(
+        "--contrato",
+        help="Somente este contrato (padrão: todos os cadastrados)"
+    )
+    parser.add_argument(
+        "--futuras",
+        action="store_true",
+        help="Cria também as partições mensais futuras de his_selo_detalhe_pr"
+    )
+    parser.add_argument(
+        "--meses",
+        type=int,
+        default=None,
+        help="Meses futuros (padrão: PARTICOES_MESES_FUTUROS)"
+    )
+    args = parser.parse_args()
+
+    if args.futuras:
+        criadas = criar_particoes_futuras(args.meses)
+        print(f"Partições mensais criadas: {criadas}")
+        return
+
+    if args.contrato:
+        with engine.begin() as conn:
+            criar_particoes_contrato(conn, args.contrato)
+        print(f"Partições verificadas para o contrato {args.contrato}")
+        return
+
+    contratos = criar_particoes_todos_contratos()
+    print(f"Partições verificadas para {len(contratos)} contrato(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,18 @@ SUCCESS_CATALOG = {
     SuccessCode.IMPORT_NO_DATA: {
         "message": "Arquivo processado, mas nenhum registro válido foi encontrado"
     },
+    SuccessCode.IMPORT_QUEUED: {
+        "message": "Importação enfileirada para processamento"
+    },
+    SuccessCode.IMPORT_STATUS: {
+        "message": "Status da importação consultado com sucesso"
+    },
+    SuccessCode.IMPORT_DUPLICATE: {
+        "message": "Arquivo idêntico já importado; nenhuma carga foi executada"
+    },
+    SuccessCode.IMPORT_PROGRESS: {
+        "message": "Progresso da importação consultado com sucesso"
+    },
 
     # =========================
     # BI
@@ -7,6 +7,10 @@ class SuccessCode(str, Enum):
     # =========================
     IMPORT_SUCCESS = "IMPORT_SUCCESS"
     IMPORT_NO_DATA = "IMPORT_NO_DATA"
+    IMPORT_QUEUED = "IMPORT_QUEUED"
+    IMPORT_STATUS = "IMPORT_STATUS"
+    IMPORT_DUPLICATE = "IMPORT_DUPLICATE"
+    IMPORT_PROGRESS = "IMPORT_PROGRESS"
 
     # =========================
     # BI
@@ -0,0 +1,247 @@
+"""
+Recebimento de uploads de importação (streaming em blocos)
+"""
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from uuid import uuid4
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.errors import ErrorCode
+from app.core.exception_handlers import business_exception_handler
+from app.core.exceptions import BusinessException
+
+
+# Campos do formulário e cabeçalhos das partes do multipart
+MARGEM_MULTIPART = 1024 * 1024
+
+
+@dataclass
+class ArquivoRecebido:
+    caminho: str
+    nome_original: str
+    tamanho: int
+    sha256: str
+
+
+# ======================================================
+# PASTA EXCLUSIVA DO JOB
+# ======================================================
+
+def criar_pasta_job() -> str:
+    """
+    Cada upload ganha uma pasta própria (nome aleatório):
+    uploads simultâneos com o mesmo nome não se sobrescrevem.
+    """
+    pasta = os.path.join(os.path.abspath(settings.IMPORT_TEMP_DIR), uuid4().hex)
+    os.makedirs(pasta)
+    return pasta
+
+
+def remover_pasta_job(pasta: str):
+    shutil.rmtree(pasta, ignore_errors=True)
+
+
+# ======================================================
+# LIMITE DO CORPO DA REQUISIÇÃO
+# ======================================================
+
+def limite_corpo_upload(arquivos: int) -> int:
+    """
+    Bytes aceitos no corpo de um upload de até `arquivos` arquivos
+    de IMPORT_TAMANHO_MAXIMO_MB cada.
+    """
+    return arquivos * settings.IMPORT_TAMANHO_MAXIMO_MB * 1024 * 1024 + MARGEM_MULTIPART
+
+
+class LimiteUploadMiddleware:
+    """
+    Limita o corpo das rotas de upload ANTES do endpoint: o Starlette
+    grava o multipart inteiro em disco (SpooledTemporaryFile) ao
+    montar o UploadFile, antes de receber_upload ler o primeiro bloco.
+
+    - Content-Length acima do limite: 413 sem ler o corpo;
+    - sem Content-Length (chunked) ou com valor falso: os bytes são
+      contados enquanto chegam e, passado o limite, a requisição é
+      encerrada com 413 (o restante não é lido).
+
+    `arquivos_por_rota`: caminho da rota → arquivos aceitos nela
+    (limite_corpo_upload).
+    """
+
+    def __init__(self, app, *, arquivos_por_rota: Dict[str, int]):
+        self.app = app
+        self.arquivos_por_rota = arquivos_por_rota
+
+    async def __call__(self, scope, receive, send):
+        arquivos = (
+            self.arquivos_por_rota.get(scope["path"])
+            if scope["type"] == "http" and scope["method"] == "POST"
+            else None
+        )
+
+        if arquivos is None:
+            await self.app(scope, receive, send)
+            return
+
+        limite = limite_corpo_upload(arquivos)
+        cabecalhos = dict(scope["headers"])
+        declarado = cabecalhos.get(b"content-length", b"").decode("latin-1")
+
+        if declarado.isdigit() and int(declarado) > limite:
+            await self._recusar(scope, receive, send)
+            return
+
+        recebidos = 0
+        recusado = False
+
+        async def receber():
+            nonlocal recebidos, recusado
+
+            if recusado:
+                return {"type": "http.disconnect"}
+
+            mensagem = await receive()
+
+            if mensagem["type"] == "http.request":
+                recebidos += len(mensagem.get("body", b""))
+
+                if recebidos > limite:
+                    recusado = True
+                    await self._recusar(scope, receive, send)
+
+                    # O endpoint vê a conexão encerrada e desiste
+                    return {"type": "http.disconnect"}
+
+            return mensagem
+
+        async def enviar(mensagem):
+            # Depois do 413, a resposta do endpoint é descartada
+            if not recusado:
+                await send(mensagem)
+
+        try:
+            await self.app(scope, receber, enviar)
+
+        except Exception:
+            if not recusado:
+                raise
+
+    @staticmethod
+    async def _recusar(scope, receive, send):
+        resposta = business_exception_handler(
+            None,
+            BusinessException(
+                ErrorCode.FILE_TOO_LARGE,
+                detail=(
+                    f"Upload excede o limite de "
+                    f"{settings.IMPORT_TAMANHO_MAXIMO_MB} MB por arquivo"
+                ),
+            ),
+        )
+        await resposta(scope, receive, send)
+
+
+# ======================================================
+# RECEBIMENTO EM BLOCOS
+# ======================================================
+
+def validar_extensao_upload(nome_arquivo: str | None, extensoes: Tuple[str, ...]):
+    if not nome_arquivo or not nome_arquivo.lower().endswith(extensoes):
+        raise BusinessException(
+            ErrorCode.INVALID_FILE_TYPE,
+            detail=f"Extensões aceitas: {', '.join(extensoes)}"
+        )
+
+
+async def receber_upload(
+    arquivo: UploadFile,
+    pasta: str,
+    *,
+    extensoes: Tuple[str, ...],
+) -> ArquivoRecebido:
+    """
+    Copia o upload em blocos de IMPORT_TAMANHO_BLOCO_UPLOAD bytes
+    para um arquivo temporário de nome único, calculando o SHA-256
+    e aplicando o limite IMPORT_TAMANHO_MAXIMO_MB por arquivo.
+
+    Quando o endpoint roda, o Starlette já recebeu o corpo inteiro
+    (o UploadFile está no spool temporário): este limite não protege
+    a recepção, só recusa o arquivo. O corpo da requisição é limitado
+    antes, por LimiteUploadMiddleware.
+
+    Só ao final o arquivo recebe o nome original (sem diretórios).
+    Em qualquer falha o arquivo parcial é removido.
+    """
+    validar_extensao_upload(arquivo.filename, extensoes)
+
+    nome_original = os.path.basename(arquivo.filename)
+    destino_final = os.path.join(pasta, nome_original)
+
+    if os.path.exists(destino_final):
+        raise BusinessException(
+            ErrorCode.INVALID_FILE_TYPE,
+            detail=f"Arquivo enviado mais de uma vez: {nome_original}"
+        )
+
+    limite = settings.IMPORT_TAMANHO_MAXIMO_MB * 1024 * 1024
+    caminho_parcial = os.path.join(pasta, f"{uuid4().hex}.upload")
+
+    sha256 = hashlib.sha256()
+    tamanho = 0
+
+    try:
+        async with aiofiles.open(caminho_parcial, "wb") as destino:
+            while True:
+                bloco = await arquivo.read(settings.IMPORT_TAMANHO_BLOCO_UPLOAD)
+
+                if not bloco:
+                    break
+
+                tamanho += len(bloco)
+
+                if tamanho > limite:
+                    raise BusinessException(
+                        ErrorCode.FILE_TOO_LARGE,
+                        detail=(
+                            f"{nome_original} excede o limite de "
+                            f"{settings.IMPORT_TAMANHO_MAXIMO_MB} MB"
+                        )
+                    )
+
+                sha256.update(bloco)
+                await destino.write(bloco)
+
+        if tamanho == 0:
+            raise BusinessException(ErrorCode.EMPTY_FILE)
+
+        os.replace(caminho_parcial, destino_final)
+
+    except BaseException:
+        if os.path.exists(caminho_parcial):
+            os.remove(caminho_parcial)
+        raise
+
+    finally:
+        await arquivo.close()
+
+    return ArquivoRecebido(
+        caminho=destino_final,
+        nome_original=nome_original,
+        tamanho=tamanho,
+        sha256=sha256.hexdigest(),
+    )
+
+
+def hash_pacote(arquivos: List[ArquivoRecebido]) -> str:
+    """
+    Hash do pacote: independe da ordem de envio dos arquivos.
+    """
+    return hashlib.sha256(
+        "\n".join(sorted(arquivo.sha256 for arquivo in arquivos)).encode()
+    ).hexdigest()
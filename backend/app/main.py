@@ -6,6 +6,7 @@ import traceback
 
 from app.core.config import settings
 from app.core.exceptions import BusinessException
+from app.core.upload import LimiteUploadMiddleware
 from app.core.exception_handlers import (
     business_exception_handler,
     sqlalchemy_exception_handler,
@@ -16,7 +17,10 @@ from app.routers import metrics
 from app.routers.auth_router import router as auth_router
 
 # 🔹 IMPORT ROUTERS
-from app.routers.import_router import router as import_router
+from app.routers.import_router import (
+    ARQUIVOS_POR_ROTA_UPLOAD,
+    router as import_router,
+)
 from app.routers.import_pr_router import router as import_pr_router
 from app.routers.import_query_router import router as import_query_router
 from app.routers.import_logs_router import router as import_logs_router
@@ -27,12 +31,29 @@ from app.routers.bi_router import router as bi_router
 from app.routers.errors_router import router as errors_router
 from app.routers.system_router import router as system_router
 
+from app.services.import_jobs_service import encerrar_fila_importacao
+from app.core.particionamento import (
+    encerrar_manutencao_particoes,
+    iniciar_manutencao_particoes,
+)
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION
 )
 
+# ======================================================
+# LIMITE DO CORPO DOS UPLOADS
+# ======================================================
+# Registrado antes do CORS: o último middleware registrado é o mais
+# externo, e o 413 também precisa dos cabeçalhos de CORS
+
+app.add_middleware(
+    LimiteUploadMiddleware,
+    arquivos_por_rota=ARQUIVOS_POR_ROTA_UPLOAD,
+)
+
 # ======================================================
 # CORS
 # ======================================================
@@ -76,6 +97,21 @@ async def debug_generic_exception_handler(request, exc):
     return generic_exception_handler(request, exc)
 
 
+# ======================================================
+# CICLO DE VIDA
+# ======================================================
+
+@app.on_event("startup")
+def iniciar_jobs_manutencao():
+    iniciar_manutencao_particoes()
+
+
+@app.on_event("shutdown")
+def encerrar_workers_importacao():
+    encerrar_fila_importacao()
+    encerrar_manutencao_particoes()
+
+
 # ======================================================
 # ROTAS
 # ======================================================
@@ -7,6 +7,7 @@ from typing import Optional
 from sqlalchemy import text
 
 from app.core.database import engine
+from app.core.particionamento import criar_particoes_contrato
 from app.core.permissions import somente_master
 from app.core.auth import get_usuario_atual
 
@@ -66,5 +67,8 @@ def criar_contrato(dados: ContratoCreate, usuario=Depends(somente_master)):
         
         if not row:
             raise HTTPException(400, "Contrato já existe")
+
+        # Partições do contrato nas tabelas data_pr (mesma transação)
+        criar_particoes_contrato(conn, dados.contrato_id)
     
     return {"message": "Contrato criado", "contrato_id": dados.contrato_id}
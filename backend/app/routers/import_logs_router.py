@@ -3,12 +3,14 @@ from fastapi import APIRouter, Depends, Query
 from app.core.permissions import somente_admin_ou_master
 from app.services.import_logs_service import (
     listar_import_logs,
-    obter_import_log_por_id
+    obter_import_log_por_id,
+    obter_progresso_importacao,
 )
 from app.schemas.import_logs_schema import (
-    ImportLogItemSchema,
+    ImportLogDetailResponseSchema,
     ImportLogListResponseSchema,
-    ImportLogListMetaSchema
+    ImportLogListMetaSchema,
+    ImportProgressResponseSchema,
 )
 from app.core.responses import success_response
 from app.core.success_codes import SuccessCode
@@ -83,15 +85,21 @@ def listar_logs(
 
 @router.get(
     "/{log_id}",
-    response_model=ImportLogItemSchema,
+    response_model=ImportLogDetailResponseSchema,
     summary="Detalhar log de importação",
-    description="Retorna todos os detalhes de uma importação específica."
+    description="""
+Retorna todos os detalhes de uma importação específica,
+incluindo tempo e pico de memória de cada etapa (metricas_etapas).
+"""
 )
 def obter_log(
     log_id: int,
     usuario=Depends(somente_admin_ou_master),
 ):
-    log = obter_import_log_por_id(log_id)
+    log = obter_import_log_por_id(
+        log_id=log_id,
+        contrato_id=usuario["contrato_id"]
+    )
 
     if not log:
         return success_response(
@@ -103,3 +111,40 @@ def obter_log(
         code=SuccessCode.DETAIL_SUCCESS,
         data=log
     )
+
+
+# ======================================================
+# PROGRESSO DE UMA IMPORTAÇÃO
+# ======================================================
+
+@router.get(
+    "/{log_id}/progress",
+    response_model=ImportProgressResponseSchema,
+    summary="Progresso da importação",
+    description="""
+Linhas processadas, total de linhas e throughput (linhas/s)
+de uma importação, atualizados a cada lote gravado.
+
+Enquanto a importação está em andamento, o total é a estimativa
+lida do arquivo; ao final, o total efetivamente lido.
+"""
+)
+def obter_progresso(
+    log_id: int,
+    usuario=Depends(somente_admin_ou_master),
+):
+    progresso = obter_progresso_importacao(
+        log_id=log_id,
+        contrato_id=usuario["contrato_id"]
+    )
+
+    if not progresso:
+        return success_response(
+            code=SuccessCode.EMPTY_RESULT,
+            data={}
+        )
+
+    return success_response(
+        code=SuccessCode.IMPORT_PROGRESS,
+        data=progresso
+    )
@@ -1,65 +1,278 @@
+import logging
 import os
-import shutil
-import traceback
-from fastapi import APIRouter, UploadFile, File, Depends, Form
+from typing import List
 
+from fastapi import APIRouter, UploadFile, File, Depends, Form, Query, Response, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
 from app.core.permissions import somente_admin_ou_master
-from app.core.import_config import ModoImportacao
+from app.core.import_config import TIPOS_IMPORTACAO, ModoImportacao
+from app.core.import_reader import EXTENSOES_IMPORTACAO
+from app.core.import_rejeicoes import caminho_relatorio_rejeicoes
+from app.core.upload import (
+    criar_pasta_job,
+    hash_pacote,
+    receber_upload,
+    remover_pasta_job,
+    validar_extensao_upload,
+)
+from app.core.responses import success_response
+from app.core.success_codes import SuccessCode
 from app.auth.dependencies import get_usuario_logado
-from app.services.import_his_selo_detalhe_pr_service import (
-    importar_his_selo_detalhe_pr
+from app.services.import_jobs_service import (
+    enfileirar_importacao,
+    enfileirar_pacote,
+    obter_importacao_identica,
 )
+from app.services.import_logs_service import obter_import_log_por_id
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/import", tags=["Importações"])
 
+# Arquivos aceitos por rota de upload: limite do corpo da requisição
+# (LimiteUploadMiddleware, antes do Starlette gravar o multipart)
+ARQUIVOS_POR_ROTA_UPLOAD = {
+    "/import/his-selo-detalhe-pr": 1,
+    "/import/pacote": len(TIPOS_IMPORTACAO),
+}
+
+
+def _resposta_duplicado(response: Response, log_original: int):
+    """
+    Nada foi enfileirado: 200 com o log da importação original.
+    Use forcar_recarga=true para importar novamente.
+    """
+    response.status_code = status.HTTP_200_OK
+
+    return success_response(
+        code=SuccessCode.IMPORT_DUPLICATE,
+        data={
+            "log_id": log_original,
+            "status": "DUPLICADO",
+        }
+    )
+
 
 @router.post(
     "/his-selo-detalhe-pr",
-    dependencies=[Depends(somente_admin_ou_master)]
+    dependencies=[Depends(somente_admin_ou_master)],
+    status_code=status.HTTP_202_ACCEPTED,
 )
-def importar_his_selo_detalhe_pr_endpoint(
+async def importar_his_selo_detalhe_pr_endpoint(
+    response: Response,
     arquivo: UploadFile = File(...),
     modo_importacao: ModoImportacao = Form(...),
     senha_confirmacao: str | None = Form(None),
+    commit_a_cada: int | None = Form(None, ge=0),
+    retomar_log_id: int | None = Form(None),
+    forcar_recarga: bool = Form(False),
+    simulacao: bool = Form(False),
     usuario=Depends(get_usuario_logado),
 ):
-    nome_arquivo = arquivo.filename
+    """
+    simulacao=true: apenas valida o arquivo (dry-run), sem gravar
+    dados; as linhas rejeitadas ficam em /jobs/{log_id}/rejeicoes.
+    """
+    # 1️⃣ Validar extensão antes de copiar qualquer byte
+    validar_extensao_upload(arquivo.filename, EXTENSOES_IMPORTACAO)
 
-    # 1️⃣ Validar extensão
-    if not nome_arquivo.lower().endswith(".xlsx"):
-        raise ValueError("Arquivo deve ser .xlsx")
+    # 2️⃣ Criar pasta temporária exclusiva do job
+    pasta_job = criar_pasta_job()
 
-    # 2️⃣ Criar pasta temporária
-    pasta_temp = "temp"
-    os.makedirs(pasta_temp, exist_ok=True)
+    try:
+        # 3️⃣ Receber arquivo em blocos (limite de tamanho + SHA-256)
+        recebido = await receber_upload(
+            arquivo,
+            pasta_job,
+            extensoes=EXTENSOES_IMPORTACAO,
+        )
 
-    caminho_arquivo = os.path.join(pasta_temp, nome_arquivo)
+        # 4️⃣ Reenvio idêntico: aponta para a importação original
+        if retomar_log_id is None and not forcar_recarga and not simulacao:
+            log_original = await run_in_threadpool(
+                obter_importacao_identica,
+                tipo_arquivo="his_selo_detalhe_pr",
+                contrato_id=usuario["contrato_id"],
+                sistema_origem_id=usuario["sistema_origem_id"],
+                hash_arquivo=recebido.sha256,
+            )
 
-    # 3️⃣ Salvar arquivo
-    with open(caminho_arquivo, "wb") as buffer:
-        shutil.copyfileobj(arquivo.file, buffer)
+            if log_original is not None:
+                remover_pasta_job(pasta_job)
+                return _resposta_duplicado(response, log_original)
+
+        # 5️⃣ Enfileirar service REAL (o worker remove a pasta ao final)
+        log_id = await run_in_threadpool(
+            enfileirar_importacao,
+            tipo_arquivo="his_selo_detalhe_pr",
+            file=recebido.caminho,
+            contrato_id=usuario["contrato_id"],
+            usuario_email=usuario["email"],
+            usuario_id=usuario["id"],
+            sistema_origem_id=usuario["sistema_origem_id"],
+            modo_importacao=modo_importacao,
+            senha_confirmacao=senha_confirmacao,
+            commit_a_cada=commit_a_cada,
+            retomar_log_id=retomar_log_id,
+            hash_arquivo=recebido.sha256,
+            simulacao=simulacao,
+        )
+
+    except Exception as e:
+        # Erros de negócio já voltam ao cliente; só o inesperado vai ao log
+        if not isinstance(e, BusinessException):
+            logger.exception("Falha ao enfileirar importação de his_selo_detalhe_pr")
+
+        # 6️⃣ Job não enfileirado: limpar arquivo temporário
+        remover_pasta_job(pasta_job)
+        raise
+
+    return success_response(
+        code=SuccessCode.IMPORT_QUEUED,
+        data={
+            "log_id": log_id,
+            "status": "PROCESSANDO",
+        }
+    )
+
+
+@router.post(
+    "/pacote",
+    dependencies=[Depends(somente_admin_ou_master)],
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def importar_pacote_endpoint(
+    response: Response,
+    arquivos: List[UploadFile] = File(...),
+    modo_importacao: ModoImportacao = Form(...),
+    senha_confirmacao: str | None = Form(None),
+    forcar_recarga: bool = Form(False),
+    simulacao: bool = Form(False),
+    usuario=Depends(get_usuario_logado),
+):
+    """
+    Pacote mensal do contrato: um .zip ou vários arquivos
+    (os_lanc, os_selo, his_selo, his_selo_detalhe_pr...),
+    identificados pelo nome do arquivo. Gera um único log.
+
+    simulacao=true: apenas valida os arquivos (dry-run), sem gravar
+    dados; as linhas rejeitadas ficam em /jobs/{log_id}/rejeicoes
+    (tipo_arquivo=<tipo>).
+    """
+    extensoes = EXTENSOES_IMPORTACAO + (".zip",)
+
+    # 1️⃣ Validar extensões
+    for arquivo in arquivos:
+        validar_extensao_upload(arquivo.filename, extensoes)
+
+    # 2️⃣ Criar pasta temporária exclusiva do job
+    pasta_job = criar_pasta_job()
 
     try:
-        # 4️⃣ Chamar service REAL
-        resultado = importar_his_selo_detalhe_pr(
-            file=caminho_arquivo,
+        # 3️⃣ Receber arquivos em blocos
+        recebidos = [
+            await receber_upload(arquivo, pasta_job, extensoes=extensoes)
+            for arquivo in arquivos
+        ]
+        hash_arquivo = hash_pacote(recebidos)
+
+        # 4️⃣ Reenvio idêntico: aponta para a importação original
+        if not forcar_recarga and not simulacao:
+            log_original = await run_in_threadpool(
+                obter_importacao_identica,
+                tipo_arquivo="pacote",
+                contrato_id=usuario["contrato_id"],
+                sistema_origem_id=usuario["sistema_origem_id"],
+                hash_arquivo=hash_arquivo,
+            )
+
+            if log_original is not None:
+                remover_pasta_job(pasta_job)
+                return _resposta_duplicado(response, log_original)
+
+        # 5️⃣ Enfileirar pacote (a pasta é removida ao final do job)
+        log_id = await run_in_threadpool(
+            enfileirar_pacote,
+            pasta_job=pasta_job,
             contrato_id=usuario["contrato_id"],
             usuario_email=usuario["email"],
             usuario_id=usuario["id"],
             sistema_origem_id=usuario["sistema_origem_id"],
             modo_importacao=modo_importacao,
             senha_confirmacao=senha_confirmacao,
+            hash_arquivo=hash_arquivo,
+            simulacao=simulacao,
         )
-        return resultado
 
     except Exception:
-        # 🔥 EXPOR ERRO REAL EM DEV
-        print("\n🔥 ERRO REAL NO ENDPOINT DE IMPORTAÇÃO 🔥")
-        traceback.print_exc()
-        print("🔥 FIM DO TRACEBACK 🔥\n")
+        # 6️⃣ Pacote não enfileirado: limpar arquivos temporários
+        remover_pasta_job(pasta_job)
         raise
 
-    finally:
-        # 5️⃣ Limpar arquivo temporário
-        if os.path.exists(caminho_arquivo):
-            os.remove(caminho_arquivo)
+    return success_response(
+        code=SuccessCode.IMPORT_QUEUED,
+        data={
+            "log_id": log_id,
+            "status": "PROCESSANDO",
+        }
+    )
+
+
+@router.get(
+    "/jobs/{log_id}",
+    dependencies=[Depends(somente_admin_ou_master)]
+)
+def status_importacao_endpoint(
+    log_id: int,
+    usuario=Depends(get_usuario_logado),
+):
+    """
+    Polling do job: o log de importação é o registro de progresso.
+    """
+    log = obter_import_log_por_id(
+        log_id=log_id,
+        contrato_id=usuario["contrato_id"]
+    )
+
+    return success_response(
+        code=SuccessCode.IMPORT_STATUS,
+        data=log
+    )
+
+
+@router.get(
+    "/jobs/{log_id}/rejeicoes",
+    dependencies=[Depends(somente_admin_ou_master)]
+)
+def relatorio_rejeicoes_endpoint(
+    log_id: int,
+    tipo_arquivo: str | None = Query(None),
+    usuario=Depends(get_usuario_logado),
+):
+    """
+    Download do relatório de linhas rejeitadas (CSV compactado):
+    linha, motivo, coluna, valor.
+
+    Em pacotes há um relatório por arquivo: informe tipo_arquivo.
+    """
+    if tipo_arquivo is not None and tipo_arquivo not in TIPOS_IMPORTACAO:
+        raise BusinessException(ErrorCode.REJECTION_REPORT_NOT_FOUND)
+
+    log = obter_import_log_por_id(
+        log_id=log_id,
+        contrato_id=usuario["contrato_id"]
+    )
+    caminho = caminho_relatorio_rejeicoes(log_id, tipo_arquivo)
+
+    if not log or not os.path.exists(caminho):
+        raise BusinessException(ErrorCode.REJECTION_REPORT_NOT_FOUND)
+
+    return FileResponse(
+        caminho,
+        media_type="application/gzip",
+        filename=os.path.basename(caminho),
+    )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 from pydantic import BaseModel
 
@@ -26,6 +26,12 @@ class ImportLogItemSchema(BaseModel):
 
     total_registros: int
     registros_processados: int
+    registros_rejeitados: Optional[int] = None
+    hash_arquivo: Optional[str] = None
+    simulacao: bool = False
+
+    # Tempo, linhas e pico de memória (MB) por etapa
+    metricas_etapas: Optional[Dict[str, Dict[str, Any]]] = None
 
     started_at: datetime
     finished_at: Optional[datetime]
@@ -44,6 +50,43 @@ class ImportLogListMetaSchema(BaseModel):
     offset: int
 
 
+# ======================================================
+# RESPONSE — DETALHE DE UM LOG
+# ======================================================
+
+class ImportLogDetailResponseSchema(BaseModel):
+    success: bool
+    data: ImportLogItemSchema | Dict[str, Any]
+    meta: Dict[str, Any]
+
+
+# ======================================================
+# PROGRESSO — IMPORTAÇÃO EM ANDAMENTO
+# ======================================================
+
+class ImportProgressSchema(BaseModel):
+    log_id: int
+    status: str
+
+    registros_lidos: int = 0
+    registros_processados: int
+    total_registros: int
+    percentual: Optional[float] = None
+
+    linhas_por_segundo: Optional[float] = None
+    segundos_decorridos: float
+    segundos_restantes: Optional[float] = None
+
+    started_at: datetime
+    finished_at: Optional[datetime]
+
+
+class ImportProgressResponseSchema(BaseModel):
+    success: bool
+    data: ImportProgressSchema | Dict[str, Any]
+    meta: Dict[str, Any]
+
+
 # ======================================================
 # RESPONSE — LISTA DE LOGS
 # ======================================================
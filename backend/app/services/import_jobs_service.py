@@ -0,0 +1,668 @@
+"""
+Fila de importações em background (pool de processos)
+"""
+import logging
+import os
+import shutil
+import threading
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+from app.core.import_config import TIPOS_IMPORTACAO, ModoImportacao
+from app.core.import_reader import EXTENSOES_IMPORTACAO
+from app.core.import_rejeicoes import (
+    descartar_relatorio_pendente,
+    publicar_relatorio_pendente,
+)
+from app.core.import_log import (
+    buscar_importacao_identica,
+    criar_log_importacao,
+    finalizar_log_importacao,
+    obter_checkpoint_importacao,
+)
+from app.services.import_pr_engine import (
+    executar_importacao_pr,
+    simular_importacao_pr,
+    gravar_pacote_pr,
+    obter_config_importacao,
+    preparar_arquivo_pr,
+    validar_modo_importacao,
+    verificar_arquivo_pr,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+# ======================================================
+# POOL DE PROCESSOS
+# ======================================================
+
+def _inicializar_worker():
+    """
+    Conexões herdadas do processo pai (fork) não podem ser
+    reutilizadas: cada worker abre o próprio pool.
+    """
+    engine.dispose(close=False)
+
+
+def _obter_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.IMPORT_WORKERS,
+            initializer=_inicializar_worker,
+        )
+
+    return _executor
+
+
+def encerrar_fila_importacao():
+    """
+    Encerra o pool (chamado no shutdown da aplicação).
+    """
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# ======================================================
+# EXECUÇÃO DE UM JOB (DENTRO DO WORKER)
+# ======================================================
+
+def _executar_job(
+    tipo_arquivo: str,
+    log_id: int,
+    parametros: Dict[str, Any],
+):
+    """
+    Executa o motor de importação e garante que o log
+    seja finalizado e o arquivo temporário removido.
+    """
+    file = parametros["file"]
+    parametros = dict(parametros)
+
+    executar = (
+        simular_importacao_pr
+        if parametros.pop("simulacao", False)
+        else executar_importacao_pr
+    )
+
+    try:
+        executar(tipo_arquivo, log_id=log_id, **parametros)
+
+    except BusinessException as e:
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=None,
+            error_code=e.error_code.value,
+            mensagem=e.detail or e.message,
+        )
+
+    except Exception as e:
+        logger.exception("Falha inesperada na importação %s", log_id)
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=None,
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(e),
+        )
+
+    finally:
+        shutil.rmtree(os.path.dirname(file), ignore_errors=True)
+
+
+def _ao_concluir(log_id: int, futuro: Future):
+    """
+    Cobre falhas do próprio worker (ex.: processo morto por OOM),
+    em que _executar_job não chega a finalizar o log.
+    """
+    global _executor
+
+    erro = futuro.exception() if not futuro.cancelled() else None
+
+    if futuro.cancelled() or erro is not None:
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=None,
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(erro) if erro else "Importação cancelada",
+        )
+
+        # Pool quebrado não aceita novos jobs: recria no próximo uso
+        if erro is not None:
+            _executor = None
+
+
+# ======================================================
+# REENVIO DE ARQUIVO IDÊNTICO
+# ======================================================
+
+def obter_importacao_identica(
+    *,
+    tipo_arquivo: str,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+    hash_arquivo: str,
+) -> int | None:
+    """
+    Log de uma importação anterior do mesmo arquivo (SHA-256),
+    ou None. Pacotes usam tipo_arquivo "pacote".
+    """
+    if tipo_arquivo != "pacote":
+        config = obter_config_importacao(tipo_arquivo)
+
+        if not config["por_contrato"]:
+            sistema_origem_id = None
+
+    return buscar_importacao_identica(
+        contrato_id=contrato_id,
+        sistema_origem_id=sistema_origem_id,
+        tipo_arquivo=tipo_arquivo,
+        hash_arquivo=hash_arquivo,
+    )
+
+
+# ======================================================
+# ENFILEIRAR IMPORTAÇÃO
+# ======================================================
+
+def enfileirar_importacao(
+    *,
+    tipo_arquivo: str,
+    file: str,
+    contrato_id: str,
+    usuario_email: str,
+    usuario_id: int,
+    sistema_origem_id: int | None,
+    modo_importacao: ModoImportacao,
+    senha_confirmacao: str | None = None,
+    commit_a_cada: int | None = None,
+    retomar_log_id: int | None = None,
+    hash_arquivo: str | None = None,
+    simulacao: bool = False,
+) -> int:
+    """
+    Cria o log (status PROCESSANDO) e envia a importação para o pool.
+    Retorna imediatamente o ID do log, usado como ID do job.
+
+    O arquivo deve estar em um diretório exclusivo do job:
+    o diretório inteiro é removido ao final.
+
+    Com `retomar_log_id`, o job continua o log informado a partir
+    do checkpoint (o próprio log é o ID do job).
+
+    Com `simulacao`, o job apenas valida o arquivo (dry-run) e gera
+    o relatório de rejeições, sem gravar em data_pr.
+    """
+    config = obter_config_importacao(tipo_arquivo)
+
+    # Dimensões (ex.: tabela_lancamentos): sem sistema e sempre INITIAL
+    if not config["por_contrato"]:
+        sistema_origem_id = None
+        modo_importacao = ModoImportacao.INITIAL
+
+    if simulacao and retomar_log_id is not None:
+        raise BusinessException(
+            ErrorCode.INVALID_IMPORT_MODE,
+            detail="Simulação não pode retomar uma importação"
+        )
+
+    # Falha rápida: cabeçalho, tamanho e linhas antes de enfileirar
+    verificar_arquivo_pr(config, file)
+
+    if retomar_log_id is not None:
+        # Falha rápida: o log precisa estar em ERROR com checkpoint
+        checkpoint = obter_checkpoint_importacao(
+            log_id=retomar_log_id,
+            contrato_id=contrato_id,
+            tipo_arquivo=tipo_arquivo,
+        )
+
+        if not checkpoint:
+            raise BusinessException(
+                ErrorCode.INVALID_IMPORT_MODE,
+                detail=f"Importação {retomar_log_id} não pode ser retomada"
+            )
+
+        # O checkpoint conta linhas do arquivo original: outro arquivo
+        # seria retomado do ponto errado
+        if (
+            hash_arquivo is not None
+            and checkpoint["hash_arquivo"] is not None
+            and hash_arquivo != checkpoint["hash_arquivo"]
+        ):
+            raise BusinessException(
+                ErrorCode.RESUME_FILE_MISMATCH,
+                detail=(
+                    f"SHA-256 do arquivo difere do registrado na "
+                    f"importação {retomar_log_id}"
+                )
+            )
+
+        log_id = retomar_log_id
+
+    else:
+        log_id = criar_log_importacao(
+            contrato_id=contrato_id,
+            sistema_origem_id=sistema_origem_id,
+            usuario_id=usuario_id,
+            usuario_email=usuario_email,
+            tipo_arquivo=tipo_arquivo,
+            nome_arquivo=os.path.basename(file),
+            modo_importacao=modo_importacao.value,
+            total_registros=0,
+            hash_arquivo=hash_arquivo,
+            simulacao=simulacao,
+        )
+
+    parametros: Dict[str, Any] = {
+        "file": file,
+        "contrato_id": contrato_id,
+        "usuario_email": usuario_email,
+        "usuario_id": usuario_id,
+        "sistema_origem_id": sistema_origem_id,
+        "modo_importacao": modo_importacao,
+    }
+
+    if simulacao:
+        parametros["simulacao"] = True
+    else:
+        parametros.update(
+            senha_confirmacao=senha_confirmacao,
+            commit_a_cada=commit_a_cada,
+            retomar_log_id=retomar_log_id,
+        )
+
+    try:
+        futuro = _obter_executor().submit(
+            _executar_job,
+            tipo_arquivo,
+            log_id,
+            parametros,
+        )
+    except Exception as e:
+        encerrar_fila_importacao()
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=None,
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(e),
+        )
+        raise
+
+    futuro.add_done_callback(lambda f: _ao_concluir(log_id, f))
+
+    return log_id
+
+
+# ======================================================
+# PACOTE DE ARQUIVOS (PARSE PARALELO, GRAVAÇÃO ORDENADA)
+# ======================================================
+
+def _tipo_pelo_nome(nome_arquivo: str) -> str:
+    """
+    O tipo vem do nome do arquivo (ex.: os_lanc_2024_01.xlsx).
+    Vale o tipo mais longo que prefixa o nome, para que
+    his_selo_detalhe_pr não seja confundido com his_selo.
+    """
+    nome = os.path.splitext(os.path.basename(nome_arquivo))[0].lower()
+
+    candidatos = [tipo for tipo in TIPOS_IMPORTACAO if nome.startswith(tipo)]
+
+    if not candidatos:
+        raise BusinessException(
+            ErrorCode.INVALID_FILE_TYPE,
+            detail=f"Arquivo não reconhecido no pacote: {nome_arquivo}"
+        )
+
+    return max(candidatos, key=len)
+
+
+def _extrair_membro(
+    pacote: zipfile.ZipFile,
+    membro: zipfile.ZipInfo,
+    destino: str,
+    limite: int,
+):
+    """
+    Descompacta o membro em blocos, contando os bytes realmente
+    gravados: o file_size do cabeçalho do zip é declarado por quem
+    montou o arquivo e não limita a descompactação. Passado o
+    limite, o arquivo parcial é removido.
+    """
+    gravados = 0
+
+    try:
+        with pacote.open(membro) as origem, open(destino, "wb") as saida:
+            while True:
+                bloco = origem.read(settings.IMPORT_TAMANHO_BLOCO_UPLOAD)
+
+                if not bloco:
+                    break
+
+                gravados += len(bloco)
+
+                if gravados > limite:
+                    raise BusinessException(
+                        ErrorCode.FILE_TOO_LARGE,
+                        detail=f"{membro.filename} excede o limite de "
+                               f"{settings.IMPORT_TAMANHO_MAXIMO_MB} MB"
+                    )
+
+                saida.write(bloco)
+
+    except BaseException:
+        if os.path.exists(destino):
+            os.remove(destino)
+        raise
+
+
+def identificar_arquivos_pacote(pasta_job: str) -> Dict[str, str]:
+    """
+    Extrai os .zip da pasta do job e associa cada arquivo ao seu tipo.
+    Retorna {tipo_arquivo: caminho}.
+
+    Cada arquivo extraído respeita IMPORT_TAMANHO_MAXIMO_MB e o zip
+    tem no máximo um arquivo por tipo de importação: o total
+    extraído é limitado antes de descompactar.
+    """
+    limite = settings.IMPORT_TAMANHO_MAXIMO_MB * 1024 * 1024
+
+    for nome in os.listdir(pasta_job):
+        if not nome.lower().endswith(".zip"):
+            continue
+
+        caminho_zip = os.path.join(pasta_job, nome)
+
+        with zipfile.ZipFile(caminho_zip) as pacote:
+            membros = [membro for membro in pacote.infolist() if not membro.is_dir()]
+
+            if len(membros) > len(TIPOS_IMPORTACAO):
+                raise BusinessException(
+                    ErrorCode.INVALID_FILE_TYPE,
+                    detail=f"{nome} tem mais arquivos que tipos de importação"
+                )
+
+            for membro in membros:
+                # Falha rápida pelo cabeçalho; o limite real é na extração
+                if membro.file_size > limite:
+                    raise BusinessException(
+                        ErrorCode.FILE_TOO_LARGE,
+                        detail=f"{membro.filename} excede o limite de "
+                               f"{settings.IMPORT_TAMANHO_MAXIMO_MB} MB"
+                    )
+
+                # Somente o nome base: nada é extraído fora da pasta
+                destino = os.path.join(
+                    pasta_job, os.path.basename(membro.filename)
+                )
+
+                _extrair_membro(pacote, membro, destino, limite)
+
+        os.remove(caminho_zip)
+
+    arquivos: Dict[str, str] = {}
+
+    for nome in sorted(os.listdir(pasta_job)):
+        caminho = os.path.join(pasta_job, nome)
+
+        if os.path.isdir(caminho):
+            continue
+
+        if not nome.lower().endswith(EXTENSOES_IMPORTACAO):
+            raise BusinessException(
+                ErrorCode.INVALID_FILE_TYPE,
+                detail=f"Arquivo não suportado no pacote: {nome}"
+            )
+
+        tipo = _tipo_pelo_nome(nome)
+
+        if tipo in arquivos:
+            raise BusinessException(
+                ErrorCode.INVALID_FILE_TYPE,
+                detail=f"Mais de um arquivo do tipo {tipo} no pacote"
+            )
+
+        arquivos[tipo] = caminho
+
+    if not arquivos:
+        raise BusinessException(ErrorCode.EMPTY_FILE)
+
+    return arquivos
+
+
+def _erro_serializavel(e: Exception) -> Dict[str, Any]:
+    """
+    BusinessException não sobrevive ao pickle entre processos:
+    o erro volta do worker como dicionário.
+    """
+    if isinstance(e, BusinessException):
+        return {
+            "error_code": e.error_code.value,
+            "mensagem": e.detail or e.message,
+        }
+
+    logger.exception("Falha inesperada no job de importação")
+
+    return {
+        "error_code": ErrorCode.UNEXPECTED_ERROR.value,
+        "mensagem": str(e),
+    }
+
+
+def _preparar_arquivo_job(
+    tipo_arquivo: str,
+    parametros: Dict[str, Any],
+) -> Dict[str, Any]:
+    try:
+        return preparar_arquivo_pr(tipo_arquivo, **parametros)
+
+    except Exception as e:
+        return {"tipo_arquivo": tipo_arquivo, "erro": _erro_serializavel(e)}
+
+
+def _gravar_pacote_job(parametros: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return gravar_pacote_pr(**parametros)
+
+    except Exception as e:
+        # O log já foi finalizado por gravar_pacote_pr
+        return {"erro": _erro_serializavel(e)}
+
+
+def _finalizar_simulacao_pacote(log_id: int, preparados: List[Dict[str, Any]]):
+    """
+    Simulação do pacote: nada é gravado; o log resume, por
+    arquivo, as linhas válidas e as rejeições por motivo.
+    """
+    for item in preparados:
+        publicar_relatorio_pendente(log_id, item["tipo_arquivo"])
+
+    finalizar_log_importacao(
+        log_id=log_id,
+        status="SUCCESS",
+        registros_processados=sum(item["registros_validos"] for item in preparados),
+        total_registros=sum(item["registros_lidos"] for item in preparados),
+        registros_rejeitados=sum(item["registros_rejeitados"] for item in preparados),
+        mensagem="Simulação: " + " | ".join(
+            f"{item['tipo_arquivo']}: {item['registros_validos']} válidos"
+            + "".join(
+                f", {motivo}: {total}"
+                for motivo, total in item["rejeicoes_por_motivo"].items()
+            )
+            for item in preparados
+        ),
+    )
+
+
+def _orquestrar_pacote(
+    log_id: int,
+    pasta_job: str,
+    arquivos: Dict[str, str],
+    parametros: Dict[str, Any],
+):
+    """
+    Roda em thread do processo da API: distribui o parse dos
+    arquivos pelo pool e, com todos prontos, envia a gravação.
+    """
+    global _executor
+
+    parametros = dict(parametros)
+    simulacao = parametros.pop("simulacao", False)
+
+    pasta_preparados = os.path.join(pasta_job, "preparados")
+    os.makedirs(pasta_preparados, exist_ok=True)
+
+    try:
+        executor = _obter_executor()
+
+        futuros = [
+            executor.submit(
+                _preparar_arquivo_job,
+                tipo_arquivo,
+                {
+                    "file": caminho,
+                    "destino": None if simulacao else os.path.join(
+                        pasta_preparados, f"{tipo_arquivo}.parquet"
+                    ),
+                    "log_id": log_id,
+                    "contrato_id": parametros["contrato_id"],
+                    "sistema_origem_id": (
+                        parametros["sistema_origem_id"]
+                        if TIPOS_IMPORTACAO[tipo_arquivo]["por_contrato"]
+                        else None
+                    ),
+                },
+            )
+            for tipo_arquivo, caminho in arquivos.items()
+        ]
+
+        preparados: List[Dict[str, Any]] = [f.result() for f in futuros]
+
+        falhas = [item for item in preparados if "erro" in item]
+
+        if falhas:
+            finalizar_log_importacao(
+                log_id=log_id,
+                status="ERROR",
+                registros_processados=0,
+                error_code=falhas[0]["erro"]["error_code"],
+                mensagem=" | ".join(
+                    f"{item['tipo_arquivo']}: {item['erro']['mensagem']}"
+                    for item in falhas
+                ),
+            )
+            return
+
+        if simulacao:
+            _finalizar_simulacao_pacote(log_id, preparados)
+            return
+
+        executor.submit(
+            _gravar_pacote_job,
+            {**parametros, "log_id": log_id, "preparados": preparados},
+        ).result()
+
+    except Exception as e:
+        logger.exception("Falha inesperada no pacote %s", log_id)
+
+        # Pool quebrado (ex.: worker morto): recria no próximo uso
+        _executor = None
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=0,
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(e),
+        )
+
+    finally:
+        # Relatórios de um pacote que não chegou ao COMMIT
+        for tipo_arquivo in arquivos:
+            descartar_relatorio_pendente(log_id, tipo_arquivo)
+
+        shutil.rmtree(pasta_job, ignore_errors=True)
+
+
+def enfileirar_pacote(
+    *,
+    pasta_job: str,
+    contrato_id: str,
+    usuario_email: str,
+    usuario_id: int,
+    sistema_origem_id: int | None,
+    modo_importacao: ModoImportacao,
+    senha_confirmacao: str | None = None,
+    hash_arquivo: str | None = None,
+    simulacao: bool = False,
+) -> int:
+    """
+    Importa vários arquivos do mesmo contrato com um único log.
+
+    Os arquivos são lidos e normalizados em paralelo no pool;
+    a gravação acontece depois, em uma transação, na ordem de
+    ORDEM_PACOTE. A pasta do job é removida ao final.
+
+    Com `simulacao`, os arquivos são apenas validados (relatório
+    de rejeições por tipo de arquivo), sem gravar em data_pr.
+    """
+    arquivos = identificar_arquivos_pacote(pasta_job)
+
+    for tipo_arquivo, caminho in arquivos.items():
+        config = obter_config_importacao(tipo_arquivo)
+
+        if config["por_contrato"]:
+            validar_modo_importacao(config, modo_importacao)
+
+        # Falha rápida: cabeçalho de cada arquivo antes de enfileirar
+        verificar_arquivo_pr(config, caminho)
+
+    log_id = criar_log_importacao(
+        contrato_id=contrato_id,
+        sistema_origem_id=sistema_origem_id,
+        usuario_id=usuario_id,
+        usuario_email=usuario_email,
+        tipo_arquivo="pacote",
+        nome_arquivo=", ".join(
+            os.path.basename(caminho) for caminho in arquivos.values()
+        ),
+        modo_importacao=modo_importacao.value,
+        total_registros=0,
+        hash_arquivo=hash_arquivo,
+        simulacao=simulacao,
+    )
+
+    parametros: Dict[str, Any] = {
+        "contrato_id": contrato_id,
+        "usuario_email": usuario_email,
+        "sistema_origem_id": sistema_origem_id,
+        "modo_importacao": modo_importacao,
+        "senha_confirmacao": senha_confirmacao,
+        "simulacao": simulacao,
+    }
+
+    threading.Thread(
+        target=_orquestrar_pacote,
+        args=(log_id, pasta_job, arquivos, parametros),
+        name=f"pacote-importacao-{log_id}",
+        daemon=True,
+    ).start()
+
+    return log_id
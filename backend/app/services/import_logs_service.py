@@ -128,6 +128,10 @@ def obter_import_log_por_id(
             mensagem,
             total_registros,
             registros_processados,
+            registros_rejeitados,
+            hash_arquivo,
+            simulacao,
+            metricas_etapas,
             usuario_id,
             usuario_email,
             started_at,
@@ -147,3 +151,93 @@ def obter_import_log_por_id(
         ).mappings().first()
 
     return dict(row) if row else None
+
+
+# ======================================================
+# PROGRESSO DE UMA IMPORTAÇÃO (POLLING)
+# ======================================================
+
+def obter_progresso_importacao(
+    *,
+    log_id: int,
+    contrato_id: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Linhas lidas e processadas, total (estimado durante a carga),
+    throughput e tempo restante estimado.
+    """
+
+    sql = text("""
+        SELECT
+            id,
+            status,
+            registros_lidos,
+            registros_processados,
+            total_registros,
+            started_at,
+            finished_at,
+            EXTRACT(
+                EPOCH FROM (COALESCE(finished_at, NOW()) - started_at)
+            ) AS segundos_decorridos
+        FROM control.importacoes_log
+        WHERE id = :log_id
+          AND contrato_id = :contrato_id
+    """)
+
+    with engine.begin() as conn:
+        row = conn.execute(
+            sql,
+            {
+                "log_id": log_id,
+                "contrato_id": contrato_id
+            }
+        ).mappings().first()
+
+    if not row:
+        return None
+
+    return {
+        "log_id": row["id"],
+        "status": row["status"],
+        "registros_lidos": row["registros_lidos"] or 0,
+        "registros_processados": row["registros_processados"] or 0,
+        "total_registros": row["total_registros"] or 0,
+        **calcular_progresso(
+            status=row["status"],
+            registros_lidos=row["registros_lidos"] or 0,
+            total_registros=row["total_registros"] or 0,
+            segundos_decorridos=float(row["segundos_decorridos"] or 0),
+        ),
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+
+
+def calcular_progresso(
+    *,
+    status: str,
+    registros_lidos: int,
+    total_registros: int,
+    segundos_decorridos: float,
+) -> Dict[str, Any]:
+    """
+    Percentual, throughput e tempo restante a partir das linhas
+    LIDAS: linhas rejeitadas ou ignoradas (já existentes) também
+    avançam a leitura, então o percentual chega a 100%.
+    """
+    lidos, total = registros_lidos, total_registros
+
+    linhas_por_segundo = (
+        lidos / segundos_decorridos if segundos_decorridos > 0 else None
+    )
+
+    segundos_restantes = None
+    if status == "PROCESSANDO" and linhas_por_segundo and total > lidos:
+        segundos_restantes = round((total - lidos) / linhas_por_segundo, 1)
+
+    return {
+        "percentual": round(min(lidos / total, 1) * 100, 1) if total else None,
+        "linhas_por_segundo": round(linhas_por_segundo, 1) if linhas_por_segundo else None,
+        "segundos_decorridos": round(segundos_decorridos, 1),
+        "segundos_restantes": segundos_restantes,
+    }
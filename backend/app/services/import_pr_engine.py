@@ -0,0 +1,1262 @@
+"""
+Motor único de importação PR (dirigido por TIPOS_IMPORTACAO)
+"""
+import logging
+import os
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+from app.core.import_bulk import carregar_via_copy, mesclar_alterados_via_copy
+from app.core.import_config import (
+    ORDEM_PACOTE,
+    TIPOS_IMPORTACAO,
+    ModoImportacao,
+)
+from app.core.import_log import (
+    atualizar_progresso_importacao,
+    criar_log_importacao,
+    finalizar_log_importacao,
+    reabrir_log_para_retomada,
+    registrar_checkpoint_importacao,
+    registrar_import_log,
+)
+from app.core.import_metricas import MedidorEtapas
+from app.core.import_normalization import (
+    calcular_hash_linhas,
+    materializar_categorias,
+    normalizar_tipos,
+)
+from app.core.import_reader import abrir_leitor, inspecionar_arquivo
+from app.core.import_rejeicoes import (
+    DetectorDuplicidade,
+    MotivoRejeicao,
+    RelatorioRejeicoes,
+    descartar_relatorio_pendente,
+    identificar_rejeicoes,
+    publicar_relatorio_pendente,
+)
+from app.core.particionamento import (
+    criar_particoes_contrato,
+    criar_particoes_mensais,
+    obter_particao_contrato,
+    preparar_tabela_troca,
+    trocar_particao,
+)
+from app.core.security import verificar_senha_usuario
+
+
+logger = logging.getLogger(__name__)
+
+
+# Colunas preenchidas pelo sistema (fora do hash de conteúdo)
+COLUNAS_CONTROLE = ("contrato_id", "sistema_origem_id", "hash_linha")
+
+
+# ======================================================
+# CONFIGURAÇÃO DO TIPO
+# ======================================================
+
+def obter_config_importacao(tipo_arquivo: str) -> Dict[str, Any]:
+    if tipo_arquivo not in TIPOS_IMPORTACAO:
+        raise BusinessException(
+            ErrorCode.IMPORT_TYPE_NOT_CONFIGURED,
+            detail=f"Tipo de importação não configurado: {tipo_arquivo}"
+        )
+
+    return TIPOS_IMPORTACAO[tipo_arquivo]
+
+
+def validar_modo_importacao(
+    config: Dict[str, Any],
+    modo_importacao: ModoImportacao,
+):
+    if (
+        modo_importacao == ModoImportacao.INCREMENTAL
+        and not config["permite_incremental"]
+    ):
+        raise BusinessException(
+            ErrorCode.INVALID_IMPORT_MODE,
+            detail="Carga incremental não permitida para este tipo"
+        )
+
+
+def validar_senha_importacao(
+    config: Dict[str, Any],
+    *,
+    modo_importacao: ModoImportacao,
+    usuario_email: str,
+    senha_confirmacao: str | None,
+):
+    """
+    INITIAL é destrutiva: exige confirmação de senha.
+    """
+    if not config["exige_senha"]:
+        return
+
+    if modo_importacao != ModoImportacao.INITIAL:
+        return
+
+    if not senha_confirmacao:
+        raise BusinessException(ErrorCode.INVALID_PASSWORD)
+
+    if not verificar_senha_usuario(
+        email=usuario_email,
+        senha_plana=senha_confirmacao
+    ):
+        raise BusinessException(ErrorCode.INVALID_PASSWORD)
+
+
+def validar_colunas(config: Dict[str, Any], colunas: Iterable[str]):
+    colunas_arquivo = set(colunas)
+    colunas_esperadas = set(config["colunas"])
+
+    faltantes = colunas_esperadas - colunas_arquivo
+    extras = (
+        set()
+        if config["aceita_colunas_extras"]
+        else colunas_arquivo - colunas_esperadas
+    )
+
+    if faltantes or extras:
+        detalhe = []
+
+        if faltantes:
+            detalhe.append(
+                f"Colunas ausentes: {', '.join(sorted(faltantes))}"
+            )
+        if extras:
+            detalhe.append(
+                f"Colunas extras: {', '.join(sorted(extras))}"
+            )
+
+        raise BusinessException(
+            ErrorCode.MISSING_REQUIRED_COLUMNS,
+            detail=" | ".join(detalhe)
+        )
+
+
+# ======================================================
+# PRÉ-VALIDAÇÃO (SOMENTE CABEÇALHO)
+# ======================================================
+
+def verificar_arquivo_pr(config: Dict[str, Any], caminho: str) -> Dict[str, Any]:
+    """
+    Abre o arquivo em modo leitura, lê apenas o cabeçalho e a
+    dimensão declarada e valida colunas, tamanho e linhas estimadas
+    contra a especificação do tipo — sem decodificar os dados.
+
+    Arquivos inválidos são recusados em milissegundos, antes da
+    senha e da leitura completa.
+    """
+    tamanho = os.path.getsize(caminho)
+    limite_bytes = settings.IMPORT_TAMANHO_MAXIMO_MB * 1024 * 1024
+
+    if tamanho > limite_bytes:
+        raise BusinessException(
+            ErrorCode.FILE_TOO_LARGE,
+            detail=f"Limite: {settings.IMPORT_TAMANHO_MAXIMO_MB} MB"
+        )
+
+    colunas, linhas_estimadas = inspecionar_arquivo(caminho)
+
+    if not colunas or linhas_estimadas == 0:
+        raise BusinessException(ErrorCode.EMPTY_FILE)
+
+    validar_colunas(config, colunas)
+
+    if (
+        settings.IMPORT_MAXIMO_LINHAS
+        and linhas_estimadas is not None
+        and linhas_estimadas > settings.IMPORT_MAXIMO_LINHAS
+    ):
+        raise BusinessException(
+            ErrorCode.FILE_TOO_LARGE,
+            detail=(
+                f"Cerca de {linhas_estimadas} linhas; "
+                f"limite: {settings.IMPORT_MAXIMO_LINHAS}"
+            )
+        )
+
+    return {
+        "colunas": colunas,
+        "linhas_estimadas": linhas_estimadas,
+        "tamanho": tamanho,
+    }
+
+
+# ======================================================
+# ETAPAS POR LOTE
+# ======================================================
+
+def tipar_lote(config: Dict[str, Any], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Tipagem, padrões e renomeações (vetorizado).
+    """
+    df = normalizar_tipos(df, config["colunas"])
+
+    for coluna, padrao in config["padroes"].items():
+        df[coluna] = df[coluna].fillna(padrao)
+
+    return df.rename(columns=config["renomear"])
+
+
+def validar_lote(
+    config: Dict[str, Any],
+    bruto: pd.DataFrame,
+    df: pd.DataFrame,
+    *,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Descarte de linhas inválidas (`bruto` = lote como lido, `df` =
+    lote tipado) e colunas de controle.
+
+    Retorna (linhas válidas, rejeições com motivo por linha).
+    """
+    rejeicoes = identificar_rejeicoes(
+        bruto,
+        df,
+        config["campos_obrigatorios"],
+        config["renomear"],
+    )
+
+    df = df[~df.index.isin(rejeicoes.index)].copy()
+
+    if "hash_linha" in config["colunas_destino"]:
+        df["hash_linha"] = calcular_hash_linhas(
+            df,
+            [
+                coluna
+                for coluna in config["colunas_destino"]
+                if coluna not in COLUNAS_CONTROLE
+            ],
+        )
+
+    if config["por_contrato"]:
+        df["contrato_id"] = contrato_id
+        df["sistema_origem_id"] = sistema_origem_id
+
+    return df, rejeicoes
+
+
+def rejeitar_duplicadas(
+    detector: DetectorDuplicidade,
+    config: Dict[str, Any],
+    df: pd.DataFrame,
+    rejeicoes: pd.DataFrame,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Linhas cuja chave (lógica, se houver) já apareceu no arquivo
+    (neste lote ou em um anterior) vão para as rejeições como
+    CHAVE_DUPLICADA; a primeira ocorrência é mantida.
+    """
+    colunas_chave = [
+        coluna
+        for coluna in config["chave_logica"] or config["chave_conflito"]
+        if coluna not in COLUNAS_CONTROLE
+    ]
+
+    if df.empty or not colunas_chave:
+        return df, rejeicoes
+
+    duplicadas = detector.duplicadas(df, colunas_chave)
+
+    if not duplicadas.any():
+        return df, rejeicoes
+
+    rejeicoes = pd.concat([
+        rejeicoes,
+        pd.DataFrame(
+            {
+                "motivo": MotivoRejeicao.CHAVE_DUPLICADA.value,
+                "coluna": ", ".join(colunas_chave),
+                "valor": pd.NA,
+            },
+            index=df.index[duplicadas.to_numpy()],
+        ),
+    ]).sort_index()
+
+    return df[~duplicadas], rejeicoes
+
+
+def normalizar_lote(
+    config: Dict[str, Any],
+    df: pd.DataFrame,
+    *,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Tipagem, padrões, renomeações, descarte de linhas inválidas
+    e colunas de controle — tudo vetorizado.
+
+    Retorna (linhas válidas, rejeições com motivo por linha).
+    """
+    return validar_lote(
+        config,
+        df,
+        tipar_lote(config, df),
+        contrato_id=contrato_id,
+        sistema_origem_id=sistema_origem_id,
+    )
+
+
+def gravar_lote(
+    conn: Connection,
+    config: Dict[str, Any],
+    df: pd.DataFrame,
+    *,
+    modo_importacao: ModoImportacao = ModoImportacao.INITIAL,
+) -> Tuple[int, int, int]:
+    """
+    Retorna (inseridos, atualizados, ignorados).
+
+    INCREMENTAL em tipos com hash_linha: linhas existentes com
+    conteúdo alterado são atualizadas; as idênticas são ignoradas.
+    """
+    if (
+        modo_importacao == ModoImportacao.INCREMENTAL
+        and "hash_linha" in config["colunas_destino"]
+    ):
+        return mesclar_alterados_via_copy(
+            conn,
+            tabela=config["tabela"],
+            colunas=config["colunas_destino"],
+            chave_conflito=config["chave_conflito"],
+            coluna_hash="hash_linha",
+            df=df,
+            chave_logica=config["chave_logica"],
+        )
+
+    inseridos, ignorados = carregar_via_copy(
+        conn,
+        tabela=config["tabela"],
+        colunas=config["colunas_destino"],
+        chave_conflito=config["chave_conflito"],
+        df=df,
+        chave_logica=config["chave_logica"],
+    )
+    return inseridos, 0, ignorados
+
+
+# ======================================================
+# PARTIÇÕES (TRANSAÇÃO PRÓPRIA, FORA DA CARGA)
+# ======================================================
+
+def meses_particao_lote(config: Dict[str, Any], df: pd.DataFrame) -> Set[date]:
+    """
+    Tipos com particao_mensal: meses presentes no lote (somente os
+    meses que existem nos dados, não o intervalo).
+    """
+    coluna = config["particao_mensal"]
+
+    if not coluna or df.empty:
+        return set()
+
+    meses = pd.to_datetime(df[coluna]).dropna().dt.to_period("M").unique()
+    return {mes.start_time.date() for mes in meses}
+
+
+def garantir_particoes_importacao(
+    *,
+    contrato_id: str,
+    meses: Iterable[date] = (),
+):
+    """
+    Partições do contrato e meses da carga, em transação própria e
+    curta: criar uma partição mensal move as linhas do mês para fora
+    da DEFAULT e faz ATTACH, o que bloqueia a DEFAULT e a partição do
+    contrato. Dentro da transação longa da importação, esses bloqueios
+    durariam a carga inteira.
+
+    Não pode ser chamada com a transação da carga aberta: o merge da
+    chave lógica já bloqueou a DEFAULT nela e o ATTACH esperaria
+    por ela.
+    """
+    meses = list(meses)
+
+    with engine.begin() as conn:
+        criar_particoes_contrato(conn, contrato_id)
+
+        if meses:
+            criar_particoes_mensais(conn, contrato_id=contrato_id, meses=meses)
+
+
+def garantir_meses_apos_carga(*, contrato_id: str, meses: Iterable[date]):
+    """
+    Meses vistos com a transação da carga aberta: as linhas foram
+    para a DEFAULT e são movidas agora, depois do COMMIT.
+
+    A importação já está commitada: uma falha aqui só é registrada
+    e as linhas ficam na DEFAULT (as consultas continuam corretas)
+    até a próxima carga desses meses.
+    """
+    try:
+        garantir_particoes_importacao(contrato_id=contrato_id, meses=meses)
+
+    except Exception:
+        logger.exception(
+            "Falha ao criar as partições mensais do contrato %s", contrato_id
+        )
+
+
+def limpar_dados_contrato(
+    conn: Connection,
+    config: Dict[str, Any],
+    *,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+):
+    """
+    DELETE da carga INITIAL (somente tipos com limpa_no_initial).
+    """
+    conn.execute(
+        text(f"""
+            DELETE FROM {config["tabela"]}
+            WHERE contrato_id = :contrato_id
+              AND sistema_origem_id = :sistema_origem_id
+        """),
+        {
+            "contrato_id": contrato_id,
+            "sistema_origem_id": sistema_origem_id,
+        }
+    )
+
+
+def preparar_destino_initial(
+    conn: Connection,
+    config: Dict[str, Any],
+    *,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+    retomada: bool = False,
+) -> Tuple[Dict[str, Any], Optional[Tuple[str, str]]]:
+    """
+    INITIAL com limpa_no_initial:
+
+    - tabela particionada por contrato → a carga vai para uma tabela
+      nova, trocada pela partição no final (concluir_destino_initial);
+    - sem partição → DELETE dos dados do contrato (não repetido
+      na retomada).
+
+    Retorna (config de gravação, partição a trocar ou None).
+    """
+    particao = obter_particao_contrato(
+        conn,
+        tabela=config["tabela"],
+        contrato_id=contrato_id,
+    )
+
+    if particao is not None:
+        tabela_nova = preparar_tabela_troca(
+            conn,
+            particao=particao,
+            contrato_id=contrato_id,
+            recriar=not retomada,
+        )
+
+        if tabela_nova is not None:
+            return {**config, "tabela": tabela_nova}, particao
+
+    if not retomada:
+        limpar_dados_contrato(
+            conn,
+            config,
+            contrato_id=contrato_id,
+            sistema_origem_id=sistema_origem_id,
+        )
+
+    return config, None
+
+
+def concluir_destino_initial(
+    conn: Connection,
+    config: Dict[str, Any],
+    particao: Optional[Tuple[str, str]],
+    *,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+):
+    if particao is not None:
+        trocar_particao(
+            conn,
+            tabela=config["tabela"],
+            particao=particao,
+            contrato_id=contrato_id,
+            sistema_origem_id=sistema_origem_id,
+        )
+
+
+# ======================================================
+# IMPORTAÇÃO COMPLETA
+# ======================================================
+
+def executar_importacao_pr(
+    tipo_arquivo: str,
+    *,
+    file: str,
+    contrato_id: str,
+    usuario_email: str,
+    usuario_id: int,
+    sistema_origem_id: int | None = None,
+    modo_importacao: ModoImportacao = ModoImportacao.INITIAL,
+    senha_confirmacao: str | None = None,
+    log_id: int | None = None,
+    commit_a_cada: int | None = None,
+    retomar_log_id: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Pipeline único: validar → ler em lotes → normalizar →
+    (INITIAL: tabela nova da partição ou DELETE) → COPY/merge →
+    (troca da partição) → log.
+
+    commit_a_cada: commita a cada N linhas gravando um checkpoint
+    no log (0/None = transação única, padrão IMPORT_COMMIT_A_CADA).
+
+    retomar_log_id: retoma uma importação com ERROR a partir do
+    checkpoint, reaproveitando o mesmo log. As linhas já commitadas
+    não são normalizadas nem reenviadas.
+
+    Linhas descartadas pela validação (inclusive chaves repetidas no
+    arquivo) vão, com o motivo, para o relatório de rejeições do log
+    (rejeicoes_<log_id>.csv.gz).
+    Tempo e pico de memória de cada etapa ficam em metricas_etapas.
+    """
+    registros_lidos = 0
+    registros_processados = 0
+    registros_atualizados = 0
+    registros_ignorados = 0
+    registros_commitados = 0
+    nome_arquivo = os.path.basename(file)
+
+    if commit_a_cada is None:
+        commit_a_cada = settings.IMPORT_COMMIT_A_CADA
+
+    checkpoint = None
+
+    if retomar_log_id is not None:
+        checkpoint = reabrir_log_para_retomada(
+            log_id=retomar_log_id,
+            contrato_id=contrato_id,
+            tipo_arquivo=tipo_arquivo,
+        )
+
+        if not checkpoint:
+            raise BusinessException(
+                ErrorCode.INVALID_IMPORT_MODE,
+                detail=f"Importação {retomar_log_id} não pode ser retomada"
+            )
+
+        log_id = retomar_log_id
+        sistema_origem_id = checkpoint["sistema_origem_id"]
+        modo_importacao = ModoImportacao(checkpoint["modo_importacao"])
+        registros_lidos = checkpoint["checkpoint_linhas"]
+        registros_processados = checkpoint["registros_processados"]
+        registros_commitados = registros_processados
+
+    elif log_id is None:
+        # Checkpoint e relatório de rejeições precisam do log desde o início
+        log_id = criar_log_importacao(
+            contrato_id=contrato_id,
+            sistema_origem_id=sistema_origem_id,
+            usuario_id=usuario_id,
+            usuario_email=usuario_email,
+            tipo_arquivo=tipo_arquivo,
+            nome_arquivo=nome_arquivo,
+            modo_importacao=modo_importacao.value,
+            total_registros=0,
+        )
+
+    medidor = MedidorEtapas()
+    relatorio = RelatorioRejeicoes(
+        log_id,
+        continuar=checkpoint is not None,
+        total_anterior=(checkpoint or {}).get("registros_rejeitados") or 0,
+    )
+
+    dados_log = {
+        "usuario_id": usuario_id,
+        "usuario_email": usuario_email,
+        "contrato_id": contrato_id,
+        "sistema_origem_id": sistema_origem_id,
+        "tipo_arquivo": tipo_arquivo,
+        "modo_importacao": modo_importacao.value,
+        "nome_arquivo": nome_arquivo,
+        "log_id": log_id,
+    }
+
+    try:
+        # --------------------------------------------------
+        # 1. Validar tipo e modo de importação
+        # --------------------------------------------------
+        config = obter_config_importacao(tipo_arquivo)
+        validar_modo_importacao(config, modo_importacao)
+
+        # --------------------------------------------------
+        # 2. Pré-validação (cabeçalho, tamanho, linhas)
+        # --------------------------------------------------
+        with medidor.etapa("pre_validacao"):
+            arquivo = verificar_arquivo_pr(config, file)
+
+        # Total estimado desde o início (acompanhamento do progresso)
+        atualizar_progresso_importacao(
+            log_id=log_id,
+            registros_processados=registros_processados,
+            registros_lidos=registros_lidos,
+            total_registros=arquivo["linhas_estimadas"],
+        )
+
+        # --------------------------------------------------
+        # 3. Validar senha (somente INITIAL)
+        # --------------------------------------------------
+        validar_senha_importacao(
+            config,
+            modo_importacao=modo_importacao,
+            usuario_email=usuario_email,
+            senha_confirmacao=senha_confirmacao,
+        )
+
+        # --------------------------------------------------
+        # 4. Partições do contrato (os meses vêm dos lotes)
+        # --------------------------------------------------
+        if config["por_contrato"]:
+            with medidor.etapa("particoes"):
+                garantir_particoes_importacao(contrato_id=contrato_id)
+
+        # --------------------------------------------------
+        # 5. Abrir arquivo (xlsx/csv/parquet, em lotes)
+        # --------------------------------------------------
+        with medidor.etapa("leitura"):
+            leitor = abrir_leitor(file, colunas=list(config["colunas"]))
+
+        with leitor:
+
+            # ----------------------------------------------
+            # 6. Execução (um lote por vez)
+            # ----------------------------------------------
+            registros_validos = 0
+            linhas_desde_commit = 0
+            numero_lote = checkpoint["checkpoint_lote"] if checkpoint else 0
+            linhas_ja_commitadas = registros_lidos
+            meses_criados: Set[date] = set()
+            meses_pendentes: Set[date] = set()
+
+            # Sem commit explícito, o bloco é desfeito ao sair (rollback)
+            with engine.connect() as conn:
+                config_gravacao, particao = config, None
+
+                if (
+                    modo_importacao == ModoImportacao.INITIAL
+                    and config["limpa_no_initial"]
+                ):
+                    with medidor.etapa("limpeza"):
+                        config_gravacao, particao = preparar_destino_initial(
+                            conn,
+                            config,
+                            contrato_id=contrato_id,
+                            sistema_origem_id=sistema_origem_id,
+                            retomada=checkpoint is not None,
+                        )
+
+                # Na retomada, as chaves já commitadas ficam com o ON CONFLICT
+                detector = DetectorDuplicidade()
+
+                lotes = medidor.medir_lotes(
+                    "leitura",
+                    leitor.lotes(pular_linhas=linhas_ja_commitadas),
+                )
+
+                for bruto in lotes:
+                    numero_lote += 1
+                    registros_lidos += len(bruto)
+                    linhas_desde_commit += len(bruto)
+
+                    with medidor.etapa("normalizacao", linhas=len(bruto)):
+                        tipado = tipar_lote(config, bruto)
+
+                    with medidor.etapa("validacao", linhas=len(bruto)):
+                        df, rejeicoes = validar_lote(
+                            config,
+                            bruto,
+                            tipado,
+                            contrato_id=contrato_id,
+                            sistema_origem_id=sistema_origem_id,
+                        )
+                        df, rejeicoes = rejeitar_duplicadas(
+                            detector, config, df, rejeicoes
+                        )
+                    relatorio.registrar(rejeicoes)
+
+                    # Meses novos só entre transações (antes da primeira
+                    # escrita ou logo após um commit); com a carga aberta,
+                    # as linhas vão para a DEFAULT e o mês é criado depois
+                    meses_pendentes |= meses_particao_lote(config, df) - meses_criados
+
+                    if meses_pendentes and not conn.in_transaction():
+                        with medidor.etapa("particoes"):
+                            garantir_particoes_importacao(
+                                contrato_id=contrato_id,
+                                meses=meses_pendentes,
+                            )
+                        meses_criados |= meses_pendentes
+                        meses_pendentes = set()
+
+                    if not df.empty:
+                        with medidor.etapa("gravacao", linhas=len(df)):
+                            inseridos, atualizados, ignorados = gravar_lote(
+                                conn,
+                                config_gravacao,
+                                df,
+                                modo_importacao=modo_importacao,
+                            )
+                        registros_processados += inseridos + atualizados
+                        registros_atualizados += atualizados
+                        registros_ignorados += ignorados
+                        registros_validos += len(df)
+
+                    if commit_a_cada and linhas_desde_commit >= commit_a_cada:
+                        registrar_checkpoint_importacao(
+                            conn,
+                            log_id=log_id,
+                            checkpoint_lote=numero_lote,
+                            checkpoint_linhas=registros_lidos,
+                            registros_processados=registros_processados,
+                            registros_rejeitados=relatorio.total,
+                        )
+
+                        with medidor.etapa("commit"):
+                            conn.commit()
+
+                        relatorio.publicar()
+
+                        registros_commitados = registros_processados
+                        linhas_desde_commit = 0
+
+                    else:
+                        # Fora da memória; entra no relatório após o COMMIT
+                        relatorio.descarregar()
+
+                        atualizar_progresso_importacao(
+                            log_id=log_id,
+                            registros_processados=registros_processados,
+                            registros_lidos=registros_lidos,
+                        )
+
+                if registros_lidos == 0:
+                    raise BusinessException(ErrorCode.EMPTY_FILE)
+
+                if registros_validos == 0 and linhas_ja_commitadas == 0:
+                    raise BusinessException(
+                        ErrorCode.EMPTY_FILE,
+                        detail="Nenhum registro válido após validações"
+                    )
+
+                with medidor.etapa("limpeza"):
+                    concluir_destino_initial(
+                        conn,
+                        config,
+                        particao,
+                        contrato_id=contrato_id,
+                        sistema_origem_id=sistema_origem_id,
+                    )
+
+                with medidor.etapa("commit"):
+                    conn.commit()
+
+                relatorio.publicar()
+
+            if meses_pendentes:
+                with medidor.etapa("particoes"):
+                    garantir_meses_apos_carga(
+                        contrato_id=contrato_id,
+                        meses=meses_pendentes,
+                    )
+
+        # --------------------------------------------------
+        # 7. Log de sucesso
+        # --------------------------------------------------
+        registrar_import_log(
+            **dados_log,
+            total_registros=registros_lidos,
+            registros_processados=registros_processados,
+            registros_rejeitados=relatorio.total,
+            metricas_etapas=medidor.resumo(),
+            status="SUCCESS",
+        )
+
+        return {
+            "success": True,
+            "data": {
+                "arquivo": nome_arquivo,
+                "modo_importacao": modo_importacao.value,
+                "log_id": log_id,
+                "registros_lidos": registros_lidos,
+                "registros_processados": registros_processados,
+                "registros_atualizados": registros_atualizados,
+                "registros_ignorados": registros_ignorados,
+                "registros_rejeitados": relatorio.total,
+            }
+        }
+
+    # ==================================================
+    # ERROS DE NEGÓCIO
+    # ==================================================
+    except BusinessException as e:
+        relatorio.descartar()
+
+        registrar_import_log(
+            **dados_log,
+            total_registros=registros_lidos,
+            registros_processados=registros_commitados,
+            registros_rejeitados=relatorio.total,
+            metricas_etapas=medidor.resumo(),
+            status="ERROR",
+            error_code=e.error_code.value,
+            mensagem=e.detail or e.message,
+        )
+        raise
+
+    # ==================================================
+    # ERROS INESPERADOS
+    # ==================================================
+    except Exception as e:
+        relatorio.descartar()
+
+        registrar_import_log(
+            **dados_log,
+            total_registros=registros_lidos,
+            registros_processados=registros_commitados,
+            registros_rejeitados=relatorio.total,
+            metricas_etapas=medidor.resumo(),
+            status="ERROR",
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(e),
+        )
+        raise
+
+
+# ======================================================
+# SIMULAÇÃO (DRY-RUN)
+# ======================================================
+
+def simular_importacao_pr(
+    tipo_arquivo: str,
+    *,
+    file: str,
+    contrato_id: str,
+    usuario_email: str,
+    usuario_id: int,
+    sistema_origem_id: int | None = None,
+    modo_importacao: ModoImportacao = ModoImportacao.INITIAL,
+    log_id: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Uma passada de validação em streaming, sem tocar em data_pr:
+    mesmas leitura, tipagem e regras da importação, mais a detecção
+    de chaves repetidas no arquivo.
+
+    As rejeições vão para o relatório do log (rejeicoes_<log>.csv.gz);
+    o log registra lidos, válidos e rejeitados.
+    """
+    nome_arquivo = os.path.basename(file)
+
+    if log_id is None:
+        log_id = criar_log_importacao(
+            contrato_id=contrato_id,
+            sistema_origem_id=sistema_origem_id,
+            usuario_id=usuario_id,
+            usuario_email=usuario_email,
+            tipo_arquivo=tipo_arquivo,
+            nome_arquivo=nome_arquivo,
+            modo_importacao=modo_importacao.value,
+            total_registros=0,
+            simulacao=True,
+        )
+
+    registros_lidos = 0
+    registros_validos = 0
+    relatorio = RelatorioRejeicoes(log_id)
+
+    try:
+        config = obter_config_importacao(tipo_arquivo)
+        validar_modo_importacao(config, modo_importacao)
+
+        detector = DetectorDuplicidade()
+
+        verificar_arquivo_pr(config, file)
+
+        with abrir_leitor(file, colunas=list(config["colunas"])) as leitor:
+            for df in leitor.lotes():
+                registros_lidos += len(df)
+
+                df, rejeicoes = normalizar_lote(
+                    config,
+                    df,
+                    contrato_id=contrato_id,
+                    sistema_origem_id=sistema_origem_id,
+                )
+                df, rejeicoes = rejeitar_duplicadas(detector, config, df, rejeicoes)
+
+                relatorio.registrar(rejeicoes)
+                relatorio.descarregar()
+                registros_validos += len(df)
+
+        if registros_lidos == 0:
+            raise BusinessException(ErrorCode.EMPTY_FILE)
+
+        relatorio.publicar()
+        resumo = relatorio.resumo()
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="SUCCESS",
+            registros_processados=registros_validos,
+            total_registros=registros_lidos,
+            registros_rejeitados=relatorio.total,
+            mensagem="Simulação: " + (
+                " | ".join(f"{motivo}: {total}" for motivo, total in resumo.items())
+                or "nenhuma rejeição"
+            ),
+        )
+
+        return {
+            "success": True,
+            "data": {
+                "arquivo": nome_arquivo,
+                "log_id": log_id,
+                "simulacao": True,
+                "registros_lidos": registros_lidos,
+                "registros_validos": registros_validos,
+                "registros_rejeitados": relatorio.total,
+                "rejeicoes_por_motivo": resumo,
+            }
+        }
+
+    except BusinessException as e:
+        relatorio.descartar()
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=0,
+            total_registros=registros_lidos,
+            registros_rejeitados=relatorio.total,
+            error_code=e.error_code.value,
+            mensagem=e.detail or e.message,
+        )
+        raise
+
+    except Exception as e:
+        relatorio.descartar()
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=0,
+            total_registros=registros_lidos,
+            registros_rejeitados=relatorio.total,
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(e),
+        )
+        raise
+
+
+# ======================================================
+# PACOTE: PREPARAÇÃO (PARALELA) E GRAVAÇÃO (ORDENADA)
+# ======================================================
+
+def preparar_arquivo_pr(
+    tipo_arquivo: str,
+    *,
+    file: str,
+    destino: str | None,
+    log_id: int,
+    contrato_id: str,
+    sistema_origem_id: int | None,
+) -> Dict[str, Any]:
+    """
+    Lê, valida e normaliza um arquivo sem tocar no banco.
+    Os lotes normalizados são gravados em Parquet (`destino`)
+    para a etapa de gravação; as linhas descartadas ficam pendentes
+    no relatório de rejeições do log (um por tipo de arquivo), que
+    a gravação publica após o COMMIT (publicar_relatorio_pendente).
+
+    `destino=None` (simulação do pacote): somente valida.
+    """
+    config = obter_config_importacao(tipo_arquivo)
+    colunas_destino = list(config["colunas_destino"])
+
+    registros_lidos = 0
+    registros_validos = 0
+    escritor = None
+    relatorio = RelatorioRejeicoes(log_id, tipo_arquivo=tipo_arquivo)
+    detector = DetectorDuplicidade()
+    meses = set()
+
+    try:
+        verificar_arquivo_pr(config, file)
+
+        with abrir_leitor(file, colunas=list(config["colunas"])) as leitor:
+            for df in leitor.lotes():
+                registros_lidos += len(df)
+
+                df, rejeicoes = normalizar_lote(
+                    config,
+                    df,
+                    contrato_id=contrato_id,
+                    sistema_origem_id=sistema_origem_id,
+                )
+                df, rejeicoes = rejeitar_duplicadas(detector, config, df, rejeicoes)
+
+                relatorio.registrar(rejeicoes)
+                relatorio.descarregar()
+
+                registros_validos += len(df)
+
+                if df.empty or destino is None:
+                    continue
+
+                tabela = pa.Table.from_pandas(
+                    materializar_categorias(df[colunas_destino]),
+                    schema=escritor.schema if escritor else None,
+                    preserve_index=False,
+                )
+
+                if escritor is None:
+                    escritor = pq.ParquetWriter(destino, tabela.schema)
+
+                escritor.write_table(tabela)
+                meses |= meses_particao_lote(config, df)
+
+    finally:
+        if escritor is not None:
+            escritor.close()
+
+    if registros_lidos == 0:
+        raise BusinessException(ErrorCode.EMPTY_FILE)
+
+    # Na simulação, um arquivo sem linhas válidas é só um resultado
+    if registros_validos == 0 and destino is not None:
+        raise BusinessException(
+            ErrorCode.EMPTY_FILE,
+            detail="Nenhum registro válido após validações"
+        )
+
+    return {
+        "tipo_arquivo": tipo_arquivo,
+        "arquivo": os.path.basename(file),
+        "preparado": destino,
+        "registros_lidos": registros_lidos,
+        "registros_validos": registros_validos,
+        "registros_rejeitados": relatorio.total,
+        "rejeicoes_por_motivo": relatorio.resumo(),
+        "meses_particao": sorted(meses),
+    }
+
+
+def gravar_arquivo_preparado(
+    conn: Connection,
+    config: Dict[str, Any],
+    caminho: str,
+    *,
+    modo_importacao: ModoImportacao,
+) -> Tuple[int, int, int]:
+    """
+    COPY/merge de um arquivo preparado, lote a lote.
+    Retorna (inseridos, atualizados, ignorados).
+    """
+    totais = [0, 0, 0]
+
+    arquivo = pq.ParquetFile(caminho)
+
+    for lote in arquivo.iter_batches(batch_size=settings.IMPORT_TAMANHO_LOTE):
+        df = lote.to_pandas()
+
+        resultado = gravar_lote(
+            conn,
+            config,
+            df,
+            modo_importacao=modo_importacao,
+        )
+        totais = [total + valor for total, valor in zip(totais, resultado)]
+
+    return tuple(totais)
+
+
+def gravar_pacote_pr(
+    *,
+    log_id: int,
+    preparados: List[Dict[str, Any]],
+    contrato_id: str,
+    usuario_email: str,
+    sistema_origem_id: int | None,
+    modo_importacao: ModoImportacao,
+    senha_confirmacao: str | None = None,
+) -> Dict[str, Any]:
+    """
+    Grava os arquivos preparados na ordem de ORDEM_PACOTE,
+    em uma única transação, e finaliza o log combinado.
+    As trocas de partição das cargas INITIAL ficam para o fim,
+    logo antes do COMMIT (trocar_particao).
+    """
+    por_tipo = {item["tipo_arquivo"]: item for item in preparados}
+    ordem = [tipo for tipo in ORDEM_PACOTE if tipo in por_tipo]
+
+    registros_lidos = sum(item["registros_lidos"] for item in preparados)
+    registros_rejeitados = sum(item["registros_rejeitados"] for item in preparados)
+    registros_processados = 0
+    linhas_concluidas = 0
+    resumo = []
+    trocas: List[Tuple[Dict[str, Any], Optional[Tuple[str, str]]]] = []
+
+    try:
+        configs = {tipo: obter_config_importacao(tipo) for tipo in ordem}
+
+        # Senha validada uma vez para o pacote inteiro
+        exige_senha = [c for c in configs.values() if c["exige_senha"]]
+        if exige_senha:
+            validar_senha_importacao(
+                exige_senha[0],
+                modo_importacao=modo_importacao,
+                usuario_email=usuario_email,
+                senha_confirmacao=senha_confirmacao,
+            )
+
+        atualizar_progresso_importacao(
+            log_id=log_id,
+            registros_processados=0,
+            registros_lidos=0,
+            total_registros=registros_lidos,
+        )
+
+        garantir_particoes_importacao(
+            contrato_id=contrato_id,
+            meses=[
+                mes
+                for item in preparados
+                for mes in item["meses_particao"]
+            ],
+        )
+
+        with engine.connect() as conn:
+            for tipo in ordem:
+                config = configs[tipo]
+
+                # Dimensões: sem sistema e sempre INITIAL
+                modo_tipo = (
+                    modo_importacao
+                    if config["por_contrato"]
+                    else ModoImportacao.INITIAL
+                )
+                validar_modo_importacao(config, modo_tipo)
+
+                config_gravacao, particao = config, None
+
+                if (
+                    modo_tipo == ModoImportacao.INITIAL
+                    and config["limpa_no_initial"]
+                ):
+                    config_gravacao, particao = preparar_destino_initial(
+                        conn,
+                        config,
+                        contrato_id=contrato_id,
+                        sistema_origem_id=sistema_origem_id,
+                    )
+
+                inseridos, atualizados, ignorados = gravar_arquivo_preparado(
+                    conn,
+                    config_gravacao,
+                    por_tipo[tipo]["preparado"],
+                    modo_importacao=modo_tipo,
+                )
+
+                trocas.append((config, particao))
+
+                registros_processados += inseridos + atualizados
+                linhas_concluidas += por_tipo[tipo]["registros_lidos"]
+                resumo.append(
+                    f"{tipo}: {inseridos} inseridos, {atualizados} atualizados, "
+                    f"{ignorados} ignorados"
+                )
+
+                atualizar_progresso_importacao(
+                    log_id=log_id,
+                    registros_processados=registros_processados,
+                    registros_lidos=linhas_concluidas,
+                )
+
+            # Trocas de partição por último: o DETACH bloqueia as
+            # leituras da tabela inteira até o COMMIT
+            for config, particao in trocas:
+                concluir_destino_initial(
+                    conn,
+                    config,
+                    particao,
+                    contrato_id=contrato_id,
+                    sistema_origem_id=sistema_origem_id,
+                )
+
+            conn.commit()
+
+        for tipo in ordem:
+            publicar_relatorio_pendente(log_id, tipo)
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="SUCCESS",
+            registros_processados=registros_processados,
+            total_registros=registros_lidos,
+            registros_rejeitados=registros_rejeitados,
+            mensagem=" | ".join(resumo),
+        )
+
+        return {
+            "log_id": log_id,
+            "ordem": ordem,
+            "registros_lidos": registros_lidos,
+            "registros_processados": registros_processados,
+            "registros_rejeitados": registros_rejeitados,
+        }
+
+    except BusinessException as e:
+        # Nada foi gravado: os relatórios pendentes não são publicados
+        for tipo in ordem:
+            descartar_relatorio_pendente(log_id, tipo)
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=0,
+            total_registros=registros_lidos,
+            registros_rejeitados=0,
+            error_code=e.error_code.value,
+            mensagem=e.detail or e.message,
+        )
+        raise
+
+    except Exception as e:
+        # Nada foi gravado: os relatórios pendentes não são publicados
+        for tipo in ordem:
+            descartar_relatorio_pendente(log_id, tipo)
+
+        finalizar_log_importacao(
+            log_id=log_id,
+            status="ERROR",
+            registros_processados=0,
+            total_registros=registros_lidos,
+            registros_rejeitados=0,
+            error_code=ErrorCode.UNEXPECTED_ERROR.value,
+            mensagem=str(e),
+        )
+        raise
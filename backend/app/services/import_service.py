@@ -2,12 +2,17 @@
 Serviço de Importação de Arquivos Excel
 """
 import os
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, List, Sequence
 from fastapi import HTTPException
-from sqlalchemy import text
+from sqlalchemy import column, table
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection
 
 from app.core.database import engine
+from app.core.import_config import TipoColuna
+from app.core.import_normalization import CONVERSORES
 from app.services.import_log_service import registrar_importacao
 
 SCHEMA_PR = "data_pr"
@@ -34,6 +39,22 @@ COLUNAS_ESPERADAS = {
     }
 }
 
+# Colunas efetivamente usadas na gravação (as demais não são lidas)
+COLUNAS_LIDAS = {
+    "os_selo": COLUNAS_ESPERADAS["os_selo"],
+    "os_lanc": COLUNAS_ESPERADAS["os_lanc"],
+    "his_selo": {
+        "id", "selo", "data", "tipo_ato", "capa", "livro", "folha", "ativ_sel"
+    },
+    "his_selo_detalhe_pr": {
+        "id", "selo_principal", "codtipoato", "dataato", "numpedido",
+        "protocolo", "documento", "valorbase", "quantidade", "status"
+    },
+    "tabela_de_lancamentos": {
+        "codlcto", "descricao", "tipo_lanc", "grupo_de_contas"
+    }
+}
+
 # Mapeamento de tabelas
 TABELA_MAP = {
     "os_selo": "os_selo",
@@ -44,6 +65,161 @@ TABELA_MAP = {
 }
 
 
+# ======================================================
+# INSERTS POR TABELA (CONSTRUCTS DO SQLALCHEMY)
+# ======================================================
+# Executados com uma lista de parâmetros por lote: como são
+# construções insert() (e não text()), o SQLAlchemy agrupa as
+# linhas em INSERTs multi-valores (insertmanyvalues), em vez de
+# uma ida ao banco por linha. As chaves dos parâmetros são os
+# nomes das colunas.
+
+def _tabela(nome: str, *colunas: str):
+    return table(nome, *(column(coluna) for coluna in colunas), schema=SCHEMA_PR)
+
+
+TABELA_OS_LANC = _tabela(
+    "fato_os_lanc",
+    "contrato_id", "id_origem", "os", "sequencia", "situacao", "lcto",
+    "quantidade", "valor", "valor_abs", "operacao", "natureza",
+    "capa", "livro", "folha", "selo_principal", "dt_lancou",
+    "data_lancamento_date", "recibo",
+)
+
+CHAVE_OS_LANC = ("contrato_id", "os", "sequencia")
+
+_INSERT_OS_LANC = insert(TABELA_OS_LANC)
+SQL_OS_LANC = _INSERT_OS_LANC.on_conflict_do_update(
+    index_elements=list(CHAVE_OS_LANC),
+    set_={
+        "situacao": _INSERT_OS_LANC.excluded.situacao,
+        "valor": _INSERT_OS_LANC.excluded.valor,
+        "valor_abs": _INSERT_OS_LANC.excluded.valor_abs,
+    },
+)
+
+SQL_OS_SELO = insert(
+    _tabela("os_selo", "contrato_id", "id_origem", "os", "codigo_selo")
+).on_conflict_do_nothing(index_elements=["contrato_id", "os", "codigo_selo"])
+
+# Colunas do Excel gravadas em his_selo (ausentes → NULL)
+COLUNAS_HIS_SELO = ("selo", "data", "tipo_ato", "capa", "livro", "folha", "ativ_sel")
+
+SQL_HIS_SELO = insert(
+    _tabela("his_selo", "contrato_id", "id_origem", *COLUNAS_HIS_SELO)
+)
+
+SQL_HIS_SELO_DETALHE = insert(
+    _tabela(
+        "his_selo_detalhe_pr",
+        "contrato_id", "id_origem", "selo_principal", "cod_tipo_ato",
+        "data_ato", "num_pedido", "protocolo", "documento",
+        "valor_base", "quantidade", "status",
+    )
+)
+
+_INSERT_TABELA_LANCAMENTOS = insert(
+    _tabela(
+        "tabela_de_lancamentos",
+        "contrato_id", "codlcto", "descricao", "tipo_lanc", "grupo_de_contas",
+    )
+)
+CHAVE_TABELA_LANCAMENTOS = ("contrato_id", "codlcto")
+
+SQL_TABELA_LANCAMENTOS = _INSERT_TABELA_LANCAMENTOS.on_conflict_do_update(
+    index_elements=list(CHAVE_TABELA_LANCAMENTOS),
+    set_={"descricao": _INSERT_TABELA_LANCAMENTOS.excluded.descricao},
+)
+
+
+# ======================================================
+# AUXILIARES VETORIZADOS
+# ======================================================
+
+def _codigo(df: pd.DataFrame, coluna: str) -> pd.Series:
+    """
+    Coluna como texto (sem ".0" de floats inteiros); ausente → nulo.
+    """
+    if coluna not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+
+    return CONVERSORES[TipoColuna.CODIGO](df[coluna])
+
+
+def _numero(df: pd.DataFrame, coluna: str, *, inteiro: bool = False) -> pd.Series:
+    if coluna not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+
+    serie = pd.to_numeric(df[coluna], errors="coerce")
+
+    # Inteiro por truncamento, como o int() da gravação linha a linha
+    return np.trunc(serie).astype("Int64") if inteiro else serie
+
+
+def _para_registros(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Parâmetros do executemany: NaN/NaT/NA viram None em uma
+    única conversão da tabela inteira.
+    """
+    valores = df.astype(object)
+    return valores.where(df.notna(), None).to_dict("records")
+
+
+def _ultima_por_chave(df: pd.DataFrame, chave: Sequence[str]) -> pd.DataFrame:
+    """
+    Uma linha por chave do ON CONFLICT, a última do arquivo: um
+    INSERT multi-valores não pode atualizar a mesma linha duas vezes
+    ("command cannot affect row a second time"). Na gravação linha a
+    linha, a última também prevalecia. Chaves com nulo não conflitam
+    no banco e ficam todas.
+    """
+    com_chave = df[list(chave)].notna().all(axis=1)
+    repetidas = df[com_chave].duplicated(subset=list(chave), keep="last")
+
+    return df.drop(index=repetidas[repetidas].index)
+
+
+def _gravar_em_lotes(
+    conn: Connection,
+    sql,
+    df: pd.DataFrame,
+    tamanho_lote: int,
+    *,
+    chave: Sequence[str] = (),
+) -> int:
+    """
+    Retorna as linhas processadas do arquivo (repetições incluídas).
+    `chave`: colunas do ON CONFLICT DO UPDATE.
+    """
+    dados = _ultima_por_chave(df, chave) if chave else df
+
+    for inicio in range(0, len(dados), tamanho_lote):
+        conn.execute(sql, _para_registros(dados.iloc[inicio:inicio + tamanho_lote]))
+
+    return len(df)
+
+
+def _derivar_colunas_os_lanc(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    valor_abs, natureza, data_lancamento_date e o selo_principal
+    IDREF (capa + livro + folha), calculados na coluna inteira.
+    """
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
+    df["quantidade"] = pd.to_numeric(df["quantidade"], errors="coerce").fillna(1)
+    df["valor_abs"] = df["valor"].abs()
+    df["natureza"] = df["operacao"].map({"E": "ENTRADA", "S": "SAIDA"})
+    df["dt_lancou"] = pd.to_datetime(df["dt_lancou"], errors="coerce")
+    df["data_lancamento_date"] = df["dt_lancou"].dt.normalize()
+
+    df["selo_principal"] = "IDREF-" + (
+        df["capa"].fillna("").astype(str)
+        + df["livro"].fillna("").astype(str)
+        + df["folha"].fillna("").astype(str)
+    )
+
+    return df
+
+
 class ImportService:
     """
     Serviço para importação de arquivos Excel
@@ -62,8 +238,16 @@ class ImportService:
         Importa arquivo Excel para o banco de dados
         """
         try:
-            # Lê Excel
-            df = pd.read_excel(caminho_excel)
+            # Lê Excel (somente as colunas usadas pelo tipo)
+            colunas_lidas = COLUNAS_LIDAS.get(tipo_arquivo)
+            df = pd.read_excel(
+                caminho_excel,
+                usecols=(
+                    (lambda coluna: str(coluna).strip().lower() in colunas_lidas)
+                    if colunas_lidas
+                    else None
+                ),
+            )
             df.columns = [c.strip().lower() for c in df.columns]
             
             # Valida colunas mínimas (verifica se as esperadas estão presentes)
@@ -77,17 +261,17 @@ class ImportService:
             # Adiciona contrato_id
             df["contrato_id"] = contrato_id
             
-            # Processa de acordo com o tipo
+            # Processa de acordo com o tipo (gravação em lotes de chunk_size)
             if tipo_arquivo == "os_lanc":
-                total = ImportService._importar_os_lanc(df, contrato_id)
+                total = ImportService._importar_os_lanc(df, contrato_id, chunk_size)
             elif tipo_arquivo == "os_selo":
-                total = ImportService._importar_os_selo(df, contrato_id)
+                total = ImportService._importar_os_selo(df, contrato_id, chunk_size)
             elif tipo_arquivo == "his_selo":
-                total = ImportService._importar_his_selo(df, contrato_id)
+                total = ImportService._importar_his_selo(df, contrato_id, chunk_size)
             elif tipo_arquivo == "his_selo_detalhe_pr":
-                total = ImportService._importar_his_selo_detalhe(df, contrato_id)
+                total = ImportService._importar_his_selo_detalhe(df, contrato_id, chunk_size)
             elif tipo_arquivo == "tabela_de_lancamentos":
-                total = ImportService._importar_tabela_lancamentos(df, contrato_id)
+                total = ImportService._importar_tabela_lancamentos(df, contrato_id, chunk_size)
             else:
                 raise ValueError(f"Tipo de arquivo não suportado: {tipo_arquivo}")
             
@@ -126,120 +310,61 @@ class ImportService:
                 os.remove(caminho_excel)
     
     @staticmethod
-    def _importar_os_lanc(df: pd.DataFrame, contrato_id: str) -> int:
+    def _importar_os_lanc(df: pd.DataFrame, contrato_id: str, chunk_size: int) -> int:
         """
         Importa dados de OS x Lançamentos
         """
-        # Tratamentos
-        df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
-        df["quantidade"] = pd.to_numeric(df["quantidade"], errors="coerce").fillna(1)
-        df["valor_abs"] = df["valor"].abs()
-        df["natureza"] = df["operacao"].map({"E": "ENTRADA", "S": "SAIDA"})
-        df["data_lancamento_date"] = pd.to_datetime(df["dt_lancou"], errors="coerce").dt.date
-        df["selo_principal"] = "IDREF-" + df["capa"].fillna("").astype(str) + df["livro"].fillna("").astype(str) + df["folha"].fillna("").astype(str)
-        
-        sql = text("""
-        INSERT INTO data_pr.fato_os_lanc (
-            contrato_id, id_origem, os, sequencia, situacao, lcto,
-            quantidade, valor, valor_abs, operacao, natureza,
-            capa, livro, folha, selo_principal, dt_lancou,
-            data_lancamento_date, recibo
-        ) VALUES (
-            :contrato_id, :id, :os, :sequencia, :situacao, :lcto,
-            :quantidade, :valor, :valor_abs, :operacao, :natureza,
-            :capa, :livro, :folha, :selo_principal, :dt_lancou,
-            :data_lancamento_date, :recibo
-        )
-        ON CONFLICT (contrato_id, os, sequencia) DO UPDATE SET
-            situacao = EXCLUDED.situacao,
-            valor = EXCLUDED.valor,
-            valor_abs = EXCLUDED.valor_abs
-        """)
-        
-        total = 0
+        df = _derivar_colunas_os_lanc(df)
+        df["contrato_id"] = contrato_id
+
+        df = df.rename(columns={"id": "id_origem"})
+        colunas = [coluna.name for coluna in TABELA_OS_LANC.columns]
+
         with engine.begin() as conn:
-            for _, row in df.iterrows():
-                conn.execute(sql, {**row.to_dict(), "contrato_id": contrato_id})
-                total += 1
-        
-        return total
-    
+            return _gravar_em_lotes(
+                conn, SQL_OS_LANC, df[colunas], chunk_size, chave=CHAVE_OS_LANC
+            )
+
     @staticmethod
-    def _importar_os_selo(df: pd.DataFrame, contrato_id: str) -> int:
+    def _importar_os_selo(df: pd.DataFrame, contrato_id: str, chunk_size: int) -> int:
         """
         Importa dados de OS x Selo
         """
-        sql = text("""
-        INSERT INTO data_pr.os_selo (contrato_id, id_origem, os, codigo_selo)
-        VALUES (:contrato_id, :id, :os, :selo)
-        ON CONFLICT (contrato_id, os, codigo_selo) DO NOTHING
-        """)
-        
-        total = 0
+        dados = pd.DataFrame({
+            "contrato_id": contrato_id,
+            "id_origem": _codigo(df, "id"),
+            "os": _codigo(df, "os"),
+            "codigo_selo": _codigo(df, "selo"),
+        })
+
         with engine.begin() as conn:
-            for _, row in df.iterrows():
-                conn.execute(sql, {
-                    "contrato_id": contrato_id,
-                    "id": str(row.get("id", "")),
-                    "os": str(row.get("os", "")),
-                    "selo": str(row.get("selo", ""))
-                })
-                total += 1
-        
-        return total
-    
+            return _gravar_em_lotes(conn, SQL_OS_SELO, dados, chunk_size)
+
     @staticmethod
-    def _importar_his_selo(df: pd.DataFrame, contrato_id: str) -> int:
+    def _importar_his_selo(df: pd.DataFrame, contrato_id: str, chunk_size: int) -> int:
         """
         Importa histórico de selos
         """
-        # Pega todas as colunas disponíveis
-        colunas_db = [
-            "contrato_id", "id_origem", "auto_inc", "ativ_sel", "data", "hora",
-            "operador", "tipo_ato", "capa", "livro", "folha", "servico",
-            "tipo_his", "tipo_selo", "selo", "validador", "qtd", "data_envio",
-            "data_compra", "finalizado", "baixado_postgres", "data_locacao",
-            "hora_locacao", "id_status", "id_natureza_funapen", "id_usuario",
-            "numero_pedido", "tem_erro"
-        ]
-        
-        total = 0
+        dados = pd.DataFrame({
+            "contrato_id": contrato_id,
+            "id_origem": _codigo(df, "id"),
+        })
+
+        for coluna in COLUNAS_HIS_SELO:
+            if coluna == "data":
+                dados[coluna] = (
+                    pd.to_datetime(df[coluna], errors="coerce")
+                    if coluna in df.columns
+                    else None
+                )
+            else:
+                dados[coluna] = _codigo(df, coluna)
+
         with engine.begin() as conn:
-            for _, row in df.iterrows():
-                params = {"contrato_id": contrato_id, "id_origem": str(row.get("id", ""))}
-                
-                # Mapeia colunas do Excel para colunas do banco
-                if "selo" in row:
-                    params["selo"] = str(row["selo"])
-                if "data" in row:
-                    params["data"] = row["data"]
-                if "tipo_ato" in row:
-                    params["tipo_ato"] = str(row["tipo_ato"])
-                if "capa" in row:
-                    params["capa"] = str(row.get("capa", ""))
-                if "livro" in row:
-                    params["livro"] = str(row.get("livro", ""))
-                if "folha" in row:
-                    params["folha"] = str(row.get("folha", ""))
-                if "ativ_sel" in row:
-                    params["ativ_sel"] = str(row.get("ativ_sel", ""))
-                
-                # SQL dinâmico baseado nos parâmetros disponíveis
-                campos = ", ".join(params.keys())
-                valores = ", ".join([f":{k}" for k in params.keys()])
-                
-                sql = text(f"""
-                INSERT INTO data_pr.his_selo ({campos})
-                VALUES ({valores})
-                """)
-                
-                conn.execute(sql, params)
-                total += 1
-        
-        return total
-    
+            return _gravar_em_lotes(conn, SQL_HIS_SELO, dados, chunk_size)
+
     @staticmethod
-    def _importar_his_selo_detalhe(df: pd.DataFrame, contrato_id: str) -> int:
+    def _importar_his_selo_detalhe(df: pd.DataFrame, contrato_id: str, chunk_size: int) -> int:
         """
         Importa histórico de selo detalhe PR
         """
@@ -254,66 +379,42 @@ class ImportService:
             "recordnumber": "record_number",
             "selo_principal": "selo_principal"
         })
-        
-        total = 0
+
+        dados = pd.DataFrame({
+            "contrato_id": contrato_id,
+            "id_origem": _codigo(df, "id"),
+            "selo_principal": _codigo(df, "selo_principal"),
+            "cod_tipo_ato": _numero(df, "cod_tipo_ato", inteiro=True),
+            "data_ato": pd.to_datetime(df["data_ato"], errors="coerce"),
+            "num_pedido": _codigo(df, "num_pedido"),
+            "protocolo": _codigo(df, "protocolo"),
+            "documento": _codigo(df, "documento"),
+            "valor_base": _numero(df, "valor_base"),
+            "quantidade": _numero(df, "quantidade", inteiro=True),
+            "status": _numero(df, "status", inteiro=True),
+        })
+
         with engine.begin() as conn:
-            for _, row in df.iterrows():
-                params = {
-                    "contrato_id": contrato_id,
-                    "id_origem": str(row.get("id", "")),
-                    "selo_principal": str(row.get("selo_principal", "")),
-                    "cod_tipo_ato": int(row["cod_tipo_ato"]) if pd.notna(row.get("cod_tipo_ato")) else None,
-                    "data_ato": row.get("data_ato"),
-                    "num_pedido": str(row.get("num_pedido", "")) if pd.notna(row.get("num_pedido")) else None,
-                    "protocolo": str(row.get("protocolo", "")) if pd.notna(row.get("protocolo")) else None,
-                    "documento": str(row.get("documento", "")) if pd.notna(row.get("documento")) else None,
-                    "valor_base": float(row["valor_base"]) if pd.notna(row.get("valor_base")) else None,
-                    "quantidade": int(row["quantidade"]) if pd.notna(row.get("quantidade")) else None,
-                    "status": int(row["status"]) if pd.notna(row.get("status")) else None
-                }
-                
-                sql = text("""
-                INSERT INTO data_pr.his_selo_detalhe_pr (
-                    contrato_id, id_origem, selo_principal, cod_tipo_ato,
-                    data_ato, num_pedido, protocolo, documento,
-                    valor_base, quantidade, status
-                ) VALUES (
-                    :contrato_id, :id_origem, :selo_principal, :cod_tipo_ato,
-                    :data_ato, :num_pedido, :protocolo, :documento,
-                    :valor_base, :quantidade, :status
-                )
-                """)
-                
-                conn.execute(sql, params)
-                total += 1
-        
-        return total
-    
+            return _gravar_em_lotes(conn, SQL_HIS_SELO_DETALHE, dados, chunk_size)
+
     @staticmethod
-    def _importar_tabela_lancamentos(df: pd.DataFrame, contrato_id: str) -> int:
+    def _importar_tabela_lancamentos(df: pd.DataFrame, contrato_id: str, chunk_size: int) -> int:
         """
         Importa tabela de referência de lançamentos
         """
-        sql = text("""
-        INSERT INTO data_pr.tabela_de_lancamentos (
-            contrato_id, codlcto, descricao, tipo_lanc, grupo_de_contas
-        ) VALUES (
-            :contrato_id, :codlcto, :descricao, :tipo_lanc, :grupo_de_contas
-        )
-        ON CONFLICT (contrato_id, codlcto) DO UPDATE SET
-            descricao = EXCLUDED.descricao
-        """)
-        
-        total = 0
+        dados = pd.DataFrame({
+            "contrato_id": contrato_id,
+            "codlcto": _codigo(df, "codlcto"),
+            "descricao": _codigo(df, "descricao"),
+            "tipo_lanc": _codigo(df, "tipo_lanc"),
+            "grupo_de_contas": _codigo(df, "grupo_de_contas"),
+        })
+
         with engine.begin() as conn:
-            for _, row in df.iterrows():
-                conn.execute(sql, {
-                    "contrato_id": contrato_id,
-                    "codlcto": str(row.get("codlcto", "")),
-                    "descricao": str(row.get("descricao", "")),
-                    "tipo_lanc": str(row.get("tipo_lanc", "")) if pd.notna(row.get("tipo_lanc")) else None,
-                    "grupo_de_contas": str(row.get("grupo_de_contas", "")) if pd.notna(row.get("grupo_de_contas")) else None
-                })
-                total += 1
-        
-        return total
+            return _gravar_em_lotes(
+                conn,
+                SQL_TABELA_LANCAMENTOS,
+                dados,
+                chunk_size,
+                chave=CHAVE_TABELA_LANCAMENTOS,
+            )
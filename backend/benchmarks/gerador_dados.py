@@ -0,0 +1,441 @@
+"""
+Gerador de dados sintéticos das tabelas data_pr (volume de produção)
+
+Gera os_lanc, os_selo, his_selo, his_selo_detalhe_pr e tipo_lancamento
+para N contratos com M linhas por tabela, no layout dos arquivos de
+importação. Mesma semente → mesmos dados (base padrão de medição).
+
+Uso (a partir de backend/):
+    python -m benchmarks.gerador_dados --contratos 2 --linhas 100000
+    python -m benchmarks.gerador_dados --formato csv --saida dados_sinteticos
+    python -m benchmarks.gerador_dados --banco --sistema-origem 1
+
+Arquivos: <saida>/<contrato_id>/<tipo>.<formato>. Cada pasta é um
+pacote completo (inclui tabela_lancamentos), aceito por /import/pacote
+depois de compactada.
+"""
+import argparse
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.import_config import ORDEM_PACOTE, ModoImportacao
+from app.core.import_reader import EXTENSOES_IMPORTACAO, LINHA_INICIAL_DADOS
+from app.core.particionamento import criar_particoes_contrato
+from app.services.import_pr_engine import (
+    garantir_particoes_importacao,
+    gravar_lote,
+    normalizar_lote,
+    obter_config_importacao,
+)
+
+
+# Contratos sintéticos: 9xxxxx (não colidem com os reais)
+PREFIXO_CONTRATO = 9
+
+TOTAL_TIPOS_LANCAMENTO = 200
+
+# Período coberto pelas datas geradas
+DATA_INICIAL = pd.Timestamp("2022-01-01")
+DIAS_PERIODO = 3 * 365
+
+# Lançamentos por OS (sequencia 1..N)
+LANCAMENTOS_POR_OS = 3
+
+SITUACOES = np.array(["0", "1", "2", "3", "4", "5", "6"])
+PESOS_SITUACOES = np.array([0.15, 0.55, 0.05, 0.08, 0.02, 0.13, 0.02])
+
+GRUPOS_LANCAMENTO = {
+    "REGISTRO_CIVIL": ("NASCIMENTO", "CASAMENTO", "OBITO"),
+    "TABELIONATO": ("NOTAS", "PROCURACAO", "RECONHECIMENTO"),
+    "PROTESTO": ("PROTESTO",),
+    "RECEITA": ("EMOLUMENTOS", "FUNREJUS"),
+    "DESPESA": ("ISS", "FUNDEP"),
+}
+
+
+# ======================================================
+# AUXILIARES (VETORIZADOS)
+# ======================================================
+
+def _codigos(prefixo: str, numeros: np.ndarray, largura: int) -> pd.Series:
+    return prefixo + pd.Series(numeros).astype(str).str.zfill(largura)
+
+
+def _datas(rng: np.random.Generator, total: int) -> pd.Series:
+    segundos = rng.integers(0, DIAS_PERIODO * 86400, total)
+    return pd.Series(DATA_INICIAL + pd.to_timedelta(segundos, unit="s"))
+
+
+def _aplicar_duplicadas(
+    df: pd.DataFrame,
+    taxa: float,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    """
+    Sobrescreve uma fração das linhas com cópias de outras
+    (mesma chave), como nas exportações repetidas dos sistemas.
+    """
+    total = int(len(df) * taxa)
+
+    if total == 0:
+        return df
+
+    destino = rng.choice(len(df), total, replace=False)
+    origem = rng.integers(0, len(df), total)
+
+    for coluna in df.columns:
+        valores = df[coluna].to_numpy(copy=True)
+        valores[destino] = valores[origem]
+        df[coluna] = valores
+
+    return df
+
+
+def _aplicar_sem_selo(
+    df: pd.DataFrame,
+    coluna: str,
+    taxa: float,
+    rng: np.random.Generator,
+) -> pd.DataFrame:
+    df[coluna] = df[coluna].mask(rng.random(len(df)) < taxa)
+    return df
+
+
+# ======================================================
+# GERAÇÃO DAS TABELAS
+# ======================================================
+
+def gerar_tipos_lancamento(
+    rng: np.random.Generator,
+    total: int = TOTAL_TIPOS_LANCAMENTO,
+) -> pd.DataFrame:
+    """
+    Dimensão tipo_lancamento (comum a todos os contratos).
+    """
+    tipos = rng.choice(list(GRUPOS_LANCAMENTO), total)
+
+    return pd.DataFrame({
+        "codlcto": pd.Series(np.arange(100, 100 + total)).astype(str),
+        "descricao": _codigos("Ato ", np.arange(1, total + 1), 3),
+        "tipo_lanc": tipos,
+        "grupodecontas": [rng.choice(GRUPOS_LANCAMENTO[tipo]) for tipo in tipos],
+        "status_inativo": rng.random(total) < 0.05,
+    })
+
+
+def gerar_dados_contrato(
+    contrato_id: str,
+    linhas: int,
+    *,
+    codigos_lancamento: pd.Series,
+    taxa_duplicadas: float = 0.0,
+    taxa_sem_selo: float = 0.0,
+    semente: Optional[int] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    `linhas` por tabela, colunas no layout do arquivo (ex.: dataato).
+    Os selos de os_selo, his_selo e his_selo_detalhe_pr saem do
+    mesmo conjunto, como nos dados reais.
+    """
+    rng = np.random.default_rng(semente)
+    numeros = np.arange(1, linhas + 1)
+
+    selos = _codigos(f"SFTN{contrato_id}.", numeros, 9)
+    lcto = rng.choice(codigos_lancamento.to_numpy(), linhas)
+
+    # --------------------------------------------------
+    # os_lanc: OS com LANCAMENTOS_POR_OS sequências
+    # --------------------------------------------------
+    numeros_os = (numeros - 1) // LANCAMENTOS_POR_OS + 1
+    valor = np.round(rng.gamma(2.0, 45.0, linhas), 2)
+    estorno = rng.random(linhas) < 0.1
+
+    os_lanc = pd.DataFrame({
+        "id": numeros.astype(str),
+        "situacao": rng.choice(SITUACOES, linhas, p=PESOS_SITUACOES),
+        "quantidade": rng.integers(1, 6, linhas),
+        "valor": np.where(estorno, -valor, valor),
+        "capa": rng.integers(1, 500, linhas).astype(str),
+        "livro": _codigos("L", rng.integers(1, 300, linhas), 3),
+        "folha": rng.integers(1, 300, linhas).astype(str),
+        "dt_lancou": _datas(rng, linhas),
+        "os": numeros_os.astype(str),
+        "sequencia": ((numeros - 1) % LANCAMENTOS_POR_OS + 1).astype(str),
+        "operacao": np.where(estorno, "D", "C"),
+        "lcto": lcto,
+        "recibo": _codigos("R", numeros_os, 8),
+    })
+
+    # --------------------------------------------------
+    # os_selo: um selo por linha, em OS existentes
+    # --------------------------------------------------
+    os_selo = pd.DataFrame({
+        "id": numeros.astype(str),
+        "os_id": rng.choice(os_lanc["os"].to_numpy(), linhas),
+        "selo": selos,
+        "quantidade": rng.integers(1, 3, linhas),
+    })
+
+    # --------------------------------------------------
+    # his_selo / his_selo_detalhe_pr
+    # --------------------------------------------------
+    datas_atos = _datas(rng, linhas).dt.normalize()
+
+    his_selo = pd.DataFrame({
+        "id": numeros.astype(str),
+        "selo": selos.sample(frac=1, random_state=rng).to_numpy(),
+        "tipo_ato": lcto,
+        "capa": os_lanc["capa"],
+        "livro": os_lanc["livro"],
+        "folha": os_lanc["folha"],
+        "quantidade": 1,
+        "data": datas_atos,
+    })
+
+    detalhe = pd.DataFrame({
+        "id": numeros.astype(str),
+        "selo_principal": rng.choice(selos.to_numpy(), linhas),
+        "id_codigo_ato": rng.choice(codigos_lancamento.to_numpy(), linhas),
+        "dataato": datas_atos.sample(frac=1, random_state=rng).to_numpy(),
+    })
+
+    dados = {
+        "os_lanc": os_lanc,
+        "os_selo": _aplicar_sem_selo(os_selo, "selo", taxa_sem_selo, rng),
+        "his_selo": _aplicar_sem_selo(his_selo, "selo", taxa_sem_selo, rng),
+        "his_selo_detalhe_pr": _aplicar_sem_selo(
+            detalhe, "selo_principal", taxa_sem_selo, rng
+        ),
+    }
+
+    return {
+        tipo: _aplicar_duplicadas(df, taxa_duplicadas, rng)
+        for tipo, df in dados.items()
+    }
+
+
+# ======================================================
+# SAÍDA: ARQUIVOS DE IMPORTAÇÃO
+# ======================================================
+
+def _salvar_xlsx(df: pd.DataFrame, caminho: str):
+    """
+    Workbook em modo write-only: memória constante mesmo com
+    1 milhão de linhas (limite da planilha: 1.048.575 linhas).
+    """
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet()
+    planilha.append(list(df.columns))
+
+    valores = df.astype(object).where(df.notna(), None)
+
+    for linha in valores.itertuples(index=False, name=None):
+        planilha.append(linha)
+
+    workbook.save(caminho)
+
+
+def salvar_arquivo(df: pd.DataFrame, caminho: str):
+    """
+    Formato pela extensão (.xlsx, .csv, .parquet).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao == ".xlsx":
+        _salvar_xlsx(df, caminho)
+    elif extensao == ".csv":
+        df.to_csv(caminho, sep=";", index=False)
+    elif extensao == ".parquet":
+        df.to_parquet(caminho, index=False)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {extensao}")
+
+
+def salvar_pacote(
+    dados: Dict[str, pd.DataFrame],
+    pasta: str,
+    *,
+    formato: str = "xlsx",
+) -> Dict[str, str]:
+    """
+    Um arquivo por tipo, nomeado pelo tipo (reconhecido no pacote).
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminhos = {}
+
+    for tipo, df in dados.items():
+        caminho = os.path.join(pasta, f"{tipo}.{formato}")
+        salvar_arquivo(df, caminho)
+        caminhos[tipo] = caminho
+
+    return caminhos
+
+
+# ======================================================
+# SAÍDA: CARGA DIRETA NO BANCO
+# ======================================================
+
+def registrar_contrato_sintetico(conn: Connection, contrato_id: str):
+    """
+    Cadastra o contrato (se ainda não existir) e suas partições.
+    """
+    conn.execute(
+        text("""
+            INSERT INTO control.contratos (contrato_id, nome, vertical, status)
+            VALUES (:contrato_id, :nome, 'Sintético', 'ATIVO')
+            ON CONFLICT (contrato_id) DO NOTHING
+        """),
+        {
+            "contrato_id": contrato_id,
+            "nome": f"Contrato sintético {contrato_id}",
+        }
+    )
+    criar_particoes_contrato(conn, contrato_id)
+
+
+def carregar_no_banco(
+    dados: Dict[str, pd.DataFrame],
+    *,
+    contrato_id: str,
+    sistema_origem_id: int,
+) -> Dict[str, int]:
+    """
+    Mesmo caminho da importação (normalização + COPY), em uma
+    transação por contrato. Linhas já existentes são ignoradas.
+    Retorna as linhas gravadas por tipo.
+    """
+    tamanho_lote = settings.IMPORT_TAMANHO_LOTE
+    gravadas = {}
+
+    with engine.begin() as conn:
+        registrar_contrato_sintetico(conn, contrato_id)
+
+    # Período gerado é conhecido: todos os meses antes da carga
+    garantir_particoes_importacao(
+        contrato_id=contrato_id,
+        meses=[
+            mes.date()
+            for mes in pd.date_range(
+                DATA_INICIAL.to_period("M").start_time,
+                DATA_INICIAL + pd.Timedelta(days=DIAS_PERIODO),
+                freq="MS",
+            )
+        ],
+    )
+
+    with engine.connect() as conn:
+        for tipo in ORDEM_PACOTE:
+            if tipo not in dados:
+                continue
+
+            config = obter_config_importacao(tipo)
+            df = dados[tipo]
+            df.index = pd.RangeIndex(
+                LINHA_INICIAL_DADOS, LINHA_INICIAL_DADOS + len(df), name="linha"
+            )
+            gravadas[tipo] = 0
+
+            for inicio in range(0, len(df), tamanho_lote):
+                lote, _ = normalizar_lote(
+                    config,
+                    df.iloc[inicio:inicio + tamanho_lote],
+                    contrato_id=contrato_id,
+                    sistema_origem_id=(
+                        sistema_origem_id if config["por_contrato"] else None
+                    ),
+                )
+
+                if lote.empty:
+                    continue
+
+                inseridos, _, _ = gravar_lote(
+                    conn,
+                    config,
+                    lote,
+                    modo_importacao=ModoImportacao.INITIAL,
+                )
+                gravadas[tipo] += inseridos
+
+        conn.commit()
+
+    return gravadas
+
+
+# ======================================================
+# EXECUÇÃO VIA LINHA DE COMANDO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Gera dados sintéticos das tabelas data_pr"
+    )
+    parser.add_argument("--contratos", type=int, default=1, help="Número de contratos")
+    parser.add_argument("--linhas", type=int, default=10000, help="Linhas por tabela")
+    parser.add_argument(
+        "--taxa-duplicadas",
+        type=float,
+        default=0.01,
+        help="Fração de linhas repetidas (mesma chave)"
+    )
+    parser.add_argument(
+        "--taxa-sem-selo",
+        type=float,
+        default=0.005,
+        help="Fração de linhas sem selo (rejeitadas na importação)"
+    )
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument(
+        "--formato",
+        choices=[extensao.lstrip(".") for extensao in EXTENSOES_IMPORTACAO],
+        default="xlsx",
+    )
+    parser.add_argument("--saida", default="dados_sinteticos", help="Pasta dos arquivos")
+    parser.add_argument(
+        "--banco",
+        action="store_true",
+        help="Grava direto no banco em vez de gerar arquivos"
+    )
+    parser.add_argument("--sistema-origem", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.semente)
+    tipos_lancamento = gerar_tipos_lancamento(rng)
+
+    for i in range(1, args.contratos + 1):
+        contrato_id = f"{PREFIXO_CONTRATO}{i:05d}"
+
+        dados = {"tabela_lancamentos": tipos_lancamento.copy()}
+        dados.update(
+            gerar_dados_contrato(
+                contrato_id,
+                args.linhas,
+                codigos_lancamento=tipos_lancamento["codlcto"],
+                taxa_duplicadas=args.taxa_duplicadas,
+                taxa_sem_selo=args.taxa_sem_selo,
+                semente=args.semente + i,
+            )
+        )
+
+        if args.banco:
+            gravadas = carregar_no_banco(
+                dados,
+                contrato_id=contrato_id,
+                sistema_origem_id=args.sistema_origem,
+            )
+            print(f"Contrato {contrato_id}: {gravadas}")
+        else:
+            pasta = os.path.join(args.saida, contrato_id)
+            salvar_pacote(dados, pasta, formato=args.formato)
+            print(f"Contrato {contrato_id}: arquivos em {pasta}")
+
+
+if __name__ == "__main__":
+    main()
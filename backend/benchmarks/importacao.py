@@ -0,0 +1,395 @@
+"""
+Benchmark de throughput da importação PR, por etapa e por tipo de arquivo
+
+Roda o pipeline de importação (mesmas funções do motor) sobre arquivos
+gerados de 10 mil, 100 mil e 1 milhão de linhas, contra o PostgreSQL
+de DATABASE_URL, e mede linhas/s e pico de RSS das etapas:
+leitura, normalizacao, validacao, gravacao e log.
+
+Uso (a partir de backend/):
+    python -m benchmarks.importacao
+    python -m benchmarks.importacao --linhas 10000 100000 --tipos os_lanc --formatos xlsx csv
+    python -m benchmarks.importacao --comparar benchmarks/resultados/importacao_<data>.json
+
+Os arquivos gerados ficam em benchmarks/dados (reaproveitados entre
+execuções) e os resultados em benchmarks/resultados/*.json.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.import_config import ModoImportacao
+from app.core.import_log import criar_log_importacao, registrar_import_log
+from app.core.import_metricas import MedidorEtapas
+from app.core.import_reader import (
+    EXTENSOES_IMPORTACAO,
+    abrir_leitor,
+    motores_planilha_disponiveis,
+)
+from app.services.import_pr_engine import (
+    garantir_meses_apos_carga,
+    garantir_particoes_importacao,
+    gravar_lote,
+    limpar_dados_contrato,
+    meses_particao_lote,
+    obter_config_importacao,
+    tipar_lote,
+    validar_lote,
+)
+from benchmarks.gerador_dados import (
+    gerar_dados_contrato,
+    gerar_tipos_lancamento,
+    registrar_contrato_sintetico,
+    salvar_pacote,
+)
+
+
+PASTA_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+PASTA_DADOS = os.path.join(PASTA_BENCHMARKS, "dados")
+PASTA_RESULTADOS = os.path.join(PASTA_BENCHMARKS, "resultados")
+
+TAMANHOS_PADRAO = (10_000, 100_000, 1_000_000)
+TIPOS_MEDIDOS = ("os_lanc", "os_selo", "his_selo", "his_selo_detalhe_pr")
+ETAPAS = ("leitura", "normalizacao", "validacao", "gravacao", "log")
+
+CONTRATO_BENCHMARK = "999999"
+SISTEMA_ORIGEM_BENCHMARK = 1
+SEMENTE = 42
+TAXA_DUPLICADAS = 0.01
+TAXA_SEM_SELO = 0.005
+
+
+# ======================================================
+# DADOS DE ENTRADA
+# ======================================================
+
+def preparar_arquivos(linhas: int, formato: str) -> Dict[str, str]:
+    """
+    Gera (uma vez) os arquivos de `linhas` linhas no formato pedido.
+    """
+    pasta = os.path.join(PASTA_DADOS, f"{linhas}_{formato}")
+    caminhos = {
+        tipo: os.path.join(pasta, f"{tipo}.{formato}")
+        for tipo in TIPOS_MEDIDOS
+    }
+
+    if all(os.path.exists(caminho) for caminho in caminhos.values()):
+        return caminhos
+
+    tipos_lancamento = gerar_tipos_lancamento(np.random.default_rng(SEMENTE))
+    dados = gerar_dados_contrato(
+        CONTRATO_BENCHMARK,
+        linhas,
+        codigos_lancamento=tipos_lancamento["codlcto"],
+        taxa_duplicadas=TAXA_DUPLICADAS,
+        taxa_sem_selo=TAXA_SEM_SELO,
+        semente=SEMENTE,
+    )
+
+    return salvar_pacote(dados, pasta, formato=formato)
+
+
+# ======================================================
+# MEDIÇÃO DE UMA IMPORTAÇÃO
+# ======================================================
+
+def medir_importacao(
+    tipo_arquivo: str,
+    caminho: str,
+    *,
+    usuario_id: Optional[int],
+    usuario_email: str,
+) -> Dict[str, Any]:
+    """
+    Importação INITIAL completa de um arquivo, etapa a etapa.
+    Os dados anteriores do contrato de benchmark são removidos
+    antes (fora da medição).
+    """
+    config = obter_config_importacao(tipo_arquivo)
+    medidor = MedidorEtapas()
+    registros_lidos = 0
+    registros_rejeitados = 0
+    registros_processados = 0
+    meses_pendentes = set()
+
+    with engine.begin() as conn:
+        registrar_contrato_sintetico(conn, CONTRATO_BENCHMARK)
+        limpar_dados_contrato(
+            conn,
+            config,
+            contrato_id=CONTRATO_BENCHMARK,
+            sistema_origem_id=SISTEMA_ORIGEM_BENCHMARK,
+        )
+
+    inicio = time.perf_counter()
+
+    with medidor.etapa("particoes"):
+        garantir_particoes_importacao(contrato_id=CONTRATO_BENCHMARK)
+
+    with medidor.etapa("leitura"):
+        leitor = abrir_leitor(caminho, colunas=list(config["colunas"]))
+
+    with leitor, engine.connect() as conn:
+        for bruto in medidor.medir_lotes("leitura", leitor.lotes()):
+            with medidor.etapa("normalizacao", linhas=len(bruto)):
+                tipado = tipar_lote(config, bruto)
+
+            with medidor.etapa("validacao", linhas=len(bruto)):
+                df, rejeicoes = validar_lote(
+                    config,
+                    bruto,
+                    tipado,
+                    contrato_id=CONTRATO_BENCHMARK,
+                    sistema_origem_id=SISTEMA_ORIGEM_BENCHMARK,
+                )
+
+            # Como no motor: meses novos só antes da primeira escrita
+            meses_pendentes |= meses_particao_lote(config, df)
+
+            if meses_pendentes and not conn.in_transaction():
+                with medidor.etapa("particoes"):
+                    garantir_particoes_importacao(
+                        contrato_id=CONTRATO_BENCHMARK,
+                        meses=meses_pendentes,
+                    )
+                meses_pendentes = set()
+
+            with medidor.etapa("gravacao", linhas=len(df)):
+                inseridos, atualizados, _ = gravar_lote(conn, config, df)
+
+            registros_lidos += len(bruto)
+            registros_rejeitados += len(rejeicoes)
+            registros_processados += inseridos + atualizados
+
+        with medidor.etapa("gravacao"):
+            conn.commit()
+
+    if meses_pendentes:
+        with medidor.etapa("particoes"):
+            garantir_meses_apos_carga(
+                contrato_id=CONTRATO_BENCHMARK,
+                meses=meses_pendentes,
+            )
+
+    with medidor.etapa("log", linhas=registros_lidos):
+        log_id = criar_log_importacao(
+            contrato_id=CONTRATO_BENCHMARK,
+            sistema_origem_id=SISTEMA_ORIGEM_BENCHMARK,
+            usuario_id=usuario_id,
+            usuario_email=usuario_email,
+            tipo_arquivo=tipo_arquivo,
+            nome_arquivo=os.path.basename(caminho),
+            modo_importacao=ModoImportacao.INITIAL.value,
+            total_registros=registros_lidos,
+        )
+        registrar_import_log(
+            usuario_id=usuario_id,
+            usuario_email=usuario_email,
+            contrato_id=CONTRATO_BENCHMARK,
+            sistema_origem_id=SISTEMA_ORIGEM_BENCHMARK,
+            tipo_arquivo=tipo_arquivo,
+            modo_importacao=ModoImportacao.INITIAL.value,
+            nome_arquivo=os.path.basename(caminho),
+            total_registros=registros_lidos,
+            registros_processados=registros_processados,
+            registros_rejeitados=registros_rejeitados,
+            status="SUCCESS",
+            log_id=log_id,
+        )
+
+    segundos = time.perf_counter() - inicio
+
+    return {
+        "motor": leitor.motor,
+        "registros_lidos": registros_lidos,
+        "registros_processados": registros_processados,
+        "registros_rejeitados": registros_rejeitados,
+        "segundos": round(segundos, 4),
+        "linhas_por_segundo": round(registros_lidos / segundos) if segundos else None,
+        "etapas": medidor.resumo(),
+    }
+
+
+# ======================================================
+# RESULTADOS (JSON) E COMPARAÇÃO
+# ======================================================
+
+def _versao_codigo() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PASTA_BENCHMARKS,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _ambiente() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+        "sistema": platform.platform(),
+        "tamanho_lote": settings.IMPORT_TAMANHO_LOTE,
+        "motores_planilha": motores_planilha_disponiveis(),
+    }
+
+
+def salvar_resultados(
+    resultados: List[Dict[str, Any]],
+    *,
+    prefixo: str = "importacao",
+) -> str:
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+
+    agora = datetime.now()
+    caminho = os.path.join(
+        PASTA_RESULTADOS,
+        f"{prefixo}_{agora:%Y%m%d_%H%M%S}.json",
+    )
+
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(
+            {
+                "gerado_em": agora.isoformat(timespec="seconds"),
+                "versao": _versao_codigo(),
+                "ambiente": _ambiente(),
+                "resultados": resultados,
+            },
+            arquivo,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    return caminho
+
+
+def _chave(resultado: Dict[str, Any]) -> tuple:
+    return resultado["tipo_arquivo"], resultado["formato"], resultado["linhas"]
+
+
+def comparar_resultados(
+    anteriores: List[Dict[str, Any]],
+    atuais: List[Dict[str, Any]],
+):
+    """
+    Variação de linhas/s por etapa em relação a uma execução anterior.
+    """
+    por_chave = {_chave(resultado): resultado for resultado in anteriores}
+
+    for atual in atuais:
+        anterior = por_chave.get(_chave(atual))
+
+        if anterior is None:
+            continue
+
+        print(f"\n{' / '.join(str(parte) for parte in _chave(atual))}")
+
+        for etapa in ETAPAS:
+            antes = anterior["etapas"].get(etapa, {}).get("linhas_por_segundo")
+            depois = atual["etapas"].get(etapa, {}).get("linhas_por_segundo")
+
+            if not antes or not depois:
+                continue
+
+            variacao = (depois - antes) / antes * 100
+            print(f"  {etapa:<13} {antes:>12,} → {depois:>12,} linhas/s ({variacao:+.1f}%)")
+
+
+def _imprimir(resultado: Dict[str, Any]):
+    print(
+        f"\n{resultado['tipo_arquivo']} ({resultado['formato']}, "
+        f"{resultado['linhas']:,} linhas): "
+        f"{resultado['linhas_por_segundo'] or 0:,} linhas/s"
+    )
+
+    for etapa, medida in resultado["etapas"].items():
+        print(
+            f"  {etapa:<13} {medida['segundos']:>9.2f}s "
+            f"{medida['linhas_por_segundo'] or 0:>12,} linhas/s "
+            f"{medida['pico_rss_mb']:>9.1f} MB"
+        )
+
+
+# ======================================================
+# EXECUÇÃO VIA LINHA DE COMANDO
+# ======================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark da importação PR por etapa"
+    )
+    parser.add_argument(
+        "--linhas",
+        type=int,
+        nargs="+",
+        default=list(TAMANHOS_PADRAO),
+        help="Tamanhos dos arquivos (padrão: 10 mil, 100 mil e 1 milhão)"
+    )
+    parser.add_argument(
+        "--tipos",
+        nargs="+",
+        choices=TIPOS_MEDIDOS,
+        default=list(TIPOS_MEDIDOS),
+    )
+    parser.add_argument(
+        "--formatos",
+        nargs="+",
+        choices=[extensao.lstrip(".") for extensao in EXTENSOES_IMPORTACAO],
+        default=["xlsx"],
+    )
+    parser.add_argument("--usuario-id", type=int, default=None)
+    parser.add_argument("--usuario-email", default="benchmark@localhost")
+    parser.add_argument(
+        "--comparar",
+        help="JSON de uma execução anterior para comparar"
+    )
+    args = parser.parse_args()
+
+    resultados = []
+
+    for formato in args.formatos:
+        for linhas in args.linhas:
+            arquivos = preparar_arquivos(linhas, formato)
+
+            for tipo in args.tipos:
+                resultado = {
+                    "tipo_arquivo": tipo,
+                    "formato": formato,
+                    "linhas": linhas,
+                    **medir_importacao(
+                        tipo,
+                        arquivos[tipo],
+                        usuario_id=args.usuario_id,
+                        usuario_email=args.usuario_email,
+                    ),
+                }
+                _imprimir(resultado)
+                resultados.append(resultado)
+
+    caminho = salvar_resultados(resultados)
+    print(f"\nResultados: {caminho}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anteriores = json.load(arquivo)["resultados"]
+
+        comparar_resultados(anteriores, resultados)
+
+
+if __name__ == "__main__":
+    main()
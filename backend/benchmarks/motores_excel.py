@@ -0,0 +1,147 @@
+"""
+Benchmark dos motores de leitura de .xlsx (calamine x openpyxl)
+
+Lê as planilhas geradas (as mesmas do benchmark de importação) com
+cada motor instalado, na projeção de colunas de cada tipo, e mede
+abertura, leitura (linhas/s) e pico de RSS. Também confere se os
+motores entregam os mesmos dados (assinatura dos lotes tipados).
+
+Não usa o banco de dados.
+
+Uso (a partir de backend/):
+    python -m benchmarks.motores_excel
+    python -m benchmarks.motores_excel --linhas 10000 100000 --motores calamine openpyxl
+"""
+import argparse
+from typing import Any, Dict, List
+
+from app.core.import_metricas import MedidorEtapas
+from app.core.import_normalization import calcular_hash_linhas, normalizar_tipos
+from app.core.import_reader import MOTORES_PLANILHA, motores_planilha_disponiveis
+from app.services.import_pr_engine import obter_config_importacao
+from benchmarks.importacao import (
+    TAMANHOS_PADRAO,
+    TIPOS_MEDIDOS,
+    preparar_arquivos,
+    salvar_resultados,
+)
+
+
+# ======================================================
+# MEDIÇÃO DE UM MOTOR
+# ======================================================
+
+def medir_motor(motor: str, tipo_arquivo: str, caminho: str) -> Dict[str, Any]:
+    """
+    Abertura + leitura completa em lotes com `motor`.
+    A tipagem usada na assinatura fica fora da medição: normalizar_tipos
+    sem as renomeações do tipo, para o hash usar os nomes da planilha.
+    """
+    config = obter_config_importacao(tipo_arquivo)
+    colunas = list(config["colunas"])
+    medidor = MedidorEtapas()
+    linhas = 0
+    assinatura = 0
+
+    with medidor.etapa("abertura"):
+        leitor = MOTORES_PLANILHA[motor](caminho, colunas=colunas)
+
+    with leitor:
+        for bruto in medidor.medir_lotes("leitura", leitor.lotes()):
+            linhas += len(bruto)
+            hashes = calcular_hash_linhas(
+                normalizar_tipos(bruto, config["colunas"]), colunas
+            )
+            assinatura = (assinatura + int(hashes.sum())) % 2**64
+
+    etapas = medidor.resumo()
+    segundos = etapas["abertura"]["segundos"] + etapas["leitura"]["segundos"]
+
+    return {
+        "linhas_lidas": linhas,
+        "segundos": round(segundos, 4),
+        "linhas_por_segundo": round(linhas / segundos) if segundos else None,
+        "pico_rss_mb": max(medida["pico_rss_mb"] for medida in etapas.values()),
+        "assinatura": f"{assinatura:016x}",
+        "etapas": etapas,
+    }
+
+
+def _imprimir(tipo: str, linhas: int, medidas: Dict[str, Dict[str, Any]]):
+    print(f"\n{tipo} ({linhas:,} linhas)")
+
+    mais_lento = max(medida["segundos"] for medida in medidas.values())
+
+    for motor, medida in medidas.items():
+        ganho = mais_lento / medida["segundos"] if medida["segundos"] else 0
+        print(
+            f"  {motor:<10} {medida['segundos']:>9.2f}s "
+            f"{medida['linhas_por_segundo'] or 0:>12,} linhas/s "
+            f"{medida['pico_rss_mb']:>9.1f} MB  {ganho:>5.1f}x"
+        )
+
+    if len({medida["assinatura"] for medida in medidas.values()}) > 1:
+        print("  ATENÇÃO: os motores entregaram dados diferentes")
+
+
+# ======================================================
+# EXECUÇÃO VIA LINHA DE COMANDO
+# ======================================================
+
+def main():
+    disponiveis = motores_planilha_disponiveis()
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark dos motores de leitura de .xlsx"
+    )
+    parser.add_argument(
+        "--linhas",
+        type=int,
+        nargs="+",
+        default=list(TAMANHOS_PADRAO),
+        help="Tamanhos das planilhas (padrão: 10 mil, 100 mil e 1 milhão)"
+    )
+    parser.add_argument(
+        "--tipos",
+        nargs="+",
+        choices=TIPOS_MEDIDOS,
+        default=list(TIPOS_MEDIDOS),
+    )
+    parser.add_argument(
+        "--motores",
+        nargs="+",
+        choices=disponiveis,
+        default=disponiveis,
+        help="Padrão: todos os motores instalados"
+    )
+    args = parser.parse_args()
+
+    resultados: List[Dict[str, Any]] = []
+
+    for linhas in args.linhas:
+        arquivos = preparar_arquivos(linhas, "xlsx")
+
+        for tipo in args.tipos:
+            medidas = {
+                motor: medir_motor(motor, tipo, arquivos[tipo])
+                for motor in args.motores
+            }
+            _imprimir(tipo, linhas, medidas)
+
+            resultados.extend(
+                {
+                    "tipo_arquivo": tipo,
+                    "formato": "xlsx",
+                    "linhas": linhas,
+                    "motor": motor,
+                    **medida,
+                }
+                for motor, medida in medidas.items()
+            )
+
+    caminho = salvar_resultados(resultados, prefixo="motores_excel")
+    print(f"\nResultados: {caminho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Benchmarks: execução rápida com planilhas mínimas geradas
+"""
+import json
+import sys
+
+from benchmarks import importacao, motores_excel
+
+
+def test_motores_excel_main(tmp_path, monkeypatch):
+    monkeypatch.setattr(importacao, "PASTA_DADOS", str(tmp_path / "dados"))
+    monkeypatch.setattr(importacao, "PASTA_RESULTADOS", str(tmp_path / "resultados"))
+    monkeypatch.setattr(sys, "argv", ["motores_excel", "--linhas", "50"])
+
+    motores_excel.main()
+
+    (caminho,) = (tmp_path / "resultados").iterdir()
+    resultados = json.loads(caminho.read_text())["resultados"]
+
+    assert {r["tipo_arquivo"] for r in resultados} == set(importacao.TIPOS_MEDIDOS)
+    assert all(r["linhas_lidas"] > 0 for r in resultados)
+
+    # Todos os motores entregam os mesmos dados
+    for tipo in importacao.TIPOS_MEDIDOS:
+        assert len({r["assinatura"] for r in resultados if r["tipo_arquivo"] == tipo}) == 1
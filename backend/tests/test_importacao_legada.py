@@ -0,0 +1,54 @@
+"""
+Importação legada (ImportService): gravação em INSERTs multi-valores
+"""
+import pandas as pd
+
+from app.services.import_service import (
+    CHAVE_TABELA_LANCAMENTOS,
+    SQL_TABELA_LANCAMENTOS,
+    _gravar_em_lotes,
+    _numero,
+)
+
+
+class ConexaoFalsa:
+    """
+    Guarda os parâmetros de cada execute (um por lote).
+    """
+
+    def __init__(self):
+        self.lotes = []
+
+    def execute(self, sql, registros):
+        self.lotes.append(registros)
+
+
+def test_chave_repetida_grava_a_ultima_linha():
+    dados = pd.DataFrame({
+        "contrato_id": "1",
+        "codlcto": ["10", "20", "10", None, None],
+        "descricao": ["antiga", "outra", "nova", "sem código", "sem código 2"],
+    })
+    conn = ConexaoFalsa()
+
+    total = _gravar_em_lotes(
+        conn, SQL_TABELA_LANCAMENTOS, dados, 2, chave=CHAVE_TABELA_LANCAMENTOS
+    )
+
+    registros = [registro for lote in conn.lotes for registro in lote]
+
+    # Linhas do arquivo processadas, como na gravação linha a linha
+    assert total == 5
+    assert [r["descricao"] for r in registros if r["codlcto"] == "10"] == ["nova"]
+    # Chave nula não conflita no banco: as duas linhas ficam
+    assert sum(r["codlcto"] is None for r in registros) == 2
+
+    for lote in conn.lotes:
+        chaves = [r["codlcto"] for r in lote if r["codlcto"] is not None]
+        assert len(chaves) == len(set(chaves))
+
+
+def test_numero_inteiro_trunca():
+    df = pd.DataFrame({"status": [1.9, -1.9, "2.5", None]})
+
+    assert _numero(df, "status", inteiro=True).tolist() == [1, -1, 2, pd.NA]
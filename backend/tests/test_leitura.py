@@ -0,0 +1,225 @@
+"""
+Leitura dos arquivos de importação (projeção de colunas, motores de
+planilha, codificação do CSV)
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from app.core import import_reader
+from app.core.config import settings
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+from app.core.import_reader import (
+    LeitorCsv,
+    LeitorPlanilhaCalamine,
+    abrir_leitor,
+    abrir_planilha,
+    motores_planilha_disponiveis,
+    ordem_motores_planilha,
+)
+from app.services.import_pr_engine import obter_config_importacao, tipar_lote, validar_lote
+
+
+@pytest.fixture
+def salvar_xlsx(tmp_path):
+    """
+    Grava linhas (a primeira é o cabeçalho) em um .xlsx.
+    """
+    def salvar(linhas, nome: str = "arquivo.xlsx") -> str:
+        workbook = Workbook()
+        planilha = workbook.active
+
+        for linha in linhas:
+            planilha.append(linha)
+
+        caminho = str(tmp_path / nome)
+        workbook.save(caminho)
+        return caminho
+
+    return salvar
+
+
+# ======================================================
+# PROJEÇÃO: SÓ AS COLUNAS DO TIPO SÃO DECODIFICADAS
+# ======================================================
+
+CONFIG_DETALHE = obter_config_importacao("his_selo_detalhe_pr")
+COLUNAS_DETALHE = list(CONFIG_DETALHE["colunas"])
+
+# Export largo: colunas pesadas (json, qrcode, mensagem) fora da projeção
+CABECALHO_LARGO = [
+    "ID", "json", "Selo_Principal", "qrcode", "id_codigo_ato", "mensagem", "DataAto",
+]
+LINHAS_LARGAS = [
+    [101, '{"a": 1}', "SFTN1", "qr1", 7, "ok", datetime(2024, 1, 5)],
+    [102, '{"a": 2}', "SFTN2", "qr2", 7, "erro", datetime(2024, 2, 6)],
+]
+
+
+def _ler_projetado(caminho: str, **kwargs) -> pd.DataFrame:
+    with abrir_leitor(caminho, colunas=COLUNAS_DETALHE, **kwargs) as leitor:
+        assert leitor.colunas == [coluna.lower() for coluna in CABECALHO_LARGO]
+        assert leitor.colunas_lidas == ["id", "selo_principal", "id_codigo_ato", "dataato"]
+
+        return pd.concat(leitor.lotes())
+
+
+def _esperado() -> pd.DataFrame:
+    bruto = pd.DataFrame(
+        LINHAS_LARGAS,
+        columns=[coluna.lower() for coluna in CABECALHO_LARGO],
+        index=pd.Index([2, 3], name="linha"),
+    )
+    return tipar_lote(CONFIG_DETALHE, bruto[COLUNAS_DETALHE])
+
+
+@pytest.mark.parametrize("motor", motores_planilha_disponiveis())
+def test_projecao_xlsx(salvar_xlsx, monkeypatch, motor):
+    monkeypatch.setattr(settings, "IMPORT_MOTOR_EXCEL", motor)
+    caminho = salvar_xlsx([CABECALHO_LARGO] + LINHAS_LARGAS)
+
+    lido = _ler_projetado(caminho)
+
+    assert list(lido.columns) == ["id", "selo_principal", "id_codigo_ato", "dataato"]
+    pd.testing.assert_frame_equal(tipar_lote(CONFIG_DETALHE, lido), _esperado())
+
+
+def test_projecao_csv(salvar_csv):
+    bruto = pd.DataFrame(LINHAS_LARGAS, columns=CABECALHO_LARGO)
+    caminho = salvar_csv(bruto)
+
+    lido = _ler_projetado(caminho)
+
+    pd.testing.assert_frame_equal(tipar_lote(CONFIG_DETALHE, lido), _esperado())
+
+
+def test_projecao_parquet(tmp_path):
+    caminho = str(tmp_path / "arquivo.parquet")
+    pd.DataFrame(LINHAS_LARGAS, columns=CABECALHO_LARGO).to_parquet(caminho)
+
+    lido = _ler_projetado(caminho)
+
+    pd.testing.assert_frame_equal(tipar_lote(CONFIG_DETALHE, lido), _esperado())
+
+
+# Linha 3: vazia nas colunas lidas, com dados nas demais
+LINHAS_VAZIAS_NA_PROJECAO = [
+    LINHAS_LARGAS[0],
+    [None, '{"a": 3}', None, "qr3", None, "sem dados", None],
+]
+
+
+@pytest.mark.parametrize("formato", ["csv", "parquet"])
+def test_linha_vazia_na_projecao_vai_para_a_validacao(salvar_csv, tmp_path, formato):
+    bruto = pd.DataFrame(LINHAS_VAZIAS_NA_PROJECAO, columns=CABECALHO_LARGO)
+
+    if formato == "csv":
+        caminho = salvar_csv(bruto)
+    else:
+        caminho = str(tmp_path / "arquivo.parquet")
+        bruto.to_parquet(caminho)
+
+    lido = _ler_projetado(caminho)
+
+    assert list(lido.index) == [2, 3]
+
+    _, rejeicoes = validar_lote(
+        CONFIG_DETALHE,
+        lido,
+        tipar_lote(CONFIG_DETALHE, lido),
+        contrato_id="1",
+        sistema_origem_id=1,
+    )
+
+    assert 3 in rejeicoes.index
+
+
+def test_linha_vazia_no_arquivo_inteiro_e_ignorada(tmp_path):
+    caminho = _salvar_bytes(tmp_path, b"id;selo_principal\n1;A\n;\n2;B\n")
+
+    with abrir_leitor(caminho, colunas=["id", "selo_principal"]) as leitor:
+        lido = pd.concat(leitor.lotes())
+
+    assert list(lido.index) == [2, 4]
+
+
+def test_sem_projecao_le_todas_as_colunas(salvar_csv):
+    caminho = salvar_csv(pd.DataFrame(LINHAS_LARGAS, columns=CABECALHO_LARGO))
+
+    with abrir_leitor(caminho) as leitor:
+        assert leitor.colunas_lidas == leitor.colunas
+        assert list(next(leitor.lotes()).columns) == leitor.colunas
+
+
+# ======================================================
+# MOTOR "AUTO" DO .XLSX
+# ======================================================
+
+@pytest.mark.skipif(
+    not LeitorPlanilhaCalamine.disponivel(), reason="python-calamine não instalado"
+)
+def test_auto_usa_calamine_so_abaixo_do_limite(salvar_xlsx, monkeypatch):
+    # 3 colunas x (1 cabeçalho + 4 linhas) = 15 células
+    caminho = salvar_xlsx([["a", "b", "c"]] + [[i, i, i] for i in range(4)])
+
+    monkeypatch.setattr(settings, "IMPORT_CALAMINE_MAXIMO_CELULAS", 15)
+    assert ordem_motores_planilha("auto", caminho=caminho)[0] == "calamine"
+
+    monkeypatch.setattr(settings, "IMPORT_CALAMINE_MAXIMO_CELULAS", 14)
+    assert ordem_motores_planilha("auto", caminho=caminho) == ["openpyxl"]
+
+    with abrir_planilha(caminho, motor="auto") as leitor:
+        assert leitor.motor == "openpyxl"
+
+    # Motor pedido explicitamente ignora o limite
+    assert ordem_motores_planilha("calamine", caminho=caminho)[0] == "calamine"
+
+
+# ======================================================
+# CODIFICAÇÃO DO CSV
+# ======================================================
+
+def _salvar_bytes(tmp_path, conteudo: bytes) -> str:
+    caminho = tmp_path / "arquivo.csv"
+    caminho.write_bytes(conteudo)
+    return str(caminho)
+
+
+def test_csv_cp1252(tmp_path):
+    texto = "código;descrição\n1;Certidão de ônus\n"
+    caminho = _salvar_bytes(tmp_path, texto.encode("cp1252"))
+
+    with LeitorCsv(caminho) as leitor:
+        assert leitor.codificacao == "cp1252"
+        assert leitor.colunas == ["código", "descrição"]
+
+        df = next(leitor.lotes())
+
+    assert df["descrição"].tolist() == ["Certidão de ônus"]
+
+
+def test_csv_utf8_com_bom(tmp_path):
+    texto = "código;descrição\n1;Certidão de ônus\n"
+    caminho = _salvar_bytes(tmp_path, texto.encode("utf-8-sig"))
+
+    with LeitorCsv(caminho) as leitor:
+        assert leitor.codificacao == "utf-8"
+        assert leitor.colunas == ["código", "descrição"]
+        assert next(leitor.lotes())["descrição"].tolist() == ["Certidão de ônus"]
+
+
+def test_csv_codificacao_invalida(tmp_path, monkeypatch):
+    # UTF-8 no início (amostra) e byte inválido depois dela
+    monkeypatch.setattr(import_reader, "AMOSTRA_ESTIMATIVA_CSV", 16)
+    caminho = _salvar_bytes(
+        tmp_path, "código;descrição\n1;ok\n".encode() + b"2;\xe7\xe3o\n"
+    )
+
+    with LeitorCsv(caminho) as leitor:
+        with pytest.raises(BusinessException) as erro:
+            list(leitor.lotes())
+
+    assert erro.value.error_code == ErrorCode.INVALID_ENCODING
@@ -0,0 +1,181 @@
+"""
+Normalização tipada dos lotes e hash de conteúdo da linha
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core import import_normalization
+from app.core.import_config import TipoColuna
+from app.core.import_normalization import (
+    CONVERSORES,
+    calcular_hash_linhas,
+    converter_memoizado,
+    materializar_categorias,
+    normalizar_tipos,
+)
+from app.core.import_reader import abrir_leitor
+from app.services.import_pr_engine import obter_config_importacao, tipar_lote
+
+
+CONFIG_OS_SELO = obter_config_importacao("os_selo")
+COLUNAS_OS_SELO = list(CONFIG_OS_SELO["colunas"])
+
+
+def _hash_primeira_linha(bruto: pd.DataFrame) -> int:
+    tipado = tipar_lote(CONFIG_OS_SELO, bruto)
+    return int(calcular_hash_linhas(tipado, COLUNAS_OS_SELO).iloc[0])
+
+
+def test_hash_nao_depende_do_tipo_do_restante_do_lote():
+    linha = {"id": 1, "os_id": 10, "selo": "A", "quantidade": 3}
+
+    so_inteiros = pd.DataFrame([linha, {**linha, "id": 2, "quantidade": 5}])
+    com_decimal = pd.DataFrame([linha, {**linha, "id": 2, "quantidade": 4.5}])
+    com_vazio = pd.DataFrame([linha, {**linha, "id": 2, "quantidade": None}])
+
+    assert so_inteiros["quantidade"].dtype != com_decimal["quantidade"].dtype
+
+    hashes = {
+        _hash_primeira_linha(so_inteiros),
+        _hash_primeira_linha(com_decimal),
+        _hash_primeira_linha(com_vazio),
+    }
+    assert len(hashes) == 1
+
+
+def test_hash_igual_entre_planilha_e_csv(salvar_csv):
+    bruto = pd.DataFrame([
+        {"id": 1, "os_id": 10, "selo": "A", "quantidade": 3},
+        {"id": 2, "os_id": 20, "selo": "B", "quantidade": 4.5},
+    ])
+    caminho = salvar_csv(bruto)
+
+    with abrir_leitor(caminho, colunas=COLUNAS_OS_SELO) as leitor:
+        lido_csv = next(leitor.lotes())
+
+    assert _hash_primeira_linha(lido_csv) == _hash_primeira_linha(bruto)
+
+
+# ======================================================
+# CONVERSÃO MEMOIZADA = CONVERSÃO CÉLULA A CÉLULA
+# ======================================================
+
+CODIGOS_REPETIDOS = pd.Series(
+    [" 12", "12", 12, 12.0, None, "", "  ", "A7", "a7", np.nan] * 50
+)
+DATAS_REPETIDAS = pd.Series(
+    ["2024-01-05", "2024-01-05 13:45", None, "", "invalida", "2023-12-31"] * 50
+)
+
+
+@pytest.mark.parametrize(
+    "tipo, serie",
+    [
+        (TipoColuna.CODIGO, CODIGOS_REPETIDOS),
+        (TipoColuna.DATA, DATAS_REPETIDAS),
+        (TipoColuna.DATA_HORA, DATAS_REPETIDAS),
+    ],
+)
+def test_memoizado_igual_ao_direto(tipo, serie):
+    direto = CONVERSORES[tipo](serie)
+    memoizado = converter_memoizado(
+        serie,
+        CONVERSORES[tipo],
+        categorica=tipo == TipoColuna.CODIGO,
+    )
+
+    pd.testing.assert_series_equal(
+        materializar_categorias(memoizado.to_frame())[0],
+        direto,
+        check_names=False,
+    )
+
+
+def test_normalizacao_memoizada_preserva_hash(monkeypatch):
+    tipos = {
+        "id": TipoColuna.CODIGO,
+        "codigo": TipoColuna.CODIGO,
+        "data": TipoColuna.DATA,
+    }
+    bruto = pd.DataFrame({
+        "id": range(len(CODIGOS_REPETIDOS)),
+        "codigo": CODIGOS_REPETIDOS,
+        "data": DATAS_REPETIDAS.iloc[:len(CODIGOS_REPETIDOS)],
+    })
+
+    memoizado = normalizar_tipos(bruto, tipos)
+
+    # Código repetido vira category; id (valores distintos) não
+    assert isinstance(memoizado["codigo"].dtype, pd.CategoricalDtype)
+    assert not isinstance(memoizado["id"].dtype, pd.CategoricalDtype)
+
+    # Limite negativo: toda coluna é convertida célula a célula
+    monkeypatch.setattr(import_normalization, "LIMITE_CARDINALIDADE", -1)
+    direto = normalizar_tipos(bruto, tipos)
+
+    assert not isinstance(direto["codigo"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(materializar_categorias(memoizado), direto)
+    pd.testing.assert_series_equal(
+        calcular_hash_linhas(memoizado, list(tipos)),
+        calcular_hash_linhas(direto, list(tipos)),
+    )
+
+
+def test_memoizado_coluna_sem_valores():
+    vazia = pd.Series([None, "", "  "] * 10, dtype="string[pyarrow]")
+
+    codigos = converter_memoizado(
+        vazia, CONVERSORES[TipoColuna.CODIGO], categorica=True
+    )
+    datas = converter_memoizado(vazia, CONVERSORES[TipoColuna.DATA])
+
+    assert codigos.isna().all()
+    assert datas.isna().all()
+
+
+# ======================================================
+# CSV NO PADRÃO BRASILEIRO (CP1252, DIA PRIMEIRO, VÍRGULA)
+# ======================================================
+
+def test_csv_pt_br(tmp_path):
+    config = obter_config_importacao("os_lanc")
+    colunas = list(config["colunas"])
+
+    linhas = [
+        ";".join(colunas),
+        "1;1;2;10,50;;;;01/02/2024 10:00;100;1;;Certidão;",
+        "2;1;1;1.234,56;;;;15/01/2024 11:00;100;2;;Ônus;",
+        "3;1;3;7.5;;;;2024-01-20;100;3;;;",
+    ]
+    caminho = tmp_path / "os_lanc.csv"
+    caminho.write_bytes(("\r\n".join(linhas) + "\r\n").encode("cp1252"))
+
+    with abrir_leitor(str(caminho), colunas=colunas) as leitor:
+        assert leitor.codificacao == "cp1252"
+        tipado = tipar_lote(config, next(leitor.lotes()))
+
+    assert tipado["valor"].tolist() == [10.5, 1234.56, 7.5]
+    assert tipado["quantidade"].tolist() == [2.0, 1.0, 3.0]
+    assert tipado["dt_lancou"].tolist() == [
+        pd.Timestamp("2024-02-01 10:00"),
+        pd.Timestamp("2024-01-15 11:00"),
+        pd.Timestamp("2024-01-20"),
+    ]
+    assert tipado["lcto"].tolist()[:2] == ["Certidão", "Ônus"]
+
+
+def test_texto_de_planilha_pt_br():
+    tipado = normalizar_tipos(
+        pd.DataFrame({
+            "valor": ["10,50", 3.25, None],
+            "data": ["31/12/2023", pd.Timestamp("2024-03-01"), "texto"],
+        }),
+        {"valor": TipoColuna.NUMERICO, "data": TipoColuna.DATA},
+    )
+
+    assert tipado["valor"].tolist()[:2] == [10.5, 3.25]
+    assert tipado["data"].tolist()[:2] == [
+        pd.Timestamp("2023-12-31"), pd.Timestamp("2024-03-01"),
+    ]
+    assert tipado["data"].isna().tolist()[2]
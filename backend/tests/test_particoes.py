@@ -0,0 +1,47 @@
+"""
+Meses das partições mensais e chave lógica de his_selo_detalhe_pr
+"""
+from datetime import date
+
+import pandas as pd
+
+from app.core.import_rejeicoes import DetectorDuplicidade
+from app.services import import_pr_engine
+
+
+CONFIG_DETALHE = import_pr_engine.obter_config_importacao("his_selo_detalhe_pr")
+
+
+def test_meses_do_lote_tipado():
+    bruto = pd.DataFrame(
+        {
+            "id": ["1", "2", "3", "4"],
+            "selo_principal": ["A", "B", "C", "D"],
+            "id_codigo_ato": ["1", "1", "1", "1"],
+            "dataato": ["2023-01-10", "2023-01-31", "2024-07-15", None],
+        },
+        index=pd.Index([2, 3, 4, 5], name="linha"),
+    )
+
+    tipado = import_pr_engine.tipar_lote(CONFIG_DETALHE, bruto)
+    meses = import_pr_engine.meses_particao_lote(CONFIG_DETALHE, tipado)
+
+    assert meses == {date(2023, 1, 1), date(2024, 7, 1)}
+
+
+def test_mesmo_id_em_outro_mes_e_duplicado():
+    df = pd.DataFrame(
+        {
+            "id": ["1", "1"],
+            "data_ato": pd.to_datetime(["2023-01-10", "2023-05-10"]),
+        },
+        index=[2, 3],
+    )
+    rejeicoes = pd.DataFrame(columns=["motivo", "coluna", "valor"])
+
+    df, rejeicoes = import_pr_engine.rejeitar_duplicadas(
+        DetectorDuplicidade(), CONFIG_DETALHE, df, rejeicoes
+    )
+
+    assert list(df.index) == [2]
+    assert list(rejeicoes.index) == [3]
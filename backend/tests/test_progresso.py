@@ -0,0 +1,54 @@
+"""
+Progresso da importação (percentual e tempo restante)
+"""
+from app.services.import_logs_service import calcular_progresso
+
+
+def test_percentual_usa_linhas_lidas():
+    # 1000 linhas lidas, mas só 600 gravadas (rejeitadas/ignoradas)
+    progresso = calcular_progresso(
+        status="PROCESSANDO",
+        registros_lidos=1000,
+        total_registros=1000,
+        segundos_decorridos=10,
+    )
+
+    assert progresso["percentual"] == 100.0
+    assert progresso["segundos_restantes"] is None
+
+
+def test_tempo_restante_pelo_ritmo_de_leitura():
+    progresso = calcular_progresso(
+        status="PROCESSANDO",
+        registros_lidos=250,
+        total_registros=1000,
+        segundos_decorridos=5,
+    )
+
+    assert progresso["percentual"] == 25.0
+    assert progresso["linhas_por_segundo"] == 50.0
+    assert progresso["segundos_restantes"] == 15.0
+
+
+def test_total_estimado_menor_que_o_lido_limita_em_100():
+    progresso = calcular_progresso(
+        status="PROCESSANDO",
+        registros_lidos=1200,
+        total_registros=1000,
+        segundos_decorridos=4,
+    )
+
+    assert progresso["percentual"] == 100.0
+    assert progresso["segundos_restantes"] is None
+
+
+def test_sem_total_sem_percentual():
+    progresso = calcular_progresso(
+        status="PROCESSANDO",
+        registros_lidos=0,
+        total_registros=0,
+        segundos_decorridos=0,
+    )
+
+    assert progresso["percentual"] is None
+    assert progresso["linhas_por_segundo"] is None
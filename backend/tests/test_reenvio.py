@@ -0,0 +1,98 @@
+"""
+Reenvio de arquivo idêntico: só a última importação é comparada
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.core import import_log
+
+HASH_A = "a" * 64
+HASH_B = "b" * 64
+
+
+class _Resultado:
+    def __init__(self, linha):
+        self.linha = linha
+
+    def mappings(self):
+        return self
+
+    def first(self):
+        return self.linha
+
+
+class _TabelaLogs:
+    """
+    Logs em memória. O SELECT devolve a última importação não simulada
+    do contrato, sistema e tipo, como o ORDER BY id DESC LIMIT 1.
+    """
+    def __init__(self):
+        self.logs = []
+
+    def importar(self, hash_arquivo, status="SUCCESS", simulacao=False):
+        self.logs.append({
+            "id": len(self.logs) + 1,
+            "hash_arquivo": hash_arquivo,
+            "status": status,
+            "simulacao": simulacao,
+        })
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, sql, parametros):
+        reais = [log for log in self.logs if not log["simulacao"]]
+
+        if not reais:
+            return _Resultado(None)
+
+        ultima = reais[-1]
+
+        return _Resultado({
+            "id": ultima["id"],
+            "mesmo_arquivo": ultima["hash_arquivo"] == parametros["hash_arquivo"],
+            "vigente": ultima["status"] in ("SUCCESS", "PROCESSANDO"),
+        })
+
+
+@pytest.fixture
+def tabela(monkeypatch):
+    tabela = _TabelaLogs()
+    monkeypatch.setattr(import_log, "engine", tabela)
+    return tabela
+
+
+def _identica(hash_arquivo):
+    return import_log.buscar_importacao_identica(
+        contrato_id="1",
+        sistema_origem_id=1,
+        tipo_arquivo="os_selo",
+        hash_arquivo=hash_arquivo,
+    )
+
+
+def test_a_b_a_reimporta(tabela):
+    tabela.importar(HASH_A)
+    assert _identica(HASH_A) == 1
+
+    tabela.importar(HASH_B)
+    assert _identica(HASH_B) == 2
+
+    # A -> B -> A: o segundo A substitui os dados de B
+    assert _identica(HASH_A) is None
+
+
+def test_simulacao_nao_conta_como_ultima(tabela):
+    tabela.importar(HASH_A)
+    tabela.importar(HASH_B, simulacao=True)
+
+    assert _identica(HASH_A) == 1
+
+
+def test_ultima_com_erro_nao_bloqueia(tabela):
+    tabela.importar(HASH_A)
+    tabela.importar(HASH_A, status="ERROR")
+
+    assert _identica(HASH_A) is None
@@ -0,0 +1,73 @@
+"""
+Relatório de rejeições: só lotes commitados entram no arquivo
+"""
+import os
+
+import pandas as pd
+
+from app.core.import_rejeicoes import (
+    COLUNAS_RELATORIO,
+    RelatorioRejeicoes,
+    descartar_relatorio_pendente,
+    publicar_relatorio_pendente,
+)
+
+
+def _rejeicoes(linhas, motivo="CAMPO_OBRIGATORIO_VAZIO"):
+    return pd.DataFrame(
+        {"motivo": motivo, "coluna": "codigo", "valor": ""},
+        index=pd.Index(linhas, name="linha"),
+    )
+
+
+def test_rollback_nao_deixa_relatorio():
+    relatorio = RelatorioRejeicoes(1)
+
+    relatorio.registrar(_rejeicoes([2, 3]))
+    relatorio.descarregar()
+    relatorio.descartar()
+
+    assert not os.path.exists(relatorio.caminho)
+    assert not os.path.exists(relatorio.caminho + ".pendente")
+    assert relatorio.total == 0
+
+
+def test_publica_apenas_lotes_commitados():
+    relatorio = RelatorioRejeicoes(1)
+
+    # Lote 1: commitado
+    relatorio.registrar(_rejeicoes([2, 3]))
+    relatorio.descarregar()
+    relatorio.publicar()
+
+    # Lote 2: rollback
+    relatorio.registrar(_rejeicoes([10]))
+    relatorio.descarregar()
+    relatorio.descartar()
+
+    df = pd.read_csv(relatorio.caminho)
+
+    assert list(df.columns) == COLUNAS_RELATORIO
+    assert df["linha"].tolist() == [2, 3]
+    assert relatorio.total == 2
+
+
+def test_pacote_publica_apos_commit():
+    relatorio = RelatorioRejeicoes(1, tipo_arquivo="os_selo")
+    relatorio.registrar(_rejeicoes([5]))
+    relatorio.descarregar()
+
+    assert not os.path.exists(relatorio.caminho)
+
+    publicar_relatorio_pendente(1, "os_selo")
+
+    assert pd.read_csv(relatorio.caminho)["linha"].tolist() == [5]
+
+    # Pacote com falha: o pendente é removido sem publicar
+    outro = RelatorioRejeicoes(2, tipo_arquivo="os_selo")
+    outro.registrar(_rejeicoes([7]))
+    outro.descarregar()
+    descartar_relatorio_pendente(2, "os_selo")
+
+    assert not os.path.exists(outro.caminho)
+    assert not os.path.exists(outro.caminho + ".pendente")
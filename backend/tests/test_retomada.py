@@ -0,0 +1,121 @@
+"""
+Retomada de importação a partir do checkpoint
+"""
+import pandas as pd
+import pytest
+
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+from app.core.import_config import ModoImportacao
+from app.core.import_log import registrar_checkpoint_importacao
+from app.services import import_jobs_service
+
+
+class _ExecutorRegistrado:
+    """
+    Registra os jobs enviados em vez de executá-los.
+    """
+    def __init__(self):
+        self.enviados = []
+
+    def submit(self, *args):
+        self.enviados.append(args)
+        return _FuturoConcluido()
+
+
+class _FuturoConcluido:
+    def add_done_callback(self, _):
+        pass
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = _ExecutorRegistrado()
+    monkeypatch.setattr(import_jobs_service, "_obter_executor", lambda: executor)
+    monkeypatch.setattr(
+        import_jobs_service,
+        "obter_checkpoint_importacao",
+        lambda **_: {
+            "checkpoint_lote": 2,
+            "checkpoint_linhas": 1000,
+            "registros_processados": 1000,
+            "hash_arquivo": "a" * 64,
+        },
+    )
+    return executor
+
+
+def _retomar(caminho: str, hash_arquivo: str):
+    return import_jobs_service.enfileirar_importacao(
+        tipo_arquivo="os_selo",
+        file=caminho,
+        contrato_id="1",
+        usuario_email="teste@localhost",
+        usuario_id=1,
+        sistema_origem_id=1,
+        modo_importacao=ModoImportacao.INCREMENTAL,
+        retomar_log_id=7,
+        hash_arquivo=hash_arquivo,
+    )
+
+
+@pytest.fixture
+def arquivo(salvar_csv):
+    return salvar_csv(pd.DataFrame({
+        "id": ["1"],
+        "os_id": ["10"],
+        "selo": ["A"],
+        "quantidade": [1],
+    }))
+
+
+def test_retomada_com_outro_arquivo_e_rejeitada(executor, arquivo):
+    with pytest.raises(BusinessException) as erro:
+        _retomar(arquivo, "b" * 64)
+
+    assert erro.value.error_code == ErrorCode.RESUME_FILE_MISMATCH
+    assert executor.enviados == []
+
+
+def test_retomada_com_o_mesmo_arquivo_e_enfileirada(executor, arquivo):
+    assert _retomar(arquivo, "a" * 64) == 7
+    assert len(executor.enviados) == 1
+
+
+# ======================================================
+# CHECKPOINT SÓ EM LOG PROCESSANDO
+# ======================================================
+
+class _ConexaoCheckpoint:
+    def __init__(self, linhas_afetadas):
+        self.linhas_afetadas = linhas_afetadas
+        self.sql = []
+
+    def execute(self, sql, parametros):
+        self.sql.append(str(sql))
+        return type("Resultado", (), {"rowcount": self.linhas_afetadas})()
+
+
+def _checkpoint(conn):
+    registrar_checkpoint_importacao(
+        conn,
+        log_id=7,
+        checkpoint_lote=3,
+        checkpoint_linhas=1500,
+        registros_processados=1500,
+    )
+
+
+def test_checkpoint_em_log_processando():
+    conn = _ConexaoCheckpoint(1)
+
+    _checkpoint(conn)
+
+    assert "status = 'PROCESSANDO'" in conn.sql[0]
+
+
+def test_checkpoint_em_log_finalizado_interrompe_o_lote():
+    with pytest.raises(BusinessException) as erro:
+        _checkpoint(_ConexaoCheckpoint(0))
+
+    assert erro.value.error_code == ErrorCode.IMPORT_NOT_IN_PROGRESS
@@ -0,0 +1,131 @@
+"""
+Simulação (dry-run) e rejeição de chaves duplicadas
+"""
+import pandas as pd
+import pytest
+
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+from app.core.import_config import ModoImportacao
+from app.services import import_jobs_service, import_pr_engine
+
+
+@pytest.fixture
+def logs(monkeypatch):
+    """
+    Substitui a gravação do log (banco) por uma lista em memória.
+    """
+    finalizados = []
+
+    monkeypatch.setattr(import_pr_engine, "criar_log_importacao", lambda **_: 1)
+    monkeypatch.setattr(
+        import_pr_engine,
+        "finalizar_log_importacao",
+        lambda **dados: finalizados.append(dados),
+    )
+
+    return finalizados
+
+
+def _simular(caminho: str):
+    return import_pr_engine.simular_importacao_pr(
+        "os_selo",
+        file=caminho,
+        contrato_id="1",
+        usuario_email="teste@localhost",
+        usuario_id=1,
+        sistema_origem_id=1,
+    )
+
+
+def test_simulacao_colunas_ausentes_finaliza_log_com_erro(logs, salvar_csv):
+    caminho = salvar_csv(pd.DataFrame({"id": ["1"], "selo": ["A"]}))
+
+    with pytest.raises(BusinessException) as erro:
+        _simular(caminho)
+
+    assert erro.value.error_code == ErrorCode.MISSING_REQUIRED_COLUMNS
+    assert logs[-1]["status"] == "ERROR"
+    assert logs[-1]["registros_rejeitados"] == 0
+
+
+def test_simulacao_arquivo_vazio_finaliza_log_com_erro(logs, tmp_path):
+    caminho = tmp_path / "vazio.csv"
+    caminho.write_text("id;os_id;selo;quantidade\n", encoding="utf-8")
+
+    with pytest.raises(BusinessException) as erro:
+        _simular(str(caminho))
+
+    assert erro.value.error_code == ErrorCode.EMPTY_FILE
+    assert logs[-1]["status"] == "ERROR"
+
+
+def test_simulacao_conta_chaves_duplicadas(logs, salvar_csv):
+    caminho = salvar_csv(pd.DataFrame({
+        "id": ["1", "2", "1"],
+        "os_id": ["10", "20", "10"],
+        "selo": ["A", "B", "A"],
+        "quantidade": [1, 2, 1],
+    }))
+
+    resultado = _simular(caminho)["data"]
+
+    assert resultado["registros_validos"] == 2
+    assert resultado["rejeicoes_por_motivo"] == {"CHAVE_DUPLICADA": 1}
+    assert logs[-1]["status"] == "SUCCESS"
+
+
+class _ExecutorImediato:
+    """
+    Executa os jobs na hora, no próprio processo.
+    """
+    def submit(self, funcao, *args):
+        resultado = funcao(*args)
+        return type("Futuro", (), {"result": lambda self: resultado})()
+
+
+def test_simulacao_de_pacote_nao_grava(monkeypatch, tmp_path):
+    finalizados = []
+    gravacoes = []
+
+    monkeypatch.setattr(import_jobs_service, "_obter_executor", _ExecutorImediato)
+    monkeypatch.setattr(
+        import_jobs_service,
+        "finalizar_log_importacao",
+        lambda **dados: finalizados.append(dados),
+    )
+    monkeypatch.setattr(
+        import_jobs_service,
+        "gravar_pacote_pr",
+        lambda **dados: gravacoes.append(dados),
+    )
+
+    pasta_job = tmp_path / "job"
+    pasta_job.mkdir()
+    caminho = pasta_job / "os_selo_2024_01.csv"
+    pd.DataFrame({
+        "id": ["1", "2", "1"],
+        "os_id": ["10", "20", "10"],
+        "selo": ["A", "B", "A"],
+        "quantidade": [1, 2, 1],
+    }).to_csv(caminho, sep=";", index=False)
+
+    import_jobs_service._orquestrar_pacote(
+        1,
+        str(pasta_job),
+        {"os_selo": str(caminho)},
+        {
+            "contrato_id": "1",
+            "usuario_email": "teste@localhost",
+            "sistema_origem_id": 1,
+            "modo_importacao": ModoImportacao.INCREMENTAL,
+            "senha_confirmacao": None,
+            "simulacao": True,
+        },
+    )
+
+    assert gravacoes == []
+    assert finalizados[-1]["status"] == "SUCCESS"
+    assert finalizados[-1]["registros_processados"] == 2
+    assert finalizados[-1]["registros_rejeitados"] == 1
+    assert "CHAVE_DUPLICADA: 1" in finalizados[-1]["mensagem"]
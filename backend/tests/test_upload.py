@@ -0,0 +1,174 @@
+"""
+Limite de tamanho dos uploads: corpo da requisição (middleware,
+antes do spool do Starlette), tamanho de cada arquivo e extração
+do .zip do pacote
+"""
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.errors import ErrorCode
+from app.core.exceptions import BusinessException
+from app.core.import_config import TIPOS_IMPORTACAO
+from app.core.upload import LimiteUploadMiddleware, limite_corpo_upload, receber_upload
+from app.services.import_jobs_service import _extrair_membro, identificar_arquivos_pacote
+
+ROTA = "/import/arquivo"
+MB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def limite_1_mb(monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_TAMANHO_MAXIMO_MB", 1)
+
+
+class _Endpoint:
+    """
+    App ASGI que lê o corpo inteiro (como o parser de multipart).
+    """
+    def __init__(self):
+        self.chamado = False
+        self.lidos = 0
+
+    async def __call__(self, scope, receive, send):
+        self.chamado = True
+
+        while True:
+            mensagem = await receive()
+
+            if mensagem["type"] == "http.disconnect":
+                raise ConnectionError("cliente desconectou")
+
+            self.lidos += len(mensagem.get("body", b""))
+
+            if not mensagem.get("more_body"):
+                break
+
+        await send({"type": "http.response.start", "status": 202, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def _requisitar(corpo: bytes, *, content_length: bool, bloco: int = 64 * 1024):
+    """
+    Envia `corpo` em blocos pelo middleware e devolve
+    (status, corpo da resposta, endpoint, bytes entregues ao ASGI).
+    """
+    endpoint = _Endpoint()
+    middleware = LimiteUploadMiddleware(endpoint, arquivos_por_rota={ROTA: 1})
+    cabecalhos = [(b"content-length", str(len(corpo)).encode())] if content_length else []
+    scope = {"type": "http", "method": "POST", "path": ROTA, "headers": cabecalhos}
+
+    blocos = [corpo[i:i + bloco] for i in range(0, len(corpo), bloco)]
+    entregues = 0
+    enviados = []
+
+    async def receive():
+        nonlocal entregues
+
+        if not blocos:
+            return {"type": "http.disconnect"}
+
+        parte = blocos.pop(0)
+        entregues += len(parte)
+        return {"type": "http.request", "body": parte, "more_body": bool(blocos)}
+
+    async def send(mensagem):
+        enviados.append(mensagem)
+
+    asyncio.run(middleware(scope, receive, send))
+
+    status = enviados[0]["status"]
+    resposta = b"".join(m.get("body", b"") for m in enviados[1:])
+    return status, resposta, endpoint, entregues
+
+
+def test_content_length_acima_do_limite_nao_le_o_corpo():
+    corpo = b"x" * (limite_corpo_upload(1) + 1)
+
+    status, resposta, endpoint, entregues = _requisitar(corpo, content_length=True)
+
+    assert status == 413
+    assert json.loads(resposta)["error"]["code"] == ErrorCode.FILE_TOO_LARGE.value
+    assert not endpoint.chamado
+    assert entregues == 0
+
+
+def test_corpo_sem_content_length_e_interrompido_no_limite():
+    limite = limite_corpo_upload(1)
+    corpo = b"x" * (5 * MB)
+
+    status, _, endpoint, entregues = _requisitar(corpo, content_length=False)
+
+    assert status == 413
+    # O endpoint não recebe nada além do limite e o resto não é lido
+    assert endpoint.lidos <= limite
+    assert entregues < limite + 64 * 1024 + 1
+
+
+def test_corpo_dentro_do_limite_chega_ao_endpoint():
+    corpo = b"x" * MB
+
+    status, _, endpoint, _ = _requisitar(corpo, content_length=False)
+
+    assert status == 202
+    assert endpoint.lidos == MB
+
+
+# ======================================================
+# LIMITE POR ARQUIVO (receber_upload)
+# ======================================================
+
+def test_arquivo_acima_do_limite_e_recusado(tmp_path):
+    arquivo = UploadFile(io.BytesIO(b"x" * (MB + 1)), filename="dados.csv")
+
+    with pytest.raises(BusinessException) as erro:
+        asyncio.run(receber_upload(arquivo, str(tmp_path), extensoes=(".csv",)))
+
+    assert erro.value.error_code == ErrorCode.FILE_TOO_LARGE
+    assert list(tmp_path.iterdir()) == []
+
+
+# ======================================================
+# EXTRAÇÃO DO .ZIP DO PACOTE
+# ======================================================
+
+def _salvar_zip(pasta, membros) -> str:
+    caminho = str(pasta / "pacote.zip")
+
+    with zipfile.ZipFile(caminho, "w", zipfile.ZIP_DEFLATED) as pacote:
+        for nome, conteudo in membros.items():
+            pacote.writestr(nome, conteudo)
+
+    return caminho
+
+
+def test_extracao_conta_os_bytes_descompactados(tmp_path):
+    caminho = _salvar_zip(tmp_path, {"os_lanc.csv": b"x" * 100_000})
+    destino = tmp_path / "os_lanc.csv"
+
+    with zipfile.ZipFile(caminho) as pacote:
+        membro = pacote.infolist()[0]
+
+        with pytest.raises(BusinessException) as erro:
+            _extrair_membro(pacote, membro, str(destino), 64 * 1024)
+
+    assert erro.value.error_code == ErrorCode.FILE_TOO_LARGE
+    assert not destino.exists()
+
+
+def test_zip_com_mais_arquivos_que_tipos_e_recusado(tmp_path):
+    _salvar_zip(tmp_path, {
+        f"os_lanc_{i}.csv": b"id\n1\n"
+        for i in range(len(TIPOS_IMPORTACAO) + 1)
+    })
+
+    with pytest.raises(BusinessException) as erro:
+        identificar_arquivos_pacote(str(tmp_path))
+
+    assert erro.value.error_code == ErrorCode.INVALID_FILE_TYPE
+    assert [p.name for p in tmp_path.iterdir()] == ["pacote.zip"]
@@ -0,0 +1,15 @@
+-- ============================================
+-- SCRIPT 05: CHECKPOINT DAS IMPORTAÇÕES EM LOTES
+-- ============================================
+-- Carga com commit a cada N linhas: o último lote
+-- commitado fica registrado no log para retomada.
+-- ============================================
+
+ALTER TABLE control.importacoes_log
+    ADD COLUMN IF NOT EXISTS checkpoint_lote INTEGER,
+    ADD COLUMN IF NOT EXISTS checkpoint_linhas INTEGER;
+
+COMMENT ON COLUMN control.importacoes_log.checkpoint_lote IS
+    'Último lote commitado (carga em lotes)';
+COMMENT ON COLUMN control.importacoes_log.checkpoint_linhas IS
+    'Linhas do arquivo lidas até o último commit (ponto de retomada)';
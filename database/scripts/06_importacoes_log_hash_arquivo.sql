@@ -0,0 +1,16 @@
+-- ============================================
+-- SCRIPT 06: HASH DO ARQUIVO IMPORTADO
+-- ============================================
+-- SHA-256 do arquivo enviado: reenvios idênticos
+-- (mesmo contrato, sistema e tipo) não são reprocessados.
+-- ============================================
+
+ALTER TABLE control.importacoes_log
+    ADD COLUMN IF NOT EXISTS hash_arquivo CHAR(64);
+
+COMMENT ON COLUMN control.importacoes_log.hash_arquivo IS
+    'SHA-256 do arquivo enviado (pacote: hash dos hashes dos arquivos)';
+
+CREATE INDEX IF NOT EXISTS idx_importacoes_log_hash_arquivo
+    ON control.importacoes_log (contrato_id, tipo_arquivo, hash_arquivo)
+    WHERE hash_arquivo IS NOT NULL;
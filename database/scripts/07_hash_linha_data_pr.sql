@@ -0,0 +1,28 @@
+-- ============================================
+-- SCRIPT 07: HASH DE CONTEÚDO DAS LINHAS (DATA_PR)
+-- ============================================
+-- Hash 64 bits do conteúdo de cada registro importado.
+-- A carga INCREMENTAL atualiza apenas as linhas cujo
+-- hash mudou; as idênticas não geram escrita.
+-- ============================================
+
+ALTER TABLE data_pr.os_lanc
+    ADD COLUMN IF NOT EXISTS hash_linha BIGINT;
+
+ALTER TABLE data_pr.os_selo
+    ADD COLUMN IF NOT EXISTS hash_linha BIGINT;
+
+ALTER TABLE data_pr.his_selo
+    ADD COLUMN IF NOT EXISTS hash_linha BIGINT;
+
+ALTER TABLE data_pr.his_selo_detalhe_pr
+    ADD COLUMN IF NOT EXISTS hash_linha BIGINT;
+
+COMMENT ON COLUMN data_pr.os_lanc.hash_linha IS
+    'Hash do conteúdo da linha (carga incremental)';
+COMMENT ON COLUMN data_pr.os_selo.hash_linha IS
+    'Hash do conteúdo da linha (carga incremental)';
+COMMENT ON COLUMN data_pr.his_selo.hash_linha IS
+    'Hash do conteúdo da linha (carga incremental)';
+COMMENT ON COLUMN data_pr.his_selo_detalhe_pr.hash_linha IS
+    'Hash do conteúdo da linha (carga incremental)';
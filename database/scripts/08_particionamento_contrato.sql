@@ -0,0 +1,207 @@
+-- ============================================
+-- SCRIPT 08: PARTICIONAMENTO POR CONTRATO (DATA_PR)
+-- ============================================
+-- os_lanc, os_selo, his_selo e his_selo_detalhe_pr passam
+-- a ser particionadas por LIST (contrato_id): uma partição
+-- por contrato, nomeada <tabela>_c<contrato_id>.
+--
+-- Consultas filtradas por contrato_id leem só a partição
+-- do contrato; cargas INITIAL trocam a partição inteira.
+--
+-- Restrições: a chave primária original é recriada com
+-- contrato_id acrescentado (em tabela particionada a PK precisa
+-- conter a chave de partição; a sequência continua garantindo
+-- ids únicos). Em his_selo_detalhe_pr, o script 09 a troca por
+-- um índice único com data_ato. As demais restrições UNIQUE dão
+-- lugar ao índice único ux_<tabela>_chave (chave do ON CONFLICT);
+-- índices não únicos são recriados como estavam.
+--
+-- Idempotente: tabelas já particionadas são ignoradas.
+-- Novas partições: data_pr.criar_particoes_contrato(contrato)
+-- (chamada no cadastro do contrato e pela importação).
+-- ============================================
+
+BEGIN;
+
+-- --------------------------------------------
+-- 1. Funções de criação de partições
+-- --------------------------------------------
+
+CREATE OR REPLACE FUNCTION data_pr.nome_particao_contrato(
+    p_tabela TEXT,
+    p_contrato_id TEXT
+) RETURNS TEXT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT p_tabela || '_c'
+        || lower(regexp_replace(p_contrato_id, '[^A-Za-z0-9]', '_', 'g'))
+$$;
+
+CREATE OR REPLACE FUNCTION data_pr.criar_particao_contrato(
+    p_tabela TEXT,
+    p_contrato_id TEXT
+) RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_particao TEXT := data_pr.nome_particao_contrato(p_tabela, p_contrato_id);
+BEGIN
+    -- Somente tabelas já particionadas por contrato
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_partitioned_table
+        WHERE partrelid = to_regclass(format('data_pr.%I', p_tabela))
+    ) THEN
+        RETURN;
+    END IF;
+
+    IF to_regclass(format('data_pr.%I', v_particao)) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE data_pr.%I PARTITION OF data_pr.%I FOR VALUES IN (%L)',
+            v_particao, p_tabela, p_contrato_id
+        );
+    END IF;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION data_pr.criar_particoes_contrato(
+    p_contrato_id TEXT
+) RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_tabela TEXT;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY[
+        'os_lanc', 'os_selo', 'his_selo', 'his_selo_detalhe_pr'
+    ] LOOP
+        PERFORM data_pr.criar_particao_contrato(v_tabela, p_contrato_id);
+    END LOOP;
+END;
+$$;
+
+-- --------------------------------------------
+-- 2. Conversão das tabelas existentes
+-- --------------------------------------------
+
+DO $$
+DECLARE
+    v_tabela TEXT;
+    v_legado TEXT;
+    v_chave TEXT;
+    v_indices TEXT[];
+    v_pk TEXT[];
+    v_indice TEXT;
+    v_coluna TEXT;
+    v_sequencia TEXT;
+    v_contrato TEXT;
+BEGIN
+    FOREACH v_tabela IN ARRAY ARRAY[
+        'os_lanc', 'os_selo', 'his_selo', 'his_selo_detalhe_pr'
+    ] LOOP
+        IF EXISTS (
+            SELECT 1
+            FROM pg_partitioned_table
+            WHERE partrelid = to_regclass(format('data_pr.%I', v_tabela))
+        ) THEN
+            RAISE NOTICE 'data_pr.% já particionada', v_tabela;
+            CONTINUE;
+        END IF;
+
+        v_legado := v_tabela || '_legado';
+
+        -- Chave do ON CONFLICT das importações (contém contrato_id)
+        v_chave := CASE v_tabela
+            WHEN 'os_lanc' THEN 'contrato_id, sistema_origem_id, os, sequencia'
+            WHEN 'os_selo' THEN 'contrato_id, sistema_origem_id, os_id, selo'
+            ELSE 'contrato_id, sistema_origem_id, id'
+        END;
+
+        -- Índices não únicos atuais (recriados na tabela particionada)
+        SELECT coalesce(array_agg(pg_get_indexdef(i.indexrelid)), '{}')
+        INTO v_indices
+        FROM pg_index i
+        WHERE i.indrelid = format('data_pr.%I', v_tabela)::regclass
+          AND NOT i.indisunique;
+
+        -- Colunas da chave primária atual, na ordem
+        SELECT array_agg(a.attname::TEXT ORDER BY k.ordem)
+        INTO v_pk
+        FROM pg_index i
+        CROSS JOIN LATERAL unnest(i.indkey::INT2[]) WITH ORDINALITY AS k(attnum, ordem)
+        JOIN pg_attribute a
+          ON a.attrelid = i.indrelid
+         AND a.attnum = k.attnum
+        WHERE i.indrelid = format('data_pr.%I', v_tabela)::regclass
+          AND i.indisprimary;
+
+        IF v_pk IS NOT NULL AND NOT 'contrato_id' = ANY(v_pk) THEN
+            v_pk := v_pk || 'contrato_id'::TEXT;
+        END IF;
+
+        EXECUTE format('ALTER TABLE data_pr.%I RENAME TO %I', v_tabela, v_legado);
+
+        EXECUTE format(
+            'CREATE TABLE data_pr.%I (LIKE data_pr.%I '
+            'INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING COMMENTS) '
+            'PARTITION BY LIST (contrato_id)',
+            v_tabela, v_legado
+        );
+
+        -- Sequências (SERIAL) passam a pertencer à nova tabela
+        FOR v_coluna IN
+            SELECT a.attname
+            FROM pg_attribute a
+            WHERE a.attrelid = format('data_pr.%I', v_legado)::regclass
+              AND a.attnum > 0
+              AND NOT a.attisdropped
+        LOOP
+            v_sequencia := pg_get_serial_sequence(
+                format('data_pr.%I', v_legado), v_coluna
+            );
+
+            IF v_sequencia IS NOT NULL THEN
+                EXECUTE format(
+                    'ALTER SEQUENCE %s OWNED BY data_pr.%I.%I',
+                    v_sequencia, v_tabela, v_coluna
+                );
+            END IF;
+        END LOOP;
+
+        EXECUTE format(
+            'CREATE UNIQUE INDEX %I ON data_pr.%I (%s)',
+            'ux_' || v_tabela || '_chave', v_tabela, v_chave
+        );
+
+        -- Uma partição por contrato cadastrado ou presente nos dados
+        FOR v_contrato IN EXECUTE format(
+            'SELECT contrato_id FROM control.contratos '
+            'UNION SELECT DISTINCT contrato_id FROM data_pr.%I',
+            v_legado
+        ) LOOP
+            PERFORM data_pr.criar_particao_contrato(v_tabela, v_contrato);
+        END LOOP;
+
+        EXECUTE format(
+            'INSERT INTO data_pr.%I SELECT * FROM data_pr.%I',
+            v_tabela, v_legado
+        );
+
+        EXECUTE format('DROP TABLE data_pr.%I', v_legado);
+
+        -- Depois do DROP: o nome <tabela>_pkey era do índice da legada
+        IF v_pk IS NOT NULL THEN
+            EXECUTE format(
+                'ALTER TABLE data_pr.%I ADD PRIMARY KEY (%s)',
+                v_tabela,
+                (SELECT string_agg(quote_ident(c), ', ') FROM unnest(v_pk) AS c)
+            );
+        END IF;
+
+        FOREACH v_indice IN ARRAY v_indices LOOP
+            EXECUTE v_indice;
+        END LOOP;
+
+        EXECUTE format('ANALYZE data_pr.%I', v_tabela);
+    END LOOP;
+END;
+$$;
+
+COMMIT;
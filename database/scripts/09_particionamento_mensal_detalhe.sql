@@ -0,0 +1,228 @@
+-- ============================================
+-- SCRIPT 09: PARTIÇÕES MENSAIS DE HIS_SELO_DETALHE_PR
+-- ============================================
+-- Cada partição de contrato de his_selo_detalhe_pr passa a
+-- ser subparticionada por RANGE (data_ato), um mês por
+-- partição (<partição do contrato>_AAAAMM), com uma partição
+-- DEFAULT para datas sem mês criado.
+--
+-- A chave única passa a incluir data_ato (exigência do
+-- particionamento): (contrato_id, sistema_origem_id, id, data_ato).
+-- A unicidade de (contrato_id, sistema_origem_id, id) passa a ser
+-- garantida pela importação: antes do merge, a versão da linha
+-- gravada em outro mês (data_ato corrigida na origem) é removida
+-- (chave_logica em TIPOS_IMPORTACAO).
+--
+-- A chave primária recriada pelo script 08 (<pk>, contrato_id)
+-- também precisaria de data_ato, que pode ser nula (linhas na
+-- DEFAULT): vira o índice único ux_his_selo_detalhe_pr_pk
+-- (<pk>, contrato_id, data_ato).
+--
+-- Meses futuros (PARTICOES_MESES_FUTUROS): criados pela API, no
+-- cadastro do contrato, na importação e na manutenção periódica
+-- de partições, via data_pr.criar_particoes_mensais_detalhe.
+-- Requer o script 08.
+-- ============================================
+
+BEGIN;
+
+-- --------------------------------------------
+-- 1. Partições mensais de um contrato
+-- --------------------------------------------
+
+CREATE OR REPLACE FUNCTION data_pr.criar_particoes_mensais_detalhe(
+    p_contrato_id TEXT,
+    p_inicio DATE,
+    p_fim DATE
+) RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_pai TEXT := data_pr.nome_particao_contrato('his_selo_detalhe_pr', p_contrato_id);
+    v_mes DATE := date_trunc('month', p_inicio)::DATE;
+    v_particao TEXT;
+    v_criadas INTEGER := 0;
+BEGIN
+    -- Somente partições de contrato subparticionadas por mês
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_partitioned_table
+        WHERE partrelid = to_regclass(format('data_pr.%I', v_pai))
+    ) THEN
+        RETURN 0;
+    END IF;
+
+    WHILE v_mes <= p_fim LOOP
+        v_particao := v_pai || '_' || to_char(v_mes, 'YYYYMM');
+
+        IF to_regclass(format('data_pr.%I', v_particao)) IS NULL THEN
+            -- Criada fora da árvore: as linhas do mês que estiverem na
+            -- DEFAULT são movidas antes do ATTACH
+            EXECUTE format(
+                'CREATE TABLE data_pr.%I (LIKE data_pr.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                v_particao, v_pai
+            );
+            EXECUTE format(
+                'WITH movidas AS ('
+                '  DELETE FROM data_pr.%I WHERE data_ato >= %L AND data_ato < %L RETURNING *'
+                ') INSERT INTO data_pr.%I SELECT * FROM movidas',
+                v_pai || '_default', v_mes, (v_mes + INTERVAL '1 month')::DATE, v_particao
+            );
+            EXECUTE format(
+                'ALTER TABLE data_pr.%I ATTACH PARTITION data_pr.%I FOR VALUES FROM (%L) TO (%L)',
+                v_pai, v_particao, v_mes, (v_mes + INTERVAL '1 month')::DATE
+            );
+
+            v_criadas := v_criadas + 1;
+        END IF;
+
+        v_mes := (v_mes + INTERVAL '1 month')::DATE;
+    END LOOP;
+
+    RETURN v_criadas;
+END;
+$$;
+
+-- --------------------------------------------
+-- 2. Partição de contrato (detalhe subparticionado)
+-- --------------------------------------------
+
+CREATE OR REPLACE FUNCTION data_pr.criar_particao_contrato(
+    p_tabela TEXT,
+    p_contrato_id TEXT
+) RETURNS VOID
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_particao TEXT := data_pr.nome_particao_contrato(p_tabela, p_contrato_id);
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_partitioned_table
+        WHERE partrelid = to_regclass(format('data_pr.%I', p_tabela))
+    ) THEN
+        RETURN;
+    END IF;
+
+    IF to_regclass(format('data_pr.%I', v_particao)) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    IF p_tabela = 'his_selo_detalhe_pr' THEN
+        EXECUTE format(
+            'CREATE TABLE data_pr.%I PARTITION OF data_pr.%I FOR VALUES IN (%L) '
+            'PARTITION BY RANGE (data_ato)',
+            v_particao, p_tabela, p_contrato_id
+        );
+        EXECUTE format(
+            'CREATE TABLE data_pr.%I PARTITION OF data_pr.%I DEFAULT',
+            v_particao || '_default', v_particao
+        );
+    ELSE
+        EXECUTE format(
+            'CREATE TABLE data_pr.%I PARTITION OF data_pr.%I FOR VALUES IN (%L)',
+            v_particao, p_tabela, p_contrato_id
+        );
+    END IF;
+END;
+$$;
+
+-- --------------------------------------------
+-- 3. Conversão das partições existentes
+-- --------------------------------------------
+
+DO $$
+DECLARE
+    v_contratos TEXT[];
+    v_contrato TEXT;
+    v_particao TEXT;
+    v_legado TEXT;
+    v_inicio DATE;
+    v_fim DATE;
+    v_pk_nome TEXT;
+    v_pk TEXT;
+BEGIN
+    -- A chave única precisa conter data_ato
+    DROP INDEX IF EXISTS data_pr.ux_his_selo_detalhe_pr_chave;
+
+    -- Idem a chave primária (substituída por índice único)
+    SELECT c.conname, string_agg(quote_ident(a.attname), ', ' ORDER BY k.ordem)
+    INTO v_pk_nome, v_pk
+    FROM pg_constraint c
+    CROSS JOIN LATERAL unnest(c.conkey) WITH ORDINALITY AS k(attnum, ordem)
+    JOIN pg_attribute a
+      ON a.attrelid = c.conrelid
+     AND a.attnum = k.attnum
+    WHERE c.conrelid = 'data_pr.his_selo_detalhe_pr'::regclass
+      AND c.contype = 'p'
+    GROUP BY c.conname;
+
+    IF v_pk_nome IS NOT NULL THEN
+        EXECUTE format(
+            'ALTER TABLE data_pr.his_selo_detalhe_pr DROP CONSTRAINT %I',
+            v_pk_nome
+        );
+    END IF;
+
+    -- Lista materializada: um cursor aberto sobre his_selo_detalhe_pr
+    -- impediria o DROP das partições legadas dentro do laço
+    SELECT coalesce(array_agg(contrato_id), '{}')
+    INTO v_contratos
+    FROM (
+        SELECT contrato_id FROM control.contratos
+        UNION
+        SELECT DISTINCT contrato_id FROM data_pr.his_selo_detalhe_pr
+    ) contratos;
+
+    FOREACH v_contrato IN ARRAY v_contratos LOOP
+        v_particao := data_pr.nome_particao_contrato('his_selo_detalhe_pr', v_contrato);
+
+        IF EXISTS (
+            SELECT 1
+            FROM pg_class
+            WHERE oid = to_regclass(format('data_pr.%I', v_particao))
+              AND relkind = 'r'
+        ) THEN
+            v_legado := v_particao || '_legado';
+
+            EXECUTE format(
+                'ALTER TABLE data_pr.his_selo_detalhe_pr DETACH PARTITION data_pr.%I',
+                v_particao
+            );
+            EXECUTE format('ALTER TABLE data_pr.%I RENAME TO %I', v_particao, v_legado);
+
+            PERFORM data_pr.criar_particao_contrato('his_selo_detalhe_pr', v_contrato);
+
+            EXECUTE format(
+                'SELECT min(data_ato), max(data_ato) FROM data_pr.%I',
+                v_legado
+            ) INTO v_inicio, v_fim;
+
+            IF v_inicio IS NOT NULL THEN
+                PERFORM data_pr.criar_particoes_mensais_detalhe(v_contrato, v_inicio, v_fim);
+            END IF;
+
+            EXECUTE format(
+                'INSERT INTO data_pr.his_selo_detalhe_pr SELECT * FROM data_pr.%I',
+                v_legado
+            );
+            EXECUTE format('DROP TABLE data_pr.%I', v_legado);
+        ELSE
+            PERFORM data_pr.criar_particao_contrato('his_selo_detalhe_pr', v_contrato);
+        END IF;
+    END LOOP;
+
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_his_selo_detalhe_pr_chave
+        ON data_pr.his_selo_detalhe_pr (contrato_id, sistema_origem_id, id, data_ato);
+
+    IF v_pk IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE UNIQUE INDEX IF NOT EXISTS ux_his_selo_detalhe_pr_pk '
+            'ON data_pr.his_selo_detalhe_pr (%s, data_ato)',
+            v_pk
+        );
+    END IF;
+
+    ANALYZE data_pr.his_selo_detalhe_pr;
+END;
+$$;
+
+COMMIT;
@@ -0,0 +1,16 @@
+-- ============================================
+-- SCRIPT 10: SIMULAÇÃO (DRY-RUN) E REJEIÇÕES
+-- ============================================
+-- Logs de simulação validam o arquivo sem gravar dados.
+-- registros_rejeitados: linhas descartadas pela validação
+-- (detalhe no relatório rejeicoes_<id>.csv.gz).
+-- ============================================
+
+ALTER TABLE control.importacoes_log
+    ADD COLUMN IF NOT EXISTS simulacao BOOLEAN NOT NULL DEFAULT FALSE,
+    ADD COLUMN IF NOT EXISTS registros_rejeitados INTEGER;
+
+COMMENT ON COLUMN control.importacoes_log.simulacao IS
+    'Validação sem gravação (dry-run)';
+COMMENT ON COLUMN control.importacoes_log.registros_rejeitados IS
+    'Linhas rejeitadas pela validação';
@@ -0,0 +1,15 @@
+-- ============================================
+-- SCRIPT 11: MÉTRICAS POR ETAPA DA IMPORTAÇÃO
+-- ============================================
+-- metricas_etapas: por etapa (leitura, normalizacao, validacao,
+-- limpeza, gravacao, commit) o tempo, as linhas tratadas e o
+-- pico de memória (RSS) do processo.
+-- Ex.: {"leitura": {"segundos": 12.3, "linhas": 100000,
+--       "linhas_por_segundo": 8130, "pico_rss_mb": 410.5}, ...}
+-- ============================================
+
+ALTER TABLE control.importacoes_log
+    ADD COLUMN IF NOT EXISTS metricas_etapas JSONB;
+
+COMMENT ON COLUMN control.importacoes_log.metricas_etapas IS
+    'Tempo, linhas e pico de memória por etapa da importação';
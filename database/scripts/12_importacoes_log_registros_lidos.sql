@@ -0,0 +1,15 @@
+-- ============================================
+-- SCRIPT 12: LINHAS LIDAS (PROGRESSO DA IMPORTAÇÃO)
+-- ============================================
+-- registros_lidos: linhas do arquivo já lidas (válidas ou não),
+-- atualizado durante a carga. O percentual e o tempo restante
+-- do progresso comparam esse contador com total_registros:
+-- registros_processados não conta linhas rejeitadas nem as
+-- ignoradas (já existentes) e nunca chega ao total.
+-- ============================================
+
+ALTER TABLE control.importacoes_log
+    ADD COLUMN IF NOT EXISTS registros_lidos INTEGER;
+
+COMMENT ON COLUMN control.importacoes_log.registros_lidos IS
+    'Linhas do arquivo já lidas (progresso da importação)';
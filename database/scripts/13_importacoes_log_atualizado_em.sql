@@ -0,0 +1,16 @@
+-- ============================================
+-- SCRIPT 13: ÚLTIMA ATIVIDADE DO LOG (IMPORTAÇÕES ÓRFÃS)
+-- ============================================
+-- atualizado_em: última atualização de progresso/checkpoint de um
+-- log em PROCESSANDO. Um log sem atividade há mais de
+-- IMPORT_TIMEOUT_PROCESSANDO_MINUTOS (processo da API reiniciado,
+-- worker morto) é considerado órfão: deixa de bloquear o reenvio
+-- do mesmo arquivo (buscar_importacao_identica).
+-- Logs antigos (NULL) usam started_at.
+-- ============================================
+
+ALTER TABLE control.importacoes_log
+    ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMP;
+
+COMMENT ON COLUMN control.importacoes_log.atualizado_em IS
+    'Última atualização de progresso/checkpoint (detecção de logs órfãos)';
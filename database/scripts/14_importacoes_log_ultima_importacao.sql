@@ -0,0 +1,14 @@
+-- ============================================
+-- SCRIPT 14: ÚLTIMA IMPORTAÇÃO POR CONTRATO E TIPO
+-- ============================================
+-- O reenvio de arquivo idêntico compara o hash só com a última
+-- importação (não simulada) do contrato e tipo: na sequência
+-- A -> B -> A, o segundo A não é ignorado. O índice por hash
+-- (script 06) não atende essa busca (ORDER BY id DESC LIMIT 1).
+-- ============================================
+
+DROP INDEX IF EXISTS control.idx_importacoes_log_hash_arquivo;
+
+CREATE INDEX IF NOT EXISTS idx_importacoes_log_ultima_importacao
+    ON control.importacoes_log (contrato_id, tipo_arquivo, id DESC)
+    WHERE NOT simulacao;